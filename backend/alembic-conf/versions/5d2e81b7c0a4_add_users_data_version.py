@@ -0,0 +1,41 @@
+"""add users data_version / data_updated_at change markers
+
+Revision ID: 5d2e81b7c0a4
+Revises: c134acfb532f
+Create Date: 2026-10-19 14:02:17.530941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e81b7c0a4'
+down_revision: Union[str, Sequence[str], None] = 'c134acfb532f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "data_updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "data_updated_at")
+    op.drop_column("users", "data_version")
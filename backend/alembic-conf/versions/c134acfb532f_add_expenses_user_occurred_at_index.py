@@ -0,0 +1,31 @@
+"""add expenses (user_id, occurred_at) index
+
+Revision ID: c134acfb532f
+Revises: af653f1c9c59
+Create Date: 2026-10-19 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c134acfb532f'
+down_revision: Union[str, Sequence[str], None] = 'af653f1c9c59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_expenses_user_id_occurred_at",
+        "expenses",
+        ["user_id", "occurred_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_expenses_user_id_occurred_at", table_name="expenses")
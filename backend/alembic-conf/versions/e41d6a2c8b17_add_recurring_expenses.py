@@ -0,0 +1,77 @@
+"""add recurring_expenses and link materialized expenses to their rule
+
+Revision ID: e41d6a2c8b17
+Revises: 9b41c3e7d2f5
+Create Date: 2026-10-19 18:05:42.630114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41d6a2c8b17'
+down_revision: Union[str, Sequence[str], None] = '9b41c3e7d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "recurring_expenses",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("title", sa.String(length=50), nullable=False),
+        sa.Column("note", sa.Text(), nullable=False),
+        sa.Column("frequency", sa.String(length=16), nullable=False),
+        sa.Column("every", sa.Integer(), nullable=False),
+        sa.Column("starts_at", sa.DateTime(), nullable=False),
+        sa.Column("ends_at", sa.DateTime(), nullable=True),
+        sa.Column("max_occurrences", sa.Integer(), nullable=True),
+        sa.Column("next_occurrence", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("next_run_at", sa.DateTime(), nullable=True),
+        sa.Column("active", sa.Boolean(), server_default=sa.text("true"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint("every > 0", name="ck_recurring_expenses_every"),
+        sa.CheckConstraint("amount > 0", name="ck_recurring_expenses_amount"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_recurring_expenses_due",
+        "recurring_expenses",
+        ["next_run_at"],
+        postgresql_where=sa.text("active AND next_run_at IS NOT NULL"),
+    )
+    op.create_index("ix_recurring_expenses_user_id", "recurring_expenses", ["user_id"])
+
+    op.add_column("expenses", sa.Column("recurring_id", sa.Integer(), nullable=True))
+    op.add_column("expenses", sa.Column("occurrence", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "expenses_recurring_id_fkey",
+        "expenses",
+        "recurring_expenses",
+        ["recurring_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_unique_constraint(
+        "uq_expenses_recurring_occurrence", "expenses", ["recurring_id", "occurrence"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_expenses_recurring_occurrence", "expenses", type_="unique")
+    op.drop_constraint("expenses_recurring_id_fkey", "expenses", type_="foreignkey")
+    op.drop_column("expenses", "occurrence")
+    op.drop_column("expenses", "recurring_id")
+    op.drop_index("ix_recurring_expenses_user_id", table_name="recurring_expenses")
+    op.drop_index("ix_recurring_expenses_due", table_name="recurring_expenses")
+    op.drop_table("recurring_expenses")
@@ -0,0 +1,31 @@
+"""add outbox_tasks handlers_done
+
+Revision ID: f3a9d58c61b2
+Revises: e41d6a2c8b17
+Create Date: 2026-10-19 16:41:05.228417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9d58c61b2'
+down_revision: Union[str, Sequence[str], None] = 'e41d6a2c8b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "outbox_tasks",
+        sa.Column("handlers_done", sa.JSON(), nullable=False, server_default="[]"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("outbox_tasks", "handlers_done")
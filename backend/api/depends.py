@@ -1,11 +1,29 @@
-from db.session import get_db
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from db.session import get_db, get_read_db
+from db.timeouts import TIMEOUT_GROUPS, timeout_budgets, use_statement_timeout
+from core.config import settings
+from core.metrics import registry
+from core.rate_limit import ROUTE_CLASSES, client_address
 from core.security import oauth2_scheme, decode_access_token
+from exceptions.caching import NotModified
+from exceptions.rate_limit import RateLimited
+from models.user import User
 from repositories import users as user_repo 
-from fastapi import HTTPException, Depends, status 
+from fastapi import HTTPException, Depends, Request, Response, status 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-async def get_current_user(db: AsyncSession = Depends(get_db) ,token: str = Depends(oauth2_scheme)):
+CONDITIONAL_REQUESTS = registry.counter(
+    "http_conditional_requests",
+    "Reads carrying validators, by resource; result=hit means 304 Not Modified.",
+    labelnames=("resource", "result"),
+)
+
+
+async def get_current_user(db: AsyncSession = Depends(get_db, scope="function") ,token: str = Depends(oauth2_scheme)):
     payload = decode_access_token(token)
     email = payload.get("sub")
     if not email:
@@ -22,4 +40,132 @@ async def get_current_user(db: AsyncSession = Depends(get_db) ,token: str = Depe
             headers={"WWW-Authenticate":"Bearer"}
         )
     
-    return user    
+    return user
+
+
+def statement_budget(group: str):
+    """Dependency that applies an endpoint group's statement timeout."""
+    if group not in TIMEOUT_GROUPS:
+        raise ValueError(f"Unknown statement timeout group: {group}")
+
+    async def apply_statement_budget():
+        use_statement_timeout(timeout_budgets()[group])
+
+    return apply_statement_budget
+
+
+def entity_tag(user_id: int, data_version: int, request: Request) -> str:
+    """Weak ETag for this URL (path and query) at the given data version."""
+    key = f"{user_id}:{data_version}:{request.url.path}?{request.url.query}"
+    return f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match list, as required for GET."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _last_modified(updated_at: datetime) -> datetime:
+    # HTTP dates have one-second precision.
+    return updated_at.replace(microsecond=0)
+
+
+def _not_modified_since(if_modified_since: str, updated_at: datetime | None) -> bool:
+    """Whether the data last changed strictly before the client's date.
+
+    Strict: a second write in the same second as the one the client saw
+    carries the same HTTP date, so an equal date cannot prove the copy is
+    current. Such clients get a full response; the ETag tells them apart.
+    """
+    if updated_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return _last_modified(updated_at) < since
+
+
+def _validator_headers(etag: str, updated_at: datetime | None) -> dict[str, str]:
+    # no-cache: the client may store the body but must revalidate each time.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(_last_modified(updated_at), usegmt=True)
+    return headers
+
+
+def conditional_get(resource: str):
+    """Dependency answering 304 from the user's change marker before the handler queries.
+
+    The user row is already loaded for authentication, so a revalidation
+    that still matches costs no extra statement.
+    """
+
+    async def check_validators(
+        request: Request,
+        response: Response,
+        user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_db, scope="function"),
+        read_db: AsyncSession = Depends(get_read_db, scope="function"),
+    ):
+        current_tag = entity_tag(user.id, user.data_version, request)
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        # If-None-Match is exact; when present, If-Modified-Since is ignored.
+        if if_none_match is not None:
+            fresh = etag_matches(if_none_match, current_tag)
+        else:
+            fresh = if_modified_since is not None and _not_modified_since(
+                if_modified_since, user.data_updated_at
+            )
+        if fresh:
+            CONDITIONAL_REQUESTS.labels(resource=resource, result="hit").inc()
+            raise NotModified(_validator_headers(current_tag, user.data_updated_at))
+        if if_none_match is not None or if_modified_since is not None:
+            CONDITIONAL_REQUESTS.labels(resource=resource, result="miss").inc()
+
+        version, updated_at = user.data_version, user.data_updated_at
+        if read_db is not db:
+            # A lagging replica may not have the primary's latest version yet;
+            # tag the body with the version it was actually read at.
+            version, updated_at = await user_repo.get_data_version(read_db, user)
+        response.headers.update(_validator_headers(entity_tag(user.id, version, request), updated_at))
+
+    return check_validators
+
+
+def rate_limit_client(request: Request) -> str:
+    """Bucket owner: the authenticated user when the token verifies, else the client IP."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = decode_access_token(token).get("sub")
+        except HTTPException:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    host = client_address(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+        settings.TRUSTED_PROXIES,
+    )
+    return f"ip:{host}"
+
+
+def rate_limit(route_class: str):
+    """Dependency charging the route class's cost to the caller's token bucket."""
+    if route_class not in ROUTE_CLASSES:
+        raise ValueError(f"Unknown rate limit route class: {route_class}")
+
+    async def enforce_rate_limit(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        decision = await request.app.state.limiter.hit(rate_limit_client(request), route_class)
+        if not decision.allowed:
+            raise RateLimited(decision.retry_after)
+
+    return enforce_rate_limit
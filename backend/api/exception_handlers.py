@@ -1,12 +1,20 @@
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.exc import OperationalError
 
+from core.rate_limit import retry_after_header
+
+from exceptions.caching import NotModified
 from exceptions.categories import CategoryAlreadyExists
 from exceptions.expenses import CategoryDoesNotExist
+from exceptions.rate_limit import RateLimited
 from exceptions.users import EmailAlreadyExists, UserNotFoundError, InvalidCredentials
 
 
 
+QUERY_CANCELED_SQLSTATE = "57014"
+
+
 def _error(detail: str, status_code: int) -> JSONResponse:
     return JSONResponse(status_code=status_code, content={"detail": detail})
 
@@ -43,4 +51,22 @@ def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(InvalidCredentials)
     async def handle_invalid_credentials(request: Request, exc: InvalidCredentials):
         return _error(str(exc), status.HTTP_400_BAD_REQUEST)
-    
\ No newline at end of file
+
+    @app.exception_handler(NotModified)
+    async def handle_not_modified(request: Request, exc: NotModified) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=exc.headers)
+
+    @app.exception_handler(RateLimited)
+    async def handle_rate_limited(request: Request, exc: RateLimited) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": retry_after_header(exc.retry_after)},
+        )
+
+    @app.exception_handler(OperationalError)
+    async def handle_operational_error(request: Request, exc: OperationalError):
+        # statement_timeout fired: fail fast instead of queueing more work.
+        if getattr(exc.orig, "sqlstate", None) == QUERY_CANCELED_SQLSTATE:
+            return _error("The query took too long and was cancelled", status.HTTP_503_SERVICE_UNAVAILABLE)
+        raise exc
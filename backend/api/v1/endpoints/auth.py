@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, status, Body
 from sqlalchemy.ext.asyncio import AsyncSession
-from api.depends import get_current_user, get_db
+from api.depends import get_current_user, get_db, rate_limit
 from services.auth_service import get_profile, login_user, register_user
 from schemas.users import UserCreate, UserOut, UserLogin, TokenOut
 from typing import Annotated
@@ -10,19 +10,21 @@ from models.user import User
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.post("/register",status_code = status.HTTP_201_CREATED, response_model = UserOut, summary = "creates a new user")
+@router.post("/register",status_code = status.HTTP_201_CREATED, response_model = UserOut, summary = "creates a new user",
+             dependencies=[Depends(rate_limit("auth"))])
 async def register(
     user: Annotated[UserCreate, Body(...)],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     ):
     created_user = await register_user(db=db, **user.model_dump())
     return created_user
        
 
-@router.post("/login", status_code = status.HTTP_200_OK, response_model = TokenOut)
+@router.post("/login", status_code = status.HTTP_200_OK, response_model = TokenOut,
+             dependencies=[Depends(rate_limit("auth"))])
 async def login(
     user : UserLogin,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     user_token = await login_user(db=db, **user.model_dump())
     return TokenOut(access_token = user_token,
@@ -30,7 +32,8 @@ async def login(
            
 
 
-@router.get("/me", status_code = status.HTTP_200_OK, response_model = UserOut)
+@router.get("/me", status_code = status.HTTP_200_OK, response_model = UserOut,
+            dependencies=[Depends(rate_limit("default"))])
 async def me(
     user: User = Depends(get_current_user)
 ):
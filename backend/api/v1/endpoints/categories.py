@@ -3,7 +3,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.depends import get_current_user, get_db
+from api.depends import conditional_get, rate_limit, get_current_user, get_db, get_read_db
 from models.user import User
 from schemas.categories import CategoryCreate, CategoryOut
 from services.category import (
@@ -15,12 +15,19 @@ from services.category import (
 )
 
 
-router = APIRouter(prefix="/categories", tags=["Categories"])
+router = APIRouter(
+    prefix="/categories",
+    tags=["Categories"],
+    dependencies=[Depends(rate_limit("default"))],
+)
 
 
-@router.get("", response_model=list[CategoryOut], status_code=status.HTTP_200_OK)
+@router.get(
+    "", response_model=list[CategoryOut], status_code=status.HTTP_200_OK,
+    dependencies=[Depends(conditional_get("categories"))],
+)
 async def list_user_categories(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     return await list_categories(db, user=user)
@@ -29,16 +36,19 @@ async def list_user_categories(
 @router.post("", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
 async def create_user_category(
     payload: CategoryCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     return await create_category(db, user=user, payload=payload.model_dump())
 
 
-@router.get("/{category_id}", response_model=CategoryOut, status_code=status.HTTP_200_OK)
+@router.get(
+    "/{category_id}", response_model=CategoryOut, status_code=status.HTTP_200_OK,
+    dependencies=[Depends(conditional_get("categories"))],
+)
 async def get_user_category(
     category_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     category = await get_category(db, user=user, category_id=category_id)
@@ -54,7 +64,7 @@ async def get_user_category(
 async def update_user_category(
     category_id: int,
     payload: dict[str, Any],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     category = await update_category(db, user=user, category_id=category_id, payload=payload)
@@ -69,7 +79,7 @@ async def update_user_category(
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_category(
     category_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     deleted = await delete_category(db, user=user, category_id=category_id)
@@ -4,7 +4,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.depends import get_current_user, get_db
+from api.depends import conditional_get, rate_limit, get_current_user, get_db, get_read_db
 from models.user import User
 from schemas.expenses import ExpenseIn, ExpenseOut
 from services.expenses import (
@@ -16,10 +16,17 @@ from services.expenses import (
 )
 
 
-router = APIRouter(prefix="/expenses", tags=["Expenses"])
+router = APIRouter(
+    prefix="/expenses",
+    tags=["Expenses"],
+    dependencies=[Depends(rate_limit("default"))],
+)
 
 
-@router.get("", status_code=status.HTTP_200_OK)
+@router.get(
+    "", status_code=status.HTTP_200_OK,
+    dependencies=[Depends(conditional_get("expenses"))],
+)
 async def list_user_expenses(
     page: int | None = Query(default=None),
     limit: int | None = Query(default=None),
@@ -27,7 +34,7 @@ async def list_user_expenses(
     from_date: datetime.datetime | None = Query(default=None),
     to_date: datetime.datetime | None = Query(default=None),
     sort: str | None = Query(default=None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     items, meta = await list_expenses(
@@ -48,16 +55,19 @@ async def list_user_expenses(
 @router.post("", response_model=ExpenseOut, status_code=status.HTTP_201_CREATED)
 async def create_user_expense(
     payload: ExpenseIn,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     return await create_expense(db, user=user, payload=payload.model_dump())
 
 
-@router.get("/{expense_id}", response_model=ExpenseOut, status_code=status.HTTP_200_OK)
+@router.get(
+    "/{expense_id}", response_model=ExpenseOut, status_code=status.HTTP_200_OK,
+    dependencies=[Depends(conditional_get("expenses"))],
+)
 async def get_user_expense(
     expense_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     expense = await get_expense(db, user=user, expense_id=expense_id)
@@ -73,7 +83,7 @@ async def get_user_expense(
 async def update_user_expense(
     expense_id: int,
     payload: dict[str, Any],
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     expense = await update_expense(db, user=user, expense_id=expense_id, payload=payload)
@@ -88,7 +98,7 @@ async def update_user_expense(
 @router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_expense(
     expense_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     existing = await get_expense(db, user=user, expense_id=expense_id)
@@ -1,19 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.depends import get_current_user, get_db
+from api.depends import conditional_get, rate_limit, get_current_user, get_db, get_read_db
 from models.user import User
 from schemas.goals import GoalIn, GoalOut
 from services.goals import get_monthly_goals, get_monthly_progress, set_monthly_goals
 
 
-router = APIRouter(prefix="/goals", tags=["Goals"])
+router = APIRouter(
+    prefix="/goals",
+    tags=["Goals"],
+    dependencies=[Depends(rate_limit("default"))],
+)
 
 
 @router.post("", response_model=GoalOut, status_code=status.HTTP_201_CREATED)
 async def create_goal(
     payload: GoalIn,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     return await set_monthly_goals(db, user=user, goal_limit=payload.goal_limit)
@@ -23,7 +27,7 @@ async def create_goal(
 async def update_goal(
     goal_id: int,
     payload: GoalIn,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     goal = await set_monthly_goals(
@@ -40,9 +44,12 @@ async def update_goal(
     return goal
 
 
-@router.get("", response_model=GoalOut, status_code=status.HTTP_200_OK)
+@router.get(
+    "", response_model=GoalOut, status_code=status.HTTP_200_OK,
+    dependencies=[Depends(conditional_get("goals"))],
+)
 async def get_latest_goal(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     goal = await get_monthly_goals(db, user=user)
@@ -59,8 +66,8 @@ async def get_goal_progress(
     month: int = Query(...),
     year: int | None = Query(default=None),
     goal_id: int | None = Query(default=None),
-    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     progress = await get_monthly_progress(
         db,
@@ -77,10 +84,13 @@ async def get_goal_progress(
     return progress
 
 
-@router.get("/{goal_id}", response_model=GoalOut, status_code=status.HTTP_200_OK)
+@router.get(
+    "/{goal_id}", response_model=GoalOut, status_code=status.HTTP_200_OK,
+    dependencies=[Depends(conditional_get("goals"))],
+)
 async def get_goal_by_id(
     goal_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
     user: User = Depends(get_current_user),
 ):
     goal = await get_monthly_goals(db, user=user, goal_id=goal_id)
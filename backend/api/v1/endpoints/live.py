@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from api.depends import get_current_user, rate_limit
+from core.config import settings
+from core.live import event_stream
+from core.security import decode_access_token, oauth2_scheme
+from models.user import User
+
+
+router = APIRouter(
+    prefix="/live",
+    tags=["Live"],
+    dependencies=[Depends(rate_limit("default"))],
+)
+
+
+@router.get("", status_code=status.HTTP_200_OK)
+async def stream_live_updates(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    user: User = Depends(get_current_user),
+):
+    """Server-Sent Events with dashboard deltas for the user's writes.
+
+    The user lookup's session closes before streaming starts, so an open
+    stream holds no database connection.
+    """
+    expires_at = decode_access_token(token).get("exp")
+    hub = getattr(request.app.state, "live", None)
+    if hub is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live updates are disabled",
+        )
+    return StreamingResponse(
+        event_stream(hub, user.id, keepalive=settings.LIVE_KEEPALIVE_SECONDS, expires_at=expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.depends import rate_limit, get_current_user, get_db, get_read_db
+from models.user import User
+from schemas.recurring import RecurringExpenseIn, RecurringExpenseOut, RecurringExpenseUpdate
+from services.recurring import (
+    create_recurring_expense,
+    delete_recurring_expense,
+    get_recurring_expense,
+    list_recurring_expenses,
+    update_recurring_expense,
+)
+
+
+router = APIRouter(
+    prefix="/recurring-expenses",
+    tags=["Recurring expenses"],
+    dependencies=[Depends(rate_limit("default"))],
+)
+
+
+def _not_found(rule_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Recurring expense with id '{rule_id}' not found",
+    )
+
+
+@router.get("", response_model=list[RecurringExpenseOut], status_code=status.HTTP_200_OK)
+async def list_user_recurring_expenses(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    return await list_recurring_expenses(db, user=user)
+
+
+@router.post("", response_model=RecurringExpenseOut, status_code=status.HTTP_201_CREATED)
+async def create_user_recurring_expense(
+    payload: RecurringExpenseIn,
+    db: AsyncSession = Depends(get_db, scope="function"),
+    user: User = Depends(get_current_user),
+):
+    return await create_recurring_expense(db, user=user, payload=payload.model_dump())
+
+
+@router.get("/{rule_id}", response_model=RecurringExpenseOut, status_code=status.HTTP_200_OK)
+async def get_user_recurring_expense(
+    rule_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+):
+    rule = await get_recurring_expense(db, user=user, rule_id=rule_id)
+    if rule is None:
+        raise _not_found(rule_id)
+    return rule
+
+
+@router.patch("/{rule_id}", response_model=RecurringExpenseOut, status_code=status.HTTP_200_OK)
+async def update_user_recurring_expense(
+    rule_id: int,
+    payload: RecurringExpenseUpdate,
+    db: AsyncSession = Depends(get_db, scope="function"),
+    user: User = Depends(get_current_user),
+):
+    rule = await update_recurring_expense(
+        db, user=user, rule_id=rule_id, payload=payload.model_dump(exclude_unset=True)
+    )
+    if rule is None:
+        raise _not_found(rule_id)
+    return rule
+
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_user_recurring_expense(
+    rule_id: int,
+    db: AsyncSession = Depends(get_db, scope="function"),
+    user: User = Depends(get_current_user),
+):
+    if not await delete_recurring_expense(db, user=user, rule_id=rule_id):
+        raise _not_found(rule_id)
+    return None
@@ -1,18 +1,22 @@
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.depends import get_current_user, get_db
+from api.depends import get_current_user, get_read_db, rate_limit, statement_budget
 from models.user import User
 from services.report import get_monthly_report
 
 
-router = APIRouter(prefix="/reports", tags=["Reports"])
+router = APIRouter(
+    prefix="/reports",
+    tags=["Reports"],
+    dependencies=[Depends(rate_limit("report")), Depends(statement_budget("report"))],
+)
 
 
 @router.get("/monthly", status_code=status.HTTP_200_OK)
 async def monthly_report(
     month: int = Query(...),
-    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
 ):
     return await get_monthly_report(db, user, month=month)
@@ -1,19 +1,151 @@
-from fastapi import FastAPI
+import functools
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from api.exception_handlers import register_exception_handlers
 from api.v1.api import api_router
-from core.logging import setup_logging
+from core.capture import build_capture
+from core.config import Settings, configure, get_settings, settings_in_use
+from core.live import build_live_hub, use_hub
+from core.logging import setup_logging, stop_logging
+from core.loop_monitor import LoopMonitor
+from core.metrics import CONTENT_TYPE_LATEST, registry
 from core.middleware import register_middleware
+from core.rate_limit import build_limiter
+from core.security import password_hasher
+from core.tasks import build_task_queue, use_queue
+from core.tracing import build_exporter, use_exporter
+from db.session import Database
+from services import side_effects  # noqa: F401  registers the task handlers
+from services.health import ReadinessCache, check_readiness
+from services.scheduler import build_scheduler
+from services.warmup import Warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the worker's resources on startup and release them on shutdown.
 
-app = FastAPI()
+    Each resource is registered on the exit stack as soon as it exists, so
+    if a later startup step fails the ones already started are still
+    stopped, in reverse order.
+    """
+    settings = app.state.settings
+    async with AsyncExitStack() as stack:
+        stack.enter_context(settings_in_use(settings))
+        setup_logging("INFO")
+        stack.callback(stop_logging)
+        use_exporter(build_exporter(settings.TRACE_EXPORTER))
+        stack.callback(use_exporter, None)
+        password_hasher()
+        database = Database(settings)
+        app.state.database = database
+        stack.push_async_callback(database.dispose)
+        app.state.limiter = build_limiter(settings)
+        stack.push_async_callback(app.state.limiter.close)
+        app.state.capture = build_capture(settings)
+        if app.state.capture is not None:
+            stack.callback(app.state.capture.close)
+        app.state.live = build_live_hub(settings, database)
+        if app.state.live is not None:
+            app.state.live.start()
+            stack.push_async_callback(app.state.live.close)
+            use_hub(app.state.live)
+            stack.callback(use_hub, None)
+        app.state.tasks = build_task_queue(settings, database)
+        if app.state.tasks is not None:
+            app.state.tasks.start()
+            stack.push_async_callback(app.state.tasks.stop)
+            use_queue(app.state.tasks)
+            stack.callback(use_queue, None)
+        app.state.scheduler = build_scheduler(settings, database)
+        if app.state.scheduler is not None:
+            app.state.scheduler.start()
+            stack.push_async_callback(app.state.scheduler.stop)
+        warmup = None
+        if settings.WARMUP_ENABLED:
+            warmup = Warmup(
+                database,
+                connections=settings.WARMUP_CONNECTIONS,
+                timeout=settings.WARMUP_TIMEOUT_SECONDS,
+            )
+            warmup.start()
+            stack.push_async_callback(warmup.stop)
+        app.state.readiness = ReadinessCache(
+            functools.partial(check_readiness, database, warmup), ttl=settings.HEALTH_CACHE_SECONDS
+        )
 
-setup_logging("INFO")
-register_middleware(app)
-register_exception_handlers(app)
-app.include_router(api_router)
+        if settings.LOOP_MONITOR_ENABLED:
+            monitor = LoopMonitor(
+                interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+                threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+            )
+            monitor.start()
+            stack.push_async_callback(monitor.stop)
+        yield
 
 
-@app.get("/health")
 async def get_health():
     """Lightweight health-check endpoint."""
     return {"health": "ok"}
+
+
+async def get_liveness():
+    """The process is up and its event loop is serving requests."""
+    return {"status": "ok"}
+
+
+async def get_readiness(request: Request):
+    """Whether this worker can serve traffic: database reachable, pool not
+    exhausted and schema migrated to this build's head. Cached briefly."""
+    result = await request.app.state.readiness.get()
+    status_code = 200 if result["status"] == "ok" else 503
+    return JSONResponse(result, status_code=status_code, headers={"Cache-Control": "no-store"})
+
+
+async def get_metrics():
+    """Prometheus text exposition, aggregated across worker processes."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build the application.
+
+    Importing this module has no side effects: settings are read here (or
+    passed in), and the engine, password hasher, rate limiter and readiness
+    cache are created in the lifespan. Run with
+    ``uvicorn app.main:create_app --factory``.
+
+    Settings are process-wide (``core.config.settings``), so one process
+    runs one app: they can be replaced until an app starts, and creating or
+    starting an app with other settings while one runs raises RuntimeError.
+    """
+    if settings is not None:
+        configure(settings)
+    settings = get_settings()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+    register_middleware(app)
+    register_exception_handlers(app)
+    app.include_router(api_router)
+    app.add_api_route("/health", get_health, methods=["GET"])
+    app.add_api_route("/health/live", get_liveness, methods=["GET"])
+    app.add_api_route("/health/ready", get_readiness, methods=["GET"])
+    app.add_api_route("/metrics", get_metrics, methods=["GET"], include_in_schema=False)
+    return app
+
+
+@functools.cache
+def _default_app() -> FastAPI:
+    return create_app()
+
+
+def __getattr__(name: str):
+    # ``from app.main import app`` (and uvicorn app.main:app) still work; the
+    # instance is only built when first asked for.
+    if name == "app":
+        return _default_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
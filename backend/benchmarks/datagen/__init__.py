@@ -0,0 +1,13 @@
+"""Fast synthetic data for benchmarks, loaded with COPY.
+
+Generates users, categories and expenses with realistic shapes (seasonal
+spend, heavy-tailed amounts, recurring merchants and bills) and streams them
+into Postgres with COPY from several worker processes, bypassing the ORM and
+its ``@validates`` hooks:
+
+    cd backend && python -m benchmarks.datagen --users 100000 --expenses-per-user 200 --workers 8
+
+The output depends only on ``--seed`` and the sizes, not on ``--workers``.
+Users are ``bench<n>@bench.invalid``, the same accounts the load benchmark
+uses, so ``python -m benchmarks.load run --reuse`` can drive them.
+"""
@@ -0,0 +1,174 @@
+import argparse
+import datetime
+import multiprocessing
+import os
+import sys
+import time
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from benchmarks.datagen import __doc__ as USAGE
+from benchmarks.datagen.distributions import (
+    CATEGORY_NAMES,
+    generate_expenses,
+    months_back,
+    user_rng,
+)
+from benchmarks.load.seed import EMAIL_DOMAIN, PASSWORD
+from core.config import get_settings
+from core.security import hash_password
+
+
+EXPENSE_INDEX = "ix_expenses_user_id_occurred_at"
+USERS_PER_TASK = 500
+
+_connection: psycopg.Connection | None = None
+_job: dict = {}
+
+
+def conninfo() -> str:
+    url = make_url(get_settings().db_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+def category_ids(category_base: int, user_index: int) -> dict[str, int]:
+    first = category_base + user_index * len(CATEGORY_NAMES) + 1
+    return {name: first + offset for offset, name in enumerate(CATEGORY_NAMES)}
+
+
+def _init_worker(job: dict) -> None:
+    global _connection, _job
+    _connection = psycopg.connect(job["conninfo"])
+    _job = job
+
+
+def _load_expenses(user_range: range) -> int:
+    """Generate and COPY the expenses of one slice of users (runs in a worker)."""
+    months = _job["months"]
+    rows = 0
+    with _connection.transaction(), _connection.cursor() as cursor:
+        with cursor.copy(
+            "COPY expenses (user_id, category_id, amount, occurred_at, title, note) FROM STDIN"
+        ) as copy:
+            for user_index in user_range:
+                user_id = _job["user_base"] + user_index + 1
+                expenses = generate_expenses(
+                    user_rng(_job["seed"], user_index),
+                    category_ids(_job["category_base"], user_index),
+                    _job["expenses_per_user"],
+                    months,
+                )
+                copy.write(
+                    "".join(
+                        f"{user_id}\t{category_id}\t{amount}\t{occurred_at}\t{title}\t\n"
+                        for category_id, amount, occurred_at, title in expenses
+                    )
+                )
+                rows += len(expenses)
+    return rows
+
+
+def load_accounts(conn: psycopg.Connection, users: int, seed: int) -> tuple[int, int]:
+    """Replace the bench users and COPY users, categories and goals; return id bases."""
+    password_hash = hash_password(PASSWORD)
+    now = datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%d %H:%M:%S")
+    with conn.transaction(), conn.cursor() as cursor:
+        cursor.execute("DELETE FROM users WHERE email LIKE %s", (f"%@{EMAIL_DOMAIN}",))
+        cursor.execute("LOCK TABLE users, categories IN SHARE ROW EXCLUSIVE MODE")
+        user_base = cursor.execute("SELECT COALESCE(max(id), 0) FROM users").fetchone()[0]
+        category_base = cursor.execute("SELECT COALESCE(max(id), 0) FROM categories").fetchone()[0]
+
+        with cursor.copy(
+            "COPY users (id, username, email, password_hash, created_at) FROM STDIN"
+        ) as copy:
+            for n in range(users):
+                copy.write_row(
+                    (user_base + n + 1, f"bench{n}", f"bench{n}@{EMAIL_DOMAIN}", password_hash, now)
+                )
+        with cursor.copy("COPY categories (id, user_id, name, description) FROM STDIN") as copy:
+            for n in range(users):
+                for name, category_id in category_ids(category_base, n).items():
+                    copy.write_row((category_id, user_base + n + 1, name, f"{name} spending"))
+        with cursor.copy("COPY goals (user_id, goal_limit, created_at) FROM STDIN") as copy:
+            for n in range(users):
+                limit = user_rng(seed, n).choice((800.0, 1500.0, 2500.0, 4000.0))
+                copy.write_row((user_base + n + 1, limit, now))
+
+        # Explicit ids bypassed the sequences; move them past what was loaded.
+        for table in ("users", "categories"):
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT COALESCE(max(id), 1) FROM {table}))"
+            )
+    return user_base, category_base
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.datagen",
+        description=USAGE,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--expenses-per-user", type=int, default=200, help="average; varies per user")
+    parser.add_argument("--months", type=int, default=24, help="history length ending this month")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--defer-index",
+        action="store_true",
+        help=f"drop {EXPENSE_INDEX} during the load and rebuild it afterwards",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with psycopg.connect(conninfo()) as conn:
+        user_base, category_base = load_accounts(conn, args.users, args.seed)
+        print(f"Loaded {args.users} users in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        if args.defer_index:
+            conn.execute(f"DROP INDEX IF EXISTS {EXPENSE_INDEX}")
+            conn.commit()
+
+    job = {
+        "conninfo": conninfo(),
+        "seed": args.seed,
+        "expenses_per_user": args.expenses_per_user,
+        "months": months_back(datetime.date.today(), args.months),
+        "user_base": user_base,
+        "category_base": category_base,
+    }
+    slices = [
+        range(start, min(start + USERS_PER_TASK, args.users))
+        for start in range(0, args.users, USERS_PER_TASK)
+    ]
+    expenses = 0
+    load_started = time.perf_counter()
+    with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(job,)) as pool:
+        for done, rows in enumerate(pool.imap_unordered(_load_expenses, slices), start=1):
+            expenses += rows
+            elapsed = time.perf_counter() - load_started
+            rate = expenses / elapsed
+            print(
+                f"\r{done}/{len(slices)} slices, {expenses:,} expenses, {rate:,.0f} rows/s",
+                end="",
+                file=sys.stderr,
+            )
+    print(file=sys.stderr)
+
+    with psycopg.connect(conninfo(), autocommit=True) as conn:
+        if args.defer_index:
+            print(f"Rebuilding {EXPENSE_INDEX}...", file=sys.stderr)
+            conn.execute(f"CREATE INDEX {EXPENSE_INDEX} ON expenses (user_id, occurred_at)")
+        conn.execute("ANALYZE users, categories, goals, expenses")
+
+    total = time.perf_counter() - started
+    print(
+        f"Done: {args.users:,} users, {expenses:,} expenses in {total:.1f}s "
+        f"({expenses / total:,.0f} expenses/s overall)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Per-user expense generation with realistic distributions.
+
+Everything a user gets is drawn from a generator seeded by ``(seed,
+user_index)``, so a user's rows are identical however the work is split
+between processes.
+"""
+
+import calendar
+import datetime
+import itertools
+import math
+import random
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CategoryProfile:
+    name: str
+    # Log-normal amount parameters: median exp(mu), tail grows with sigma.
+    mu: float
+    sigma: float
+    # Share of a user's discretionary purchases that land in this category.
+    share: float
+    merchants: tuple[str, ...]
+    # Extra weight per month (1-12) on top of the global season.
+    season: dict[int, float] | None = None
+
+
+DISCRETIONARY = (
+    CategoryProfile(
+        "Groceries", 3.6, 0.55, 0.34,
+        ("FreshMart", "Corner Grocer", "BulkBarn", "Farmers Market", "Organic Co"),
+    ),
+    CategoryProfile(
+        "Dining", 3.1, 0.6, 0.2,
+        ("Noodle Bar", "Cafe Latte", "Pizza Place", "Sushi Go", "Burger Hut", "Taco Stand"),
+    ),
+    CategoryProfile("Transport", 2.8, 0.7, 0.16, ("Metro Card", "RideShare", "Fuel Stop", "Parking")),
+    CategoryProfile(
+        "Shopping", 3.7, 0.95, 0.12,
+        ("MegaStore", "Online Market", "Shoe Shop", "Electronics Hub"),
+        {11: 1.6, 12: 1.8},
+    ),
+    CategoryProfile("Entertainment", 3.0, 0.7, 0.08, ("Cinema", "Concert Hall", "Game Store", "Bowling")),
+    CategoryProfile("Health", 3.4, 0.9, 0.05, ("Pharmacy", "Dentist", "Clinic")),
+    CategoryProfile(
+        "Travel", 5.2, 1.1, 0.03,
+        ("Airline", "Hotel", "Car Rental", "Rail"),
+        {6: 1.8, 7: 2.2, 8: 2.0, 12: 1.5},
+    ),
+    CategoryProfile("Gifts", 3.8, 0.8, 0.02, ("Gift Shop", "Florist", "Bookstore"), {2: 1.5, 12: 4.0}),
+)
+
+# Recurring bills: (category, title, median amount, sigma of the per-user price, day of month)
+BILLS = (
+    ("Rent", "Rent", 1200.0, 0.35, 1),
+    ("Utilities", "Power & Water", 110.0, 0.3, 15),
+    ("Utilities", "Internet", 55.0, 0.2, 20),
+)
+SUBSCRIPTIONS = (
+    ("Streaming", 15.99), ("Music", 10.99), ("Gym", 39.0), ("Cloud Storage", 2.99), ("News", 8.0),
+)
+SUBSCRIPTION_CATEGORY = "Entertainment"
+
+# Spend by month: a January dip, a summer bump and the December peak.
+SEASON = {
+    1: 0.8, 2: 0.85, 3: 0.95, 4: 1.0, 5: 1.0, 6: 1.05,
+    7: 1.1, 8: 1.05, 9: 0.95, 10: 1.0, 11: 1.15, 12: 1.4,
+}
+
+CATEGORY_NAMES = tuple(
+    dict.fromkeys([profile.name for profile in DISCRETIONARY] + [bill[0] for bill in BILLS])
+)
+
+
+def months_back(end: datetime.date, count: int) -> list[tuple[int, int]]:
+    """(year, month) pairs for the ``count`` months ending with ``end``'s month."""
+    months = []
+    year, month = end.year, end.month
+    for _ in range(count):
+        months.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def zipf_weights(count: int, exponent: float = 1.2) -> list[float]:
+    """A few favourite merchants take most of the visits."""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def _amount(rng: random.Random, mu: float, sigma: float) -> float:
+    return max(0.01, round(rng.lognormvariate(mu, sigma), 2))
+
+
+def _timestamp(rng: random.Random, year: int, month: int, day: int | None = None) -> str:
+    days = calendar.monthrange(year, month)[1]
+    day = min(day, days) if day else rng.randint(1, days)
+    # Purchases cluster in the daytime and evening.
+    hour = min(23, max(6, int(rng.gauss(15, 4))))
+    minute, second = rng.randrange(60), rng.randrange(60)
+    return f"{year:04d}-{month:02d}-{day:02d} {hour:02d}:{minute:02d}:{second:02d}"
+
+
+def user_rng(seed: int, user_index: int) -> random.Random:
+    return random.Random(seed * 1_000_003 + user_index)
+
+
+def generate_expenses(
+    rng: random.Random,
+    category_ids: dict[str, int],
+    expenses_per_user: int,
+    months: list[tuple[int, int]],
+) -> list[tuple[int, float, str, str]]:
+    """One user's expenses as ``(category_id, amount, occurred_at, title)``.
+
+    Activity varies a lot between users (log-normal around
+    ``expenses_per_user``); bills and subscriptions recur every month at a
+    fixed price and day, and the rest is spread by season.
+    """
+    rows = []
+    for category, title, median, sigma, day in BILLS:
+        if category == "Rent" and rng.random() < 0.3:
+            continue  # not everyone rents
+        price = _amount(rng, math.log(median), sigma)
+        for year, month in months:
+            jitter = 1 + rng.uniform(-0.08, 0.08) if category == "Utilities" else 1
+            timestamp = _timestamp(rng, year, month, day)
+            rows.append((category_ids[category], round(price * jitter, 2), timestamp, title))
+    for title, price in rng.sample(SUBSCRIPTIONS, rng.randint(1, 4)):
+        day = rng.randint(1, 28)
+        for year, month in months:
+            timestamp = _timestamp(rng, year, month, day)
+            rows.append((category_ids[SUBSCRIPTION_CATEGORY], price, timestamp, title))
+
+    target = max(len(rows), int(expenses_per_user * rng.lognormvariate(-0.18, 0.6)))
+    remaining = target - len(rows)
+    if remaining <= 0 or not months:
+        return rows
+
+    # Cumulative weights are built once per user; choices() with cum_weights
+    # is the hot loop when generating millions of rows.
+    merchants = {
+        profile.name: rng.sample(profile.merchants, len(profile.merchants)) for profile in DISCRETIONARY
+    }
+    merchant_weights = {
+        name: list(itertools.accumulate(zipf_weights(len(names)))) for name, names in merchants.items()
+    }
+    shares = [profile.share * rng.uniform(0.5, 1.5) for profile in DISCRETIONARY]
+    profile_weights = {
+        month: list(itertools.accumulate(
+            share * (profile.season or {}).get(month, 1.0) for share, profile in zip(shares, DISCRETIONARY)
+        ))
+        for month in {month for _, month in months}
+    }
+    month_weights = list(itertools.accumulate(SEASON[month] for _, month in months))
+    for year, month in rng.choices(months, cum_weights=month_weights, k=remaining):
+        profile = rng.choices(DISCRETIONARY, cum_weights=profile_weights[month])[0]
+        title = rng.choices(merchants[profile.name], cum_weights=merchant_weights[profile.name])[0]
+        rows.append((
+            category_ids[profile.name],
+            _amount(rng, profile.mu, profile.sigma),
+            _timestamp(rng, year, month),
+            title,
+        ))
+    return rows
@@ -0,0 +1,12 @@
+"""End-to-end load benchmark against a local Postgres.
+
+Seeds synthetic users, categories, goals and expenses, then drives the real
+ASGI app (lifespan, middleware, pool and all) in-process with concurrent
+httpx clients running scripted user journeys:
+
+    cd backend && python -m benchmarks.load run --users 50 --duration 30 --output head.json
+    python -m benchmarks.load compare base.json head.json
+
+Each run writes per-endpoint request counts, errors, RPS and p50/p95/p99
+latency as JSON, tagged with the current commit.
+"""
@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import sys
+import time
+from dataclasses import replace
+
+import httpx
+
+from app.main import create_app
+from benchmarks.load import __doc__ as USAGE, journeys
+from benchmarks.load.report import Recorder, build_report, compare, format_comparison
+from benchmarks.load.seed import load_seeded, seed
+from core.config import read_settings
+from core.security import create_access_token
+
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "db"}
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = await client.get("/health/ready")
+        if response.status_code == 200:
+            return
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"App not ready after {timeout}s: {response.text}")
+
+
+async def virtual_user(client, recorder, users, tokens, rng, deadline) -> None:
+    while time.monotonic() < deadline:
+        user = rng.choice(users)
+        api = journeys.JourneyClient(client, recorder, user, tokens[user.id])
+        await journeys.pick_journey(rng)(api, rng)
+
+
+async def run(args) -> dict:
+    # Read, not installed: create_app installs the overridden copy.
+    settings = read_settings()
+    if settings.POSTGRES_HOST not in LOCAL_HOSTS and not args.allow_remote:
+        raise SystemExit(
+            f"Refusing to seed {settings.POSTGRES_HOST}; pass --allow-remote to benchmark it."
+        )
+    # The limiter would turn most of the load into 429s.
+    settings = replace(settings, RATE_LIMIT_ENABLED=args.rate_limit)
+    app = create_app(settings)
+
+    async with app.router.lifespan_context(app):
+        if args.reuse:
+            users = await load_seeded(app.state.database.engine)
+            if not users:
+                raise SystemExit("No benchmark users found; run benchmarks.datagen first.")
+        else:
+            print(
+                f"Seeding {args.users} users x {args.expenses_per_user} expenses...",
+                file=sys.stderr,
+            )
+            users = await seed(
+                app.state.database.engine,
+                users=args.users,
+                categories=args.categories,
+                expenses_per_user=args.expenses_per_user,
+                seed=args.seed,
+            )
+        lifetime = datetime.timedelta(seconds=args.duration + 300)
+        tokens = {user.id: create_access_token(user.email, lifetime) for user in users}
+
+        transport = httpx.ASGITransport(app=app)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", limits=limits, timeout=60
+        ) as client:
+            await wait_until_ready(client, timeout=60)
+            recorder = Recorder()
+            print(
+                f"Running {args.concurrency} virtual users for {args.duration}s...", file=sys.stderr
+            )
+            started = time.monotonic()
+            deadline = started + args.duration
+            await asyncio.gather(
+                *(
+                    virtual_user(
+                        client, recorder, users, tokens, random.Random(args.seed + n), deadline
+                    )
+                    for n in range(args.concurrency)
+                )
+            )
+            elapsed = time.monotonic() - started
+
+    config = {
+        key: getattr(args, key)
+        for key in (
+            "users", "categories", "expenses_per_user", "concurrency", "duration", "seed", "rate_limit"
+        )
+    }
+    config["reuse"] = args.reuse
+    config["seeded_users"] = len(users)
+    config["db_pool_size"] = settings.DB_POOL_SIZE
+    config["db_max_overflow"] = settings.DB_MAX_OVERFLOW
+    return build_report(recorder, elapsed, config)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description=USAGE,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed the database and drive the app")
+    run_parser.add_argument("--users", type=int, default=50)
+    run_parser.add_argument("--categories", type=int, default=8)
+    run_parser.add_argument("--expenses-per-user", type=int, default=500)
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="skip seeding and drive the bench users already loaded by benchmarks.datagen",
+    )
+    run_parser.add_argument("--rate-limit", action="store_true", help="keep rate limiting on")
+    run_parser.add_argument("--allow-remote", action="store_true")
+    run_parser.add_argument("--output", help="write the JSON report here instead of stdout")
+
+    compare_parser = commands.add_parser("compare", help="diff two JSON reports")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.base) as base, open(args.head) as head:
+            print(format_comparison(compare(json.load(base), json.load(head))))
+        return
+
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
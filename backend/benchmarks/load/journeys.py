@@ -0,0 +1,94 @@
+"""Scripted user journeys, each a short sequence of API calls.
+
+Endpoints are labelled by route template so per-endpoint numbers aggregate
+across ids and query strings.
+"""
+
+import asyncio
+import datetime
+import random
+import time
+
+import httpx
+
+from benchmarks.load.report import Recorder
+from benchmarks.load.seed import SeededUser
+
+
+API = "/api/v1"
+
+
+class JourneyClient:
+    """An httpx client for one seeded user that records every call."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, user: SeededUser, token: str):
+        self.client = client
+        self.recorder = recorder
+        self.user = user
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def call(self, endpoint: str, method: str, path: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, API + path, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(endpoint, time.perf_counter() - start, ok=False)
+            return None
+        self.recorder.record(endpoint, time.perf_counter() - start, ok=response.status_code < 400)
+        return response
+
+
+def current_month() -> int:
+    return datetime.datetime.now(datetime.UTC).month
+
+
+async def dashboard(api: JourneyClient, rng: random.Random) -> None:
+    """The dashboard fires its four queries in parallel, like the frontend."""
+    month = current_month()
+    await asyncio.gather(
+        api.call("GET /reports/monthly", "GET", "/reports/monthly", params={"month": month}),
+        api.call("GET /goals", "GET", "/goals"),
+        api.call("GET /goals/progress", "GET", "/goals/progress", params={"month": month}),
+        api.call(
+            "GET /expenses",
+            "GET",
+            "/expenses",
+            params={"page": 1, "limit": 5, "sort": "-occurred_at"},
+        ),
+    )
+
+
+async def list_paging(api: JourneyClient, rng: random.Random) -> None:
+    for page in range(1, rng.randint(2, 4) + 1):
+        await api.call("GET /expenses", "GET", "/expenses", params={"page": page, "limit": 20})
+
+
+async def create_expense(api: JourneyClient, rng: random.Random) -> None:
+    payload = {
+        "category_id": rng.choice(api.user.category_ids),
+        "amount": round(rng.uniform(1.0, 120.0), 2),
+        "occurred_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "title": "Load test",
+        "note": "",
+    }
+    await api.call("POST /expenses", "POST", "/expenses", json=payload)
+    await api.call("GET /expenses", "GET", "/expenses", params={"page": 1, "limit": 20})
+
+
+async def monthly_report(api: JourneyClient, rng: random.Random) -> None:
+    await api.call(
+        "GET /reports/monthly", "GET", "/reports/monthly", params={"month": rng.randint(1, 12)}
+    )
+
+
+# Relative frequency of each journey in the mix.
+JOURNEYS = {
+    dashboard: 4,
+    list_paging: 3,
+    create_expense: 1.5,
+    monthly_report: 1.5,
+}
+
+
+def pick_journey(rng: random.Random):
+    return rng.choices(list(JOURNEYS), weights=list(JOURNEYS.values()))[0]
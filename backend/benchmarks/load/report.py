@@ -0,0 +1,99 @@
+"""Latency recording, summaries and run-to-run comparison."""
+
+import datetime
+import math
+import platform
+import subprocess
+from collections import defaultdict
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Latency samples (seconds) and error counts per endpoint label."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.samples[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+
+def summarize(samples: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(samples)
+    summary = {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(ordered, pct) * 1000, 2)
+    return summary
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(recorder: Recorder, elapsed: float, config: dict) -> dict:
+    all_samples = [value for values in recorder.samples.values() for value in values]
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": config,
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize(all_samples, sum(recorder.errors.values()), elapsed),
+        "endpoints": {
+            endpoint: summarize(values, recorder.errors[endpoint], elapsed)
+            for endpoint, values in sorted(recorder.samples.items())
+        },
+    }
+
+
+def compare(base: dict, head: dict) -> list[dict]:
+    """Per-endpoint change from ``base`` to ``head`` (positive pct = slower / more)."""
+    rows = []
+    for endpoint in sorted(set(base["endpoints"]) | set(head["endpoints"])):
+        before = base["endpoints"].get(endpoint)
+        after = head["endpoints"].get(endpoint)
+        row = {"endpoint": endpoint}
+        for key in ("rps", *(f"p{pct}_ms" for pct in PERCENTILES)):
+            old = before.get(key) if before else None
+            new = after.get(key) if after else None
+            change = None
+            if old and new is not None:
+                change = round((new - old) / old * 100, 1)
+            row[key] = {"base": old, "head": new, "change_pct": change}
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    keys = ("rps", *(f"p{pct}_ms" for pct in PERCENTILES))
+    lines = [f"{'endpoint':<34}" + "".join(f"{key:>22}" for key in keys)]
+    for row in rows:
+        cells = []
+        for key in keys:
+            cell = row[key]
+            change = "" if cell["change_pct"] is None else f" ({cell['change_pct']:+.1f}%)"
+            cells.append(f"{cell['base']} -> {cell['head']}{change}".rjust(22))
+        lines.append(f"{row['endpoint']:<34}" + "".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,123 @@
+"""Synthetic benchmark data, written with batched core inserts.
+
+Benchmark users share the ``@bench.invalid`` email domain so a re-seed can
+delete exactly them (and, by cascade, their rows) without touching anyone
+else's data.
+"""
+
+import datetime
+import random
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.security import hash_password
+from models.categories import Category
+from models.expense import Expense
+from models.goals import Goal
+from models.user import User
+
+
+EMAIL_DOMAIN = "bench.invalid"
+PASSWORD = "bench-password"
+CATEGORY_NAMES = (
+    "Groceries", "Rent", "Transport", "Dining", "Utilities", "Health",
+    "Entertainment", "Travel", "Shopping", "Education", "Gifts", "Insurance",
+)
+TITLES = ("Card payment", "Online order", "Subscription", "Cash", "Transfer", "Refill")
+BATCH_SIZE = 5_000
+
+
+@dataclass
+class SeededUser:
+    id: int
+    email: str
+    category_ids: list[int] = field(default_factory=list)
+
+
+async def seed(
+    engine: AsyncEngine,
+    *,
+    users: int,
+    categories: int,
+    expenses_per_user: int,
+    seed: int = 0,
+) -> list[SeededUser]:
+    """Replace the benchmark users' data and return who was created."""
+    rng = random.Random(seed)
+    password_hash = hash_password(PASSWORD)
+    now = datetime.datetime.now(datetime.UTC)
+    categories = min(categories, len(CATEGORY_NAMES))
+
+    async with engine.begin() as conn:
+        await conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+
+        user_rows = [
+            {
+                "username": f"bench{n}",
+                "email": f"bench{n}@{EMAIL_DOMAIN}",
+                "password_hash": password_hash,
+                "created_at": now,
+            }
+            for n in range(users)
+        ]
+        result = await conn.execute(
+            insert(User).returning(User.id, User.email, sort_by_parameter_order=True), user_rows
+        )
+        seeded = [SeededUser(id=row.id, email=row.email) for row in result]
+        by_id = {user.id: user for user in seeded}
+
+        category_rows = [
+            {"user_id": user.id, "name": name, "description": f"{name} spending"}
+            for user in seeded
+            for name in CATEGORY_NAMES[:categories]
+        ]
+        result = await conn.execute(
+            insert(Category).returning(Category.id, Category.user_id, sort_by_parameter_order=True),
+            category_rows,
+        )
+        for row in result:
+            by_id[row.user_id].category_ids.append(row.id)
+
+        await conn.execute(
+            insert(Goal),
+            [{"user_id": user.id, "goal_limit": rng.choice((800.0, 1500.0, 3000.0))} for user in seeded],
+        )
+
+        batch = []
+        for user in seeded:
+            for _ in range(expenses_per_user):
+                batch.append(
+                    {
+                        "user_id": user.id,
+                        "category_id": rng.choice(user.category_ids),
+                        "amount": round(rng.uniform(1.0, 250.0), 2),
+                        "occurred_at": now - datetime.timedelta(minutes=rng.randrange(365 * 24 * 60)),
+                        "title": rng.choice(TITLES),
+                        "note": "",
+                    }
+                )
+                if len(batch) >= BATCH_SIZE:
+                    await conn.execute(insert(Expense), batch)
+                    batch = []
+        if batch:
+            await conn.execute(insert(Expense), batch)
+
+    return seeded
+
+
+async def load_seeded(engine: AsyncEngine) -> list[SeededUser]:
+    """The benchmark users already in the database (e.g. from benchmarks.datagen)."""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(User.id, User.email, Category.id)
+            .join(Category, Category.user_id == User.id)
+            .where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+            .order_by(User.id, Category.id)
+        )
+        users: dict[int, SeededUser] = {}
+        for user_id, email, category_id in result:
+            user = users.setdefault(user_id, SeededUser(id=user_id, email=email))
+            user.category_ids.append(category_id)
+    return list(users.values())
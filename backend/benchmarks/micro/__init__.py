@@ -0,0 +1,14 @@
+"""Microbenchmarks for the pure service-layer functions, with stored baselines.
+
+Times the report aggregations, the expense validators and schema
+serialization on generated inputs of several sizes, and compares each case
+against ``baseline.json``:
+
+    cd backend && python -m benchmarks.micro run
+    python -m benchmarks.micro run --save      # record a new baseline
+
+``run`` exits non-zero when a case is slower than its baseline by more than
+``--tolerance`` (25% by default). Timings are normalized by a fixed
+calibration loop measured alongside them, so a baseline recorded on one
+machine stays usable, if noisier, on another.
+"""
@@ -0,0 +1,70 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.micro import __doc__ as USAGE
+from benchmarks.micro.cases import CASES, SIZES
+from benchmarks.micro.harness import DEFAULT_TOLERANCE, check, format_comparison, run
+
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.micro",
+        description=USAGE,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="show the cases")
+
+    run_parser = commands.add_parser("run", help="time the cases and compare with the baseline")
+    run_parser.add_argument("-k", dest="match", help="only cases whose name contains this")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    run_parser.add_argument("--baseline", type=Path, default=BASELINE)
+    run_parser.add_argument("--save", action="store_true", help="write the results as the baseline")
+    run_parser.add_argument("--output", type=Path, help="also write the results as JSON here")
+
+    args = parser.parse_args()
+    if args.command == "list":
+        print("\n".join(CASES))
+        return
+
+    names = [name for name in CASES if not args.match or args.match in name]
+    results = run(names, tuple(args.sizes))
+
+    if args.save:
+        if args.baseline.exists():
+            # Keep the cases this run skipped (-k / --sizes).
+            previous = json.loads(args.baseline.read_text())
+            scale = results["calibration_us"] / previous["calibration_us"]
+            kept = {
+                name: round(value * scale, 3)
+                for name, value in previous["cases_us"].items()
+                if name not in results["cases_us"]
+            }
+            results["cases_us"] = {**kept, **results["cases_us"]}
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved {len(results['cases_us'])} cases to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        raise SystemExit(f"No baseline at {args.baseline}; record one with --save.")
+    rows = check(json.loads(args.baseline.read_text()), results, args.tolerance)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(format_comparison(rows), flush=True)
+    regressed = [row["case"] for row in rows if row["status"] == "regressed"]
+    if regressed:
+        print(
+            f"\n{len(regressed)} case(s) regressed by more than {args.tolerance:.0%}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
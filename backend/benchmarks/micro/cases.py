@@ -0,0 +1,108 @@
+"""Benchmark cases: each builds its inputs for a size and returns the call to time."""
+
+import datetime
+import random
+from typing import Callable
+
+from pydantic import TypeAdapter
+
+from models.expense import Expense
+from schemas.expenses import ExpenseIn, ExpenseOut
+from services import expenses as expense_service
+from services import report
+
+
+SIZES = (10, 1_000, 10_000)
+CATEGORIES = 12
+
+Case = Callable[[int], Callable[[], object]]
+
+
+def make_expenses(size: int, seed: int = 0) -> list[Expense]:
+    """Transient ORM rows, so attribute access costs what it does in production."""
+    rng = random.Random(seed)
+    start = datetime.datetime(2025, 3, 1, tzinfo=datetime.UTC)
+    return [
+        Expense(
+            id=n + 1,
+            user_id=1,
+            category_id=rng.randint(1, CATEGORIES),
+            amount=round(rng.lognormvariate(3.3, 0.9), 2),
+            occurred_at=start + datetime.timedelta(minutes=rng.randrange(31 * 24 * 60)),
+            title=f"Merchant {rng.randint(1, 40)}",
+            note="",
+        )
+        for n in range(size)
+    ]
+
+
+def make_payloads(size: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "category_id": rng.randint(1, CATEGORIES),
+            "amount": round(rng.uniform(1, 500), 2),
+            "occurred_at": "2025-03-14T12:30:00Z",
+            "title": f"  Merchant {rng.randint(1, 40)} ",
+            "note": "",
+        }
+        for _ in range(size)
+    ]
+
+
+CATEGORY_LOOKUP = {n: f"Category {n}" for n in range(1, CATEGORIES + 1)}
+
+
+def month_summary(size: int):
+    expenses = make_expenses(size)
+    return lambda: report.month_summary(expenses)
+
+
+def category_breakdown(size: int):
+    expenses = make_expenses(size)
+    return lambda: report.category_breakdown(expenses, CATEGORY_LOOKUP)
+
+
+def top_5_categories(size: int):
+    totals = report.category_breakdown(make_expenses(size), CATEGORY_LOOKUP)
+    return lambda: report.top_5_categories(totals)
+
+
+def expense_validators(size: int):
+    """The checks create_expense and list_expenses run before touching the database."""
+    payloads = make_payloads(size)
+
+    def validate():
+        for payload in payloads:
+            expense_service._validate_amount(payload["amount"])
+            expense_service._validate_title(payload["title"])
+            expense_service._validate_positive_int(payload["category_id"], "category_id")
+            expense_service._normalize_pagination(2, 50)
+            expense_service._normalize_sort("-amount")
+
+    return validate
+
+
+def expense_in_parse(size: int):
+    adapter = TypeAdapter(list[ExpenseIn])
+    payloads = make_payloads(size)
+    return lambda: adapter.validate_python(payloads)
+
+
+def expense_out_dump(size: int):
+    """ORM rows to JSON the way a response_model=ExpenseOut route does it."""
+    adapter = TypeAdapter(list[ExpenseOut])
+    expenses = make_expenses(size)
+    return lambda: adapter.dump_json(
+        [ExpenseOut.model_validate(expense, from_attributes=True) for expense in expenses]
+    )
+
+
+CASES: dict[str, Case] = {
+    "report.month_summary": month_summary,
+    "report.category_breakdown": category_breakdown,
+    "report.top_5_categories": top_5_categories,
+    "expenses.validators": expense_validators,
+    "schemas.ExpenseIn.parse": expense_in_parse,
+    "schemas.ExpenseOut.dump": expense_out_dump,
+}
@@ -0,0 +1,144 @@
+"""Timing, baselines and regression checks."""
+
+import datetime
+import platform
+import statistics
+import time
+from typing import Callable
+
+from benchmarks.load.report import git_commit
+from benchmarks.micro.cases import CASES, SIZES
+
+
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(fn: Callable[[], object], *, min_time: float = 0.1, repeat: int = 5) -> float:
+    """Best per-call time in microseconds over ``repeat`` timed batches.
+
+    The batch size doubles until one batch takes ``min_time``, so fast and
+    slow cases are both timed over a similar wall-clock window. The minimum
+    is the least noisy estimate of what the code itself costs.
+    """
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / loops * 1_000_000
+
+
+def _calibration_loop() -> int:
+    total = 0
+    values = {}
+    for n in range(2_000):
+        values[n % 97] = values.get(n % 97, 0) + n
+        total += n * 3 % 7
+    return total + sum(values.values())
+
+
+def calibrate(**kwargs) -> float:
+    """Cost of a fixed pure-Python workload, used to normalize across machines."""
+    return measure(_calibration_loop, **kwargs)
+
+
+def case_name(name: str, size: int) -> str:
+    return f"{name}[{size}]"
+
+
+def parse_case_name(case: str) -> tuple[str, int]:
+    name, _, size = case.rstrip("]").rpartition("[")
+    return name, int(size)
+
+
+def measure_case(case: str, **kwargs) -> float:
+    name, size = parse_case_name(case)
+    return round(measure(CASES[name](size), **kwargs), 3)
+
+
+def run(
+    names: list[str] | None = None,
+    sizes: tuple[int, ...] = SIZES,
+    **kwargs,
+) -> dict:
+    results = {}
+    for name in names or CASES:
+        for size in sizes:
+            case = case_name(name, size)
+            results[case] = measure_case(case, **kwargs)
+    return {
+        "commit": git_commit(),
+        "recorded_at": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration_us": round(statistics.median(calibrate(**kwargs) for _ in range(3)), 3),
+        "cases_us": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """Per-case verdicts; ``change_pct`` is after normalizing for machine speed."""
+    scale = current["calibration_us"] / baseline["calibration_us"]
+    rows = []
+    for name, now in current["cases_us"].items():
+        before = baseline["cases_us"].get(name)
+        if before is None:
+            rows.append({"case": name, "baseline_us": None, "current_us": now, "status": "new"})
+            continue
+        change = now / (before * scale) - 1
+        if change > tolerance:
+            status = "regressed"
+        elif change < -tolerance:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "case": name,
+                "baseline_us": before,
+                "current_us": now,
+                "change_pct": round(change * 100, 1),
+                "status": status,
+            }
+        )
+    return rows
+
+
+def check(
+    baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE, retries: int = 2, **kwargs
+) -> list[dict]:
+    """compare(), re-timing regressed cases so one noisy batch does not fail the run.
+
+    Keeps the fastest measurement of each retried case in ``current``.
+    """
+    rows = compare(baseline, current, tolerance)
+    for _ in range(retries):
+        regressed = [row["case"] for row in rows if row["status"] == "regressed"]
+        if not regressed:
+            break
+        for case in regressed:
+            current["cases_us"][case] = min(current["cases_us"][case], measure_case(case, **kwargs))
+        rows = compare(baseline, current, tolerance)
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    lines = [f"{'case':<40} {'baseline':>12} {'current':>12} {'change':>8}  status"]
+    for row in rows:
+        before = f"{row['baseline_us']:.2f}us" if row["baseline_us"] is not None else "-"
+        change = f"{row['change_pct']:+.1f}%" if "change_pct" in row else "-"
+        lines.append(
+            f"{row['case']:<40} {before:>12} {row['current_us']:>10.2f}us {change:>8}  {row['status']}"
+        )
+    return "\n".join(lines)
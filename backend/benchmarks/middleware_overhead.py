@@ -0,0 +1,163 @@
+"""Per-request overhead of the request middleware, before and after the ASGI rewrite.
+
+Drives a one-route app directly through the ASGI interface (no sockets, no
+HTTP client) so the numbers are dominated by middleware and logging cost:
+
+    cd backend && python -m benchmarks.middleware_overhead --requests 20000
+
+"before" is the former ``@app.middleware("http")`` implementation logging
+synchronously through a StreamHandler; "after" is RequestContextMiddleware
+with the queue-based logging from ``core.logging``. Logs go to /dev/null in
+both cases so terminal speed does not skew the comparison.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+import uuid
+
+# Settings are read on first use and still require these; no database is touched here.
+for name, value in {
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_DB": "bench",
+    "JWT_SECRET": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi import FastAPI, Request  # noqa: E402
+
+from core import logging as app_logging  # noqa: E402
+from core.config import settings  # noqa: E402
+from core.context import request_id_var  # noqa: E402
+from core.middleware import RequestContextMiddleware  # noqa: E402
+from db.instrumentation import track_queries  # noqa: E402
+
+
+logger = logging.getLogger("app")
+
+
+def add_route(app: FastAPI) -> FastAPI:
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def legacy_app() -> FastAPI:
+    """The request logger as it was before the rewrite."""
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def request_id_and_logging(request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        request.state.request_id = request_id
+        request_id_token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        try:
+            with track_queries() as query_stats:
+                response = await call_next(request)
+        finally:
+            request_id_var.reset(request_id_token)
+        duration = round((time.perf_counter() - start) * 1000, 2)
+        db_time = round(query_stats.total_ms, 2)
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-DB-Queries"] = str(query_stats.count)
+        response.headers["X-DB-Time"] = f"{db_time}ms"
+        logger.info(
+            "%s %s -> %s (%sms) db=%s/%sms rid=%s",
+            request.method, request.url.path, response.status_code, duration,
+            query_stats.count, db_time, request_id,
+        )
+        for shape, count in query_stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+            logger.warning("Possible N+1: statement ran %s times: %s", count, shape)
+        return response
+
+    return add_route(app)
+
+
+def asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+    return add_route(app)
+
+
+async def drive(app, requests: int) -> list[float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(dict(scope), receive, send)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def use_blocking_logging(stream) -> None:
+    app_logging.stop_logging()
+    root = logging.getLogger()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(app_logging.LOG_FORMAT))
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+
+
+def use_queue_logging(stream) -> None:
+    logging.getLogger().handlers = []
+    app_logging.stop_logging()
+    app_logging.setup_logging("INFO", stream=stream)
+
+
+def report(label: str, timings: list[float]) -> None:
+    micros = sorted(t * 1_000_000 for t in timings)
+    p99 = micros[int(len(micros) * 0.99) - 1]
+    print(
+        f"{label:<8} mean={statistics.fmean(micros):8.1f}us "
+        f"p50={statistics.median(micros):8.1f}us p99={p99:8.1f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--warmup", type=int, default=500)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        use_blocking_logging(devnull)
+        before = legacy_app()
+        asyncio.run(drive(before, args.warmup))
+        report("before", asyncio.run(drive(before, args.requests)))
+
+        use_queue_logging(devnull)
+        after = asgi_app()
+        asyncio.run(drive(after, args.warmup))
+        report("after", asyncio.run(drive(after, args.requests)))
+        app_logging.stop_logging()
+
+
+if __name__ == "__main__":
+    main()
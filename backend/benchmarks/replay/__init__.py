@@ -0,0 +1,13 @@
+"""Replay captured production traffic shapes against a seeded local instance.
+
+Reads the JSON lines written with ``CAPTURE_ENABLED`` (see ``core.capture``),
+maps each user bucket onto a benchmark user and re-issues the requests on
+their original schedule, sped up ``--speed`` times, against the real app
+in-process:
+
+    cd backend && python -m benchmarks.replay capture.jsonl.1 capture.jsonl --speed 4 --reuse
+
+Ids, dates and bodies were never captured, so they are filled in from the
+seeded user's own data. The report compares each route's replayed latency
+with the latency recorded in production.
+"""
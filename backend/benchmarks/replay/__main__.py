@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import replace
+
+import httpx
+
+from app.main import create_app
+from benchmarks.load.__main__ import LOCAL_HOSTS, wait_until_ready
+from benchmarks.load.report import Recorder, build_report, compare, format_comparison
+from benchmarks.load.seed import SeededUser, load_seeded, seed
+from benchmarks.replay import __doc__ as USAGE
+from benchmarks.replay.shapes import Resources, build_request, captured_summary, endpoint, load_records
+from core.config import read_settings
+from core.security import create_access_token
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: list[dict],
+    users: list[SeededUser],
+    tokens: dict[int, str],
+    *,
+    speed: float,
+    max_in_flight: int,
+    seed: int = 0,
+) -> tuple[Recorder, dict]:
+    """Issue ``records`` on their captured schedule compressed by ``speed``."""
+    rng = random.Random(seed)
+    recorder = Recorder()
+    resources = Resources(client)
+    skipped: Counter = Counter()
+    slots = asyncio.Semaphore(max_in_flight)
+    max_lag = 0.0
+
+    async def send(record: dict) -> None:
+        try:
+            if record["user"] is None:
+                user, headers = rng.choice(users), {}
+            else:
+                user = users[record["user"] % len(users)]
+                headers = {"Authorization": f"Bearer {tokens[user.id]}"}
+            request = await build_request(record, user, headers, resources, rng)
+            if request is None:
+                skipped[endpoint(record)] += 1
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+            except httpx.HTTPError:
+                recorder.record(endpoint(record), time.perf_counter() - start, ok=False)
+                return
+            recorder.record(
+                endpoint(record), time.perf_counter() - start, ok=response.status_code < 400
+            )
+        finally:
+            slots.release()
+
+    tasks = []
+    first = records[0]["t"]
+    started = time.monotonic()
+    for record in records:
+        due = started + (record["t"] - first) / speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        # How far behind schedule the replayer fell (client-side saturation).
+        max_lag = max(max_lag, time.monotonic() - due)
+        tasks.append(asyncio.create_task(send(record)))
+    await asyncio.gather(*tasks)
+    return recorder, {"skipped": dict(skipped), "max_lag_ms": round(max_lag * 1000, 1)}
+
+
+async def run(args) -> dict:
+    records = load_records(args.files)
+    if args.window:
+        records = [record for record in records if record["t"] - records[0]["t"] <= args.window]
+    if not records:
+        raise SystemExit("No captured requests to replay.")
+
+    # Read, not installed: create_app installs the overridden copy.
+    settings = read_settings()
+    if settings.POSTGRES_HOST not in LOCAL_HOSTS and not args.allow_remote:
+        raise SystemExit(
+            f"Refusing to replay against {settings.POSTGRES_HOST}; pass --allow-remote to do it."
+        )
+    # Never capture the replay itself; the limiter would turn bursts into 429s.
+    settings = replace(settings, CAPTURE_ENABLED=False, RATE_LIMIT_ENABLED=args.rate_limit)
+    app = create_app(settings)
+
+    async with app.router.lifespan_context(app):
+        if args.reuse:
+            users = await load_seeded(app.state.database.engine)
+            if not users:
+                raise SystemExit("No benchmark users found; run benchmarks.datagen first.")
+        else:
+            print(f"Seeding {args.users} users...", file=sys.stderr)
+            users = await seed(
+                app.state.database.engine,
+                users=args.users,
+                categories=args.categories,
+                expenses_per_user=args.expenses_per_user,
+                seed=args.seed,
+            )
+        span = records[-1]["t"] - records[0]["t"]
+        lifetime = datetime.timedelta(seconds=span / args.speed + 300)
+        tokens = {user.id: create_access_token(user.email, lifetime) for user in users}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=60) as client:
+            await wait_until_ready(client, timeout=60)
+            print(
+                f"Replaying {len(records)} requests ({span:.0f}s captured) at {args.speed}x...",
+                file=sys.stderr,
+            )
+            started = time.monotonic()
+            recorder, stats = await replay(
+                client,
+                records,
+                users,
+                tokens,
+                speed=args.speed,
+                max_in_flight=args.max_in_flight,
+                seed=args.seed,
+            )
+            elapsed = time.monotonic() - started
+
+    config = {
+        "files": args.files,
+        "speed": args.speed,
+        "window": args.window,
+        "reuse": args.reuse,
+        "seeded_users": len(users),
+        "db_pool_size": settings.DB_POOL_SIZE,
+        "db_max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+    report = build_report(recorder, elapsed, config)
+    report.update(stats)
+    report["captured"] = captured_summary(records)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.replay",
+        description=USAGE,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("files", nargs="+", help="capture files, e.g. capture.jsonl.1 capture.jsonl")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay N times faster than captured")
+    parser.add_argument("--window", type=float, help="only replay the first N captured seconds")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--reuse", action="store_true", help="drive users loaded by benchmarks.datagen")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--expenses-per-user", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate-limit", action="store_true", help="keep rate limiting on")
+    parser.add_argument("--allow-remote", action="store_true")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be > 0")
+
+    report = asyncio.run(run(args))
+    # Production latency first, so positive changes mean the replay was slower.
+    print(format_comparison(compare(report["captured"], report)), file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
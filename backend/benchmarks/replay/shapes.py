@@ -0,0 +1,173 @@
+"""Turning captured request shapes back into concrete requests."""
+
+import datetime
+import json
+import random
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.load.report import summarize
+from benchmarks.load.seed import PASSWORD, SeededUser
+
+
+API = "/api/v1"
+
+# Would create accounts or cascade-delete the seeded data the run depends on.
+SKIPPED = {
+    ("POST", f"{API}/users/register"),
+    ("DELETE", f"{API}/categories/{{category_id}}"),
+}
+
+
+def load_records(paths: list[str]) -> list[dict]:
+    """Captured records from one or more files, in arrival order."""
+    records = []
+    for path in paths:
+        with open(path) as handle:
+            records.extend(json.loads(line) for line in handle if line.strip())
+    records.sort(key=lambda record: record["t"])
+    return records
+
+
+def endpoint(record: dict) -> str:
+    return f"{record['method']} {record['route']}"
+
+
+def captured_summary(records: list[dict]) -> dict:
+    """Per-endpoint latency as recorded in production, in the load report's shape."""
+    elapsed = records[-1]["t"] - records[0]["t"] if len(records) > 1 else 1.0
+    samples, errors = defaultdict(list), defaultdict(int)
+    for record in records:
+        samples[endpoint(record)].append(record["ms"] / 1000)
+        if record["status"] >= 400:
+            errors[endpoint(record)] += 1
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize(
+            [value for values in samples.values() for value in values], sum(errors.values()), elapsed
+        ),
+        "endpoints": {
+            name: summarize(values, errors[name], elapsed) for name, values in sorted(samples.items())
+        },
+    }
+
+
+class Resources:
+    """The ids a seeded user's requests can refer to, fetched once per user."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self._expenses: dict[int, list[int]] = {}
+        self._goals: dict[int, list[int]] = {}
+
+    async def expense_ids(self, user: SeededUser, headers: dict) -> list[int]:
+        if user.id not in self._expenses:
+            response = await self.client.get(
+                f"{API}/expenses", params={"page": 1, "limit": 100}, headers=headers
+            )
+            self._expenses[user.id] = [item["id"] for item in response.json().get("items", [])]
+        return self._expenses[user.id]
+
+    async def goal_ids(self, user: SeededUser, headers: dict) -> list[int]:
+        if user.id not in self._goals:
+            response = await self.client.get(f"{API}/goals", headers=headers)
+            goals = response.json() if response.status_code == 200 else []
+            goals = goals if isinstance(goals, list) else [goals]
+            self._goals[user.id] = [goal["id"] for goal in goals if goal]
+        return self._goals[user.id]
+
+    def forget_expense(self, user: SeededUser, expense_id: int) -> None:
+        ids = self._expenses.get(user.id, [])
+        if expense_id in ids:
+            ids.remove(expense_id)
+
+
+def _expense_body(user: SeededUser, rng: random.Random) -> dict:
+    return {
+        "category_id": rng.choice(user.category_ids),
+        "amount": max(0.01, round(rng.lognormvariate(3.3, 0.9), 2)),
+        "occurred_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "title": "Replay",
+        "note": "",
+    }
+
+
+BODIES = {
+    ("POST", f"{API}/expenses"): _expense_body,
+    ("PATCH", f"{API}/expenses/{{expense_id}}"): lambda user, rng: {
+        "amount": round(rng.uniform(1, 200), 2)
+    },
+    ("POST", f"{API}/categories"): lambda user, rng: {
+        "name": f"Replay {rng.randrange(10**6)}",
+        "description": "",
+    },
+    ("PATCH", f"{API}/categories/{{category_id}}"): lambda user, rng: {"description": "Replayed"},
+    ("POST", f"{API}/goals"): lambda user, rng: {"goal_limit": rng.choice((800.0, 1500.0, 3000.0))},
+    ("PUT", f"{API}/goals/{{goal_id}}"): lambda user, rng: {"goal_limit": rng.choice((800.0, 1500.0))},
+    ("POST", f"{API}/users/login"): lambda user, rng: {"email": user.email, "password": PASSWORD},
+}
+
+
+async def _fill(name: str, kind: str, user, headers, resources, rng):
+    if not headers and name.endswith("_id"):
+        return 1  # unauthenticated: rejected before the id matters
+    if name == "category_id":
+        return rng.choice(user.category_ids) if user.category_ids else None
+    if name == "expense_id":
+        ids = await resources.expense_ids(user, headers)
+        return rng.choice(ids) if ids else None
+    if name == "goal_id":
+        ids = await resources.goal_ids(user, headers)
+        return rng.choice(ids) if ids else None
+    if kind == "<datetime>":
+        days = 30 if name.startswith("from") else 0
+        return (datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=days)).isoformat()
+    if kind == "<int>":
+        return 1
+    return None
+
+
+async def build_request(
+    record: dict,
+    user: SeededUser,
+    headers: dict,
+    resources: Resources,
+    rng: random.Random,
+) -> dict | None:
+    """``client.request`` arguments for a captured shape, or None when it cannot be replayed.
+
+    Anonymous records get empty ``headers`` and are sent unauthenticated, as
+    they arrived; ``user`` then only supplies ids and login credentials.
+    """
+    key = (record["method"], record["route"])
+    if key in SKIPPED or not record["route"].startswith(API):
+        return None
+
+    path_values = {}
+    for name in record["path_params"]:
+        value = await _fill(name, "<int>", user, headers, resources, rng)
+        if value is None:
+            return None
+        path_values[name] = value
+    params = {}
+    for name, value in record["query"].items():
+        if value.startswith("<") and value.endswith(">"):
+            value = await _fill(name, value, user, headers, resources, rng)
+            if value is None:
+                continue
+        params[name] = value
+
+    request = {
+        "method": record["method"],
+        "url": record["route"].format(**path_values),
+        "params": params,
+        "headers": headers,
+    }
+    if key in BODIES:
+        request["json"] = BODIES[key](user, rng)
+    elif record["method"] in {"POST", "PUT", "PATCH"}:
+        return None
+    if key == ("DELETE", f"{API}/expenses/{{expense_id}}"):
+        resources.forget_expense(user, path_values["expense_id"])
+    return request
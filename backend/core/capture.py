@@ -0,0 +1,144 @@
+"""Opt-in capture of anonymized request shapes for replay.
+
+With ``CAPTURE_ENABLED`` each API request appends one JSON line to a size-
+rotated local file: when it arrived, the route template, which path
+parameters it had, its query shape, a keyed hash bucket for the user, and
+how long it took. The record keeps no ids, emails, dates, bodies or tokens.
+Only the values of the pagination and period parameters in ``SAFE_PARAMS``
+are stored; any other parameter becomes a placeholder for its kind.
+
+``benchmarks.replay`` drives a seeded instance with these shapes.
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from starlette.types import Scope
+
+from core.security import decode_access_token
+
+
+# Query parameters whose values describe the workload rather than the user.
+SAFE_PARAMS = frozenset({"page", "limit", "sort", "month", "year"})
+CAPTURED_PREFIX = "/api/"
+
+
+def value_kind(value: str) -> str:
+    if value.lstrip("-").isdigit():
+        return "<int>"
+    try:
+        datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return "<str>"
+    return "<datetime>"
+
+
+def query_shape(query_string: bytes) -> dict[str, str]:
+    """Query parameters with every value outside SAFE_PARAMS replaced by its kind."""
+    shape = {}
+    for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+        shape[key] = value[:32] if key in SAFE_PARAMS else value_kind(value)
+    return shape
+
+
+class _CaptureFormatter(logging.Formatter):
+    # Serialization happens here, on the listener thread, not in the request.
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.capture, separators=(",", ":"))
+
+
+class TrafficCapture:
+    """Samples finished requests and writes their shapes from a background thread."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        secret: str,
+        max_bytes: int,
+        backups: int,
+        sample_rate: float = 1.0,
+        user_buckets: int = 1024,
+    ):
+        self.sample_rate = sample_rate
+        self.user_buckets = user_buckets
+        self._key = hashlib.blake2b(secret.encode(), digest_size=32, person=b"capture").digest()
+        self._random = random.Random()
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, delay=True
+        )
+        handler.setFormatter(_CaptureFormatter())
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+        self._closed = False
+
+    def user_bucket(self, scope: Scope) -> Optional[int]:
+        """Stable, keyed bucket for the token's subject; None when anonymous."""
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                break
+        else:
+            return None
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            subject = decode_access_token(token).get("sub")
+        except HTTPException:
+            return None
+        if not subject:
+            return None
+        digest = hashlib.blake2b(subject.encode(), digest_size=8, key=self._key).digest()
+        return int.from_bytes(digest, "big") % self.user_buckets
+
+    def record(self, scope: Scope, route: str, status: int, elapsed: float, queries: int) -> None:
+        if not scope["path"].startswith(CAPTURED_PREFIX):
+            return
+        if self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            return
+        entry = {
+            "t": round(time.time() - elapsed, 3),
+            "method": scope["method"],
+            "route": route,
+            "path_params": sorted(scope.get("path_params", {})),
+            "query": query_shape(scope.get("query_string", b"")),
+            "user": self.user_bucket(scope),
+            "status": status,
+            "ms": round(elapsed * 1000, 2),
+            "db_queries": queries,
+        }
+        self._queue.put(logging.makeLogRecord({"msg": "", "capture": entry}))
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+
+
+def build_capture(settings) -> Optional[TrafficCapture]:
+    """Capture for CAPTURE_ENABLED; ``{pid}`` in CAPTURE_FILE gives each worker its own file."""
+    if not settings.CAPTURE_ENABLED:
+        return None
+    return TrafficCapture(
+        settings.CAPTURE_FILE.format(pid=os.getpid()),
+        secret=settings.JWT_SECRET,
+        max_bytes=settings.CAPTURE_MAX_BYTES,
+        backups=settings.CAPTURE_BACKUPS,
+        sample_rate=settings.CAPTURE_SAMPLE_RATE,
+        user_buckets=settings.CAPTURE_USER_BUCKETS,
+    )
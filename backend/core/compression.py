@@ -0,0 +1,201 @@
+import zlib
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:  # optional: pip install zstandard
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# Event streams must reach the client as soon as each event is written.
+NEVER_COMPRESS_TYPES = ("text/event-stream",)
+
+
+class _Gzip:
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        # Sync flush so each streamed chunk can be decoded on arrival.
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> dict[str, Callable]:
+    """Content codings this process can produce, most preferred first."""
+    encodings = {}
+    if brotli is not None:
+        encodings["br"] = _Brotli
+    if zstandard is not None:
+        encodings["zstd"] = _Zstd
+    encodings["gzip"] = _Gzip
+    return encodings
+
+
+def negotiate(accept_encoding: Optional[str], encodings: dict[str, Callable]) -> Optional[str]:
+    """Pick the best coding the client accepts; ties go to server preference."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressible(headers: MutableHeaders) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    if content_type.startswith(NEVER_COMPRESS_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Compress responses negotiated through ``Accept-Encoding``.
+
+    Bodies smaller than ``minimum_size`` go out unchanged. Streaming bodies
+    are buffered only until they cross the threshold, then each chunk is
+    compressed and flushed as it arrives, so clients can decode a long
+    response incrementally.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(send, encoding, self.encodings[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, send: Send, encoding: str, compressor_factory: Callable, minimum_size: int):
+        self._send = send
+        self._encoding = encoding
+        self._compressor_factory = compressor_factory
+        self._minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+        self._compressor = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self._start = message
+            headers = MutableHeaders(raw=list(message.get("headers", ())))
+            if _compressible(headers):
+                headers.add_vary_header("Accept-Encoding")
+                self._start = {**message, "headers": headers.raw}
+            else:
+                self._passthrough = True
+            return
+        if message_type != "http.response.body" or self._passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is not None:
+            compressed = self._compressor.compress(body)
+            if not more_body:
+                compressed += self._compressor.finish()
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        self._buffer.append(body)
+        self._buffered += len(body)
+        if self._buffered < self._minimum_size:
+            if more_body:
+                return
+            # Whole body is below the threshold: send it as-is.
+            await self._flush_start()
+            await self._send({"type": "http.response.body", "body": b"".join(self._buffer)})
+            return
+
+        self._compressor = self._compressor_factory()
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["Content-Encoding"] = self._encoding
+        buffered = b"".join(self._buffer)
+        self._buffer = []
+        compressed = self._compressor.compress(buffered)
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            compressed += self._compressor.finish()
+            headers["Content-Length"] = str(len(compressed))
+        await self._flush_start()
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self._start is not None:
+            start, self._start = self._start, None
+            await self._send(start)
@@ -1,10 +1,10 @@
 import os
-from dataclasses import dataclass
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 
 from dotenv import load_dotenv
 
-load_dotenv()
-
 
 def required(name: str) -> str:
     """Read required env var and fail fast when missing."""
@@ -22,6 +22,14 @@ def to_int(name: str, default: int) -> int:
     return int(value)
 
 
+def to_float(name: str, default: float) -> float:
+    """Read optional float env var with fallback."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return float(value)
+
+
 def to_bool(name: str, default: bool) -> bool:
     """Read optional boolean env var with common truthy values."""
     value_str = os.getenv(name)
@@ -30,25 +38,142 @@ def to_bool(name: str, default: bool) -> bool:
     return value_str.strip().lower() in {"1", "true", "yes", "y", "on"}
 
 
+def to_list(name: str) -> tuple[str, ...]:
+    """Read optional comma-separated env var; empty entries are dropped."""
+    return tuple(item.strip() for item in os.getenv(name, "").split(",") if item.strip())
+
+
+def from_env(read: Callable[[], object]):
+    """Defer an environment read until Settings() is instantiated."""
+    return field(default_factory=read)
+
+
 @dataclass(frozen=True)
 class Settings:
     # Database settings
-    POSTGRES_USER: str = required("POSTGRES_USER")
-    POSTGRES_PASSWORD: str = required("POSTGRES_PASSWORD")
-    POSTGRES_DB: str = required("POSTGRES_DB")
-    POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "db")
-    POSTGRES_PORT: int = to_int("POSTGRES_PORT", 5432)
+    POSTGRES_USER: str = from_env(lambda: required("POSTGRES_USER"))
+    POSTGRES_PASSWORD: str = from_env(lambda: required("POSTGRES_PASSWORD"))
+    POSTGRES_DB: str = from_env(lambda: required("POSTGRES_DB"))
+    POSTGRES_HOST: str = from_env(lambda: os.getenv("POSTGRES_HOST", "db"))
+    POSTGRES_PORT: int = from_env(lambda: to_int("POSTGRES_PORT", 5432))
+
+    # Optional read replica; GET endpoints fall back to the primary when unset
+    POSTGRES_READ_HOST: str | None = from_env(lambda: os.getenv("POSTGRES_READ_HOST") or None)
+    POSTGRES_READ_PORT: int = from_env(
+        lambda: to_int("POSTGRES_READ_PORT", to_int("POSTGRES_PORT", 5432))
+    )
+    READ_AFTER_WRITE_SECONDS: float = from_env(lambda: to_float("READ_AFTER_WRITE_SECONDS", 5.0))
+
+    # Connection pool settings (per worker process)
+    DB_POOL_SIZE: int = from_env(lambda: to_int("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = from_env(lambda: to_int("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT_SECONDS: float = from_env(lambda: to_float("DB_POOL_TIMEOUT_SECONDS", 30.0))
+    DB_POOL_RECYCLE_SECONDS: int = from_env(lambda: to_int("DB_POOL_RECYCLE_SECONDS", 1800))
+    DB_POOL_PRE_PING: bool = from_env(lambda: to_bool("DB_POOL_PRE_PING", True))
+    DB_POOL_CHECKOUT_WARN_MS: float = from_env(lambda: to_float("DB_POOL_CHECKOUT_WARN_MS", 100.0))
+    # Pooled connections one request may use at once for independent reads (db.concurrent)
+    DB_REQUEST_CONCURRENCY: int = from_env(lambda: to_int("DB_REQUEST_CONCURRENCY", 3))
+
+    # Readiness probe: cached result lifetime and per-check database timeout
+    HEALTH_CACHE_SECONDS: float = from_env(lambda: to_float("HEALTH_CACHE_SECONDS", 2.0))
+    HEALTH_DB_TIMEOUT_SECONDS: float = from_env(lambda: to_float("HEALTH_DB_TIMEOUT_SECONDS", 1.0))
+
+    # Warm-up at worker start: pool connections to pre-open (capped at
+    # DB_POOL_SIZE) and how long to try before reporting ready anyway
+    WARMUP_ENABLED: bool = from_env(lambda: to_bool("WARMUP_ENABLED", True))
+    WARMUP_CONNECTIONS: int = from_env(
+        lambda: to_int("WARMUP_CONNECTIONS", to_int("DB_POOL_SIZE", 5))
+    )
+    WARMUP_TIMEOUT_SECONDS: float = from_env(lambda: to_float("WARMUP_TIMEOUT_SECONDS", 30.0))
+
+    # Query instrumentation
+    N_PLUS_ONE_THRESHOLD: int = from_env(lambda: to_int("N_PLUS_ONE_THRESHOLD", 5))
+    SLOW_QUERY_MS: float = from_env(lambda: to_float("SLOW_QUERY_MS", 200.0))
+
+    # Statement timeouts per endpoint group (milliseconds, 0 disables)
+    STATEMENT_TIMEOUT_MS: int = from_env(lambda: to_int("STATEMENT_TIMEOUT_MS", 3000))
+    REPORT_STATEMENT_TIMEOUT_MS: int = from_env(lambda: to_int("REPORT_STATEMENT_TIMEOUT_MS", 30000))
+
+    # Metrics: directory shared by all uvicorn workers so /metrics aggregates
+    # them; unset keeps metrics in process memory (single worker, tests)
+    METRICS_MULTIPROC_DIR: str | None = from_env(lambda: os.getenv("METRICS_MULTIPROC_DIR") or None)
+
+    # Token-bucket rate limiting: one bucket per client and route class;
+    # a request costs 1 token, reports and login/register cost more
+    RATE_LIMIT_ENABLED: bool = from_env(lambda: to_bool("RATE_LIMIT_ENABLED", True))
+    RATE_LIMIT_STORE: str = from_env(lambda: os.getenv("RATE_LIMIT_STORE", "memory"))
+    REDIS_URL: str = from_env(lambda: os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    RATE_LIMIT_CAPACITY: float = from_env(lambda: to_float("RATE_LIMIT_CAPACITY", 60.0))
+    RATE_LIMIT_REFILL_PER_SECOND: float = from_env(lambda: to_float("RATE_LIMIT_REFILL_PER_SECOND", 1.0))
+    RATE_LIMIT_REPORT_COST: float = from_env(lambda: to_float("RATE_LIMIT_REPORT_COST", 5.0))
+    RATE_LIMIT_AUTH_COST: float = from_env(lambda: to_float("RATE_LIMIT_AUTH_COST", 10.0))
+    # Reverse proxies (addresses or CIDR ranges) whose X-Forwarded-For is
+    # believed when bucketing anonymous clients by IP; empty trusts none
+    TRUSTED_PROXIES: tuple[str, ...] = from_env(lambda: to_list("TRUSTED_PROXIES"))
+
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = from_env(lambda: to_int("COMPRESSION_MINIMUM_SIZE", 1024))
+
+    # Event-loop watchdog: tick interval and how long a stall must last to be logged
+    LOOP_MONITOR_ENABLED: bool = from_env(lambda: to_bool("LOOP_MONITOR_ENABLED", True))
+    LOOP_MONITOR_INTERVAL_MS: float = from_env(lambda: to_float("LOOP_MONITOR_INTERVAL_MS", 100.0))
+    LOOP_BLOCK_THRESHOLD_MS: float = from_env(lambda: to_float("LOOP_BLOCK_THRESHOLD_MS", 100.0))
+
+    # Tracing: none, memory, jsonl (TRACE_FILE) or otlp (OTLP/HTTP collector)
+    TRACE_EXPORTER: str = from_env(lambda: os.getenv("TRACE_EXPORTER", "none"))
+    TRACE_FILE: str = from_env(lambda: os.getenv("TRACE_FILE", "traces.jsonl"))
+    OTLP_ENDPOINT: str = from_env(lambda: os.getenv("OTLP_ENDPOINT", "http://localhost:4318"))
+    # Spans waiting for the exporter thread; beyond this they are dropped
+    TRACE_QUEUE_SIZE: int = from_env(lambda: to_int("TRACE_QUEUE_SIZE", 10_000))
+
+    # On-demand profiling: requests signed with this secret are profiled
+    PROFILING_SECRET: str | None = from_env(lambda: os.getenv("PROFILING_SECRET") or None)
+    PROFILING_DIR: str = from_env(lambda: os.getenv("PROFILING_DIR", "/tmp/profiles"))
+
+    # Traffic capture for benchmarks.replay: anonymized request shapes to a rotating file
+    CAPTURE_ENABLED: bool = from_env(lambda: to_bool("CAPTURE_ENABLED", False))
+    CAPTURE_FILE: str = from_env(lambda: os.getenv("CAPTURE_FILE", "capture.jsonl"))
+    CAPTURE_MAX_BYTES: int = from_env(lambda: to_int("CAPTURE_MAX_BYTES", 50 * 1024 * 1024))
+    CAPTURE_BACKUPS: int = from_env(lambda: to_int("CAPTURE_BACKUPS", 5))
+    CAPTURE_SAMPLE_RATE: float = from_env(lambda: to_float("CAPTURE_SAMPLE_RATE", 1.0))
+    CAPTURE_USER_BUCKETS: int = from_env(lambda: to_int("CAPTURE_USER_BUCKETS", 1024))
+
+    # Background tasks for write side effects (core.tasks): per-worker queue,
+    # attempts before a task is parked as failed, and how long the writing
+    # worker owns a task before other workers' outbox sweeps may take it over
+    TASK_QUEUE_ENABLED: bool = from_env(lambda: to_bool("TASK_QUEUE_ENABLED", True))
+    TASK_WORKERS: int = from_env(lambda: to_int("TASK_WORKERS", 2))
+    TASK_QUEUE_SIZE: int = from_env(lambda: to_int("TASK_QUEUE_SIZE", 1000))
+    TASK_MAX_ATTEMPTS: int = from_env(lambda: to_int("TASK_MAX_ATTEMPTS", 5))
+    TASK_LEASE_SECONDS: float = from_env(lambda: to_float("TASK_LEASE_SECONDS", 60.0))
+    TASK_POLL_SECONDS: float = from_env(lambda: to_float("TASK_POLL_SECONDS", 5.0))
+
+    # Live dashboard updates over SSE (core.live): "postgres" fans events out
+    # to all workers with LISTEN/NOTIFY, "memory" reaches this worker only.
+    # Events come from the task queue, so TASK_QUEUE_ENABLED must stay on.
+    LIVE_UPDATES_ENABLED: bool = from_env(lambda: to_bool("LIVE_UPDATES_ENABLED", True))
+    LIVE_UPDATES_BACKEND: str = from_env(lambda: os.getenv("LIVE_UPDATES_BACKEND", "postgres"))
+    LIVE_QUEUE_SIZE: int = from_env(lambda: to_int("LIVE_QUEUE_SIZE", 100))
+    LIVE_KEEPALIVE_SECONDS: float = from_env(lambda: to_float("LIVE_KEEPALIVE_SECONDS", 15.0))
+
+    # Recurring expenses (services.scheduler): how often each worker looks for
+    # due rules, rules per transaction, and occurrences one rule may catch up
+    # per batch (a rule further behind continues in the next batch)
+    RECURRING_SCHEDULER_ENABLED: bool = from_env(lambda: to_bool("RECURRING_SCHEDULER_ENABLED", True))
+    RECURRING_INTERVAL_SECONDS: float = from_env(lambda: to_float("RECURRING_INTERVAL_SECONDS", 300.0))
+    RECURRING_BATCH_SIZE: int = from_env(lambda: to_int("RECURRING_BATCH_SIZE", 500))
+    RECURRING_MAX_CATCH_UP: int = from_env(lambda: to_int("RECURRING_MAX_CATCH_UP", 100))
 
     # JWT settings
-    JWT_SECRET: str = required("JWT_SECRET")
-    JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = to_int("ACCESS_TOKEN_EXPIRE_MINUTES", 15)
+    JWT_SECRET: str = from_env(lambda: required("JWT_SECRET"))
+    JWT_ALGORITHM: str = from_env(lambda: os.getenv("JWT_ALGORITHM", "HS256"))
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = from_env(lambda: to_int("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 
     # Password settings
-    PASSWORD_HASH_SCHEME: str = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+    PASSWORD_HASH_SCHEME: str = from_env(lambda: os.getenv("PASSWORD_HASH_SCHEME", "bcrypt"))
 
     # CORS policy settings
-    CORS_ALLOW_CREDENTIALS: bool = to_bool("CORS_ALLOW_CREDENTIALS", False)
+    CORS_ALLOW_CREDENTIALS: bool = from_env(lambda: to_bool("CORS_ALLOW_CREDENTIALS", False))
 
     @property
     def db_url(self) -> str:
@@ -58,5 +183,70 @@ class Settings:
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def read_db_url(self) -> str | None:
+        """Build SQLAlchemy async DSN for the read replica, if one is configured."""
+        if not self.POSTGRES_READ_HOST:
+            return None
+        return (
+            f"postgresql+psycopg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_READ_HOST}:{self.POSTGRES_READ_PORT}/{self.POSTGRES_DB}"
+        )
+
+
+_settings: Settings | None = None
+# Apps whose lifespan is running with ``_settings``.
+_running_apps = 0
+
+
+def read_settings() -> Settings:
+    """Settings from the environment (and .env), without installing them."""
+    load_dotenv()
+    return Settings()
+
+
+def get_settings() -> Settings:
+    """Process settings, read from the environment (and .env) on first use."""
+    global _settings
+    if _settings is None:
+        _settings = read_settings()
+    return _settings
+
+
+def configure(value: Settings) -> None:
+    """Install explicit settings, e.g. the ones passed to create_app().
+
+    Modules read ``settings`` as a process-wide value. Replacing them is
+    fine until an app starts; while one is running, installing different
+    settings is refused rather than silently changing them under it.
+    """
+    global _settings
+    if _running_apps and _settings is not value:
+        raise RuntimeError("An app is running with other settings; run one app per process")
+    _settings = value
+
+
+@contextmanager
+def settings_in_use(value: Settings) -> Iterator[Settings]:
+    """Install ``value`` for the lifetime of a running app (see configure)."""
+    global _running_apps
+    configure(value)
+    _running_apps += 1
+    try:
+        yield value
+    finally:
+        _running_apps -= 1
+
+
+class _LazySettings:
+    """Stand-in for the settings object that resolves it on attribute access,
+    so importing a module never reads the environment."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
 
-settings = Settings()
+settings = _LazySettings()
@@ -0,0 +1,7 @@
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Request id of the request currently being served, for log lines emitted
+# below the HTTP layer (repositories, SQL hooks).
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
@@ -0,0 +1,236 @@
+"""Per-user live update streams, sent as Server-Sent Events.
+
+Writes publish small events (services.live), and every open stream of the
+same user receives them. With several uvicorn workers, a user's stream is
+usually on a different worker from the one that handled the write. The
+postgres broker fans events out to all workers through LISTEN/NOTIFY. The
+memory broker only reaches streams on its own worker.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.metrics import registry
+
+
+logger = logging.getLogger("app.live")
+
+CHANNEL = "live_updates"
+# Postgres rejects NOTIFY payloads from 8000 bytes on.
+NOTIFY_LIMIT = 7900
+RESYNC = {"type": "resync"}
+
+LIVE_STREAMS = registry.gauge(
+    "live_streams",
+    "Open live update streams on this worker.",
+)
+LIVE_EVENTS = registry.counter(
+    "live_events_delivered",
+    "Events handed to open streams on this worker, by event type.",
+    labelnames=("type",),
+)
+LIVE_OVERFLOWS = registry.counter(
+    "live_stream_overflows",
+    "Streams that fell behind and were told to resync instead.",
+)
+
+
+class LiveHub:
+    """Open streams on this worker, keyed by user id."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.broker = MemoryBroker(self)
+        self._streams: dict[int, set[asyncio.Queue]] = {}
+        LIVE_STREAMS.set_function(lambda: sum(len(queues) for queues in self._streams.values()))
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._streams.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._streams.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._streams[user_id]
+
+    def deliver(self, user_id: int, event: dict) -> None:
+        for queue in self._streams.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stream this far behind gets one resync instead of
+                # deltas it would apply late; it refetches.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                LIVE_OVERFLOWS.inc()
+                continue
+            LIVE_EVENTS.labels(type=event.get("type", "unknown")).inc()
+
+    def deliver_all(self, event: dict) -> None:
+        for user_id in list(self._streams):
+            self.deliver(user_id, event)
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        await self.broker.publish(user_id, event)
+
+    def start(self) -> None:
+        self.broker.start()
+
+    async def close(self) -> None:
+        await self.broker.close()
+
+
+class MemoryBroker:
+    """Delivers to streams on this worker only (single worker, tests)."""
+
+    def __init__(self, hub: LiveHub):
+        self.hub = hub
+
+    def start(self) -> None:
+        pass
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        self.hub.deliver(user_id, event)
+
+    async def close(self) -> None:
+        pass
+
+
+class PostgresBroker:
+    """Fans events out to every worker through LISTEN/NOTIFY.
+
+    Publishing borrows a pooled connection for one ``pg_notify``. Each worker
+    also holds one extra connection, outside the pool, that LISTENs. After
+    that connection drops and reconnects, every local stream is told to
+    resync, because events may have been missed in between.
+    """
+
+    def __init__(self, hub: LiveHub, engine: AsyncEngine, *, retry_seconds: float = 1.0):
+        self.hub = hub
+        self.engine = engine
+        self.retry_seconds = retry_seconds
+        self._listener: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen(), name="live-listener")
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        payload = encode_notification(user_id, event)
+        async with self.engine.connect() as connection:
+            await connection.execute(select(func.pg_notify(CHANNEL, payload)))
+            await connection.commit()
+
+    def handle(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            self.hub.deliver(int(message["user"]), message["event"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed live notification: %.200s", payload)
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        conninfo = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        connected_before = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as connection:
+                    await connection.execute(f"LISTEN {CHANNEL}")
+                    if connected_before:
+                        self.hub.deliver_all(RESYNC)
+                    connected_before = True
+                    async for notification in connection.notifies():
+                        self.handle(notification.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Live update listener disconnected: %r", exc)
+                await asyncio.sleep(self.retry_seconds)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+
+def encode_notification(user_id: int, event: dict) -> str:
+    payload = json.dumps({"user": user_id, "event": event}, separators=(",", ":"))
+    if len(payload.encode()) > NOTIFY_LIMIT:
+        # E.g. an expense with a very long note: clients refetch instead.
+        payload = json.dumps({"user": user_id, "event": RESYNC}, separators=(",", ":"))
+    return payload
+
+
+def format_event(event: dict) -> bytes:
+    data = json.dumps(event, separators=(",", ":"))
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n".encode()
+
+
+async def event_stream(
+    hub: LiveHub,
+    user_id: int,
+    *,
+    keepalive: float,
+    expires_at: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """SSE body for one client: "ready", then events as they arrive.
+
+    Comment lines every ``keepalive`` seconds stop proxies from closing an
+    idle stream. The stream ends when the access token expires
+    (``expires_at``, epoch seconds), and the client reconnects with a fresh one.
+    """
+    with hub.subscribe(user_id) as queue:
+        # Anything written before the subscription is covered by the
+        # client refetching on "ready".
+        yield b"retry: 5000\n" + format_event({"type": "ready"})
+        while True:
+            timeout = keepalive
+            if expires_at is not None:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    return
+                timeout = min(timeout, remaining)
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield format_event(event)
+
+
+_hub: Optional[LiveHub] = None
+
+
+def use_hub(hub: Optional[LiveHub]) -> None:
+    """Install this worker's hub (None: writes publish nothing)."""
+    global _hub
+    _hub = hub
+
+
+async def publish(user_id: int, event: dict) -> None:
+    if _hub is not None:
+        await _hub.publish(user_id, event)
+
+
+def build_live_hub(settings, database) -> Optional[LiveHub]:
+    if not settings.LIVE_UPDATES_ENABLED:
+        return None
+    hub = LiveHub(settings.LIVE_QUEUE_SIZE)
+    if settings.LIVE_UPDATES_BACKEND == "postgres":
+        hub.broker = PostgresBroker(hub, database.engine)
+    elif settings.LIVE_UPDATES_BACKEND != "memory":
+        raise ValueError(f"Unknown LIVE_UPDATES_BACKEND: {settings.LIVE_UPDATES_BACKEND}")
+    return hub
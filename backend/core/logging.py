@@ -1,9 +1,47 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional, TextIO
 
 
-def setup_logging(level: str = "INFO") -> None:
-    """Configure process-wide logging format and level."""
-    logging.basicConfig(
-        level=getattr(logging, level.upper(), logging.INFO),
-        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
-    )
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+def setup_logging(level: str = "INFO", stream: Optional[TextIO] = None) -> None:
+    """Configure process-wide logging format and level.
+
+    Log calls only put the record on an in-memory queue; a background
+    listener thread formats it and writes to ``stream`` (stderr by default), so request handlers
+    never block on terminal or pipe I/O.
+    """
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(stream or sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import types
+from typing import Any, Awaitable, Optional
+
+from core.context import request_id_var
+from core.metrics import registry
+
+
+logger = logging.getLogger("app.loop")
+
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the monitor's periodic tick ran, i.e. how long the loop was busy.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKED = registry.counter(
+    "event_loop_blocked",
+    "Times the watchdog found the event loop stuck longer than the threshold.",
+)
+
+# Written only on the loop thread, around each step of an attributed
+# awaitable; the watchdog thread just reads the reference.
+_running_request_id: Optional[str] = None
+_monitoring = False
+
+
+@types.coroutine
+def _attributed(awaitable: Awaitable[Any]):
+    global _running_request_id
+    steps = awaitable.__await__()
+    value, error = None, None
+    while True:
+        previous, _running_request_id = _running_request_id, request_id_var.get()
+        try:
+            if error is None:
+                yielded = steps.send(value)
+            else:
+                yielded = steps.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            _running_request_id = previous
+        try:
+            value, error = (yield yielded), None
+        except BaseException as exc:  # cancellation and close() reach the awaitable too
+            value, error = None, exc
+
+
+def attributed(awaitable: Awaitable[Any]) -> Awaitable[Any]:
+    """Let the watchdog name the request whose code is blocking the loop.
+
+    Each time the awaitable runs a step, ``request_id_var`` is recorded for
+    the watchdog. Returned unchanged when no monitor is running.
+    """
+    return _attributed(awaitable) if _monitoring else awaitable
+
+
+class LoopMonitor:
+    """Measure event-loop lag and report whatever code is blocking it.
+
+    A ticker coroutine sleeps for ``interval`` and records how late it wakes
+    up. A watchdog thread checks the ticker's heartbeat; once the loop has
+    not ticked for ``threshold`` seconds it grabs the loop thread's current
+    stack with ``sys._current_frames`` (the blocking code is still running at
+    that point) and logs it with the request id recorded by ``attributed``.
+    The watchdog never touches asyncio objects, which are not thread-safe.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._ticker: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        global _monitoring
+        _monitoring = True
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._ticker = self._loop.create_task(self._tick(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        global _monitoring
+        _monitoring = False
+        self._stopped.set()
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            LOOP_LAG.observe(max(time.perf_counter() - expected, 0.0))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            # One report per stall: the same heartbeat means the same block.
+            reported_heartbeat = heartbeat
+            LOOP_BLOCKED.inc()
+            logger.warning(
+                "Event loop blocked for at least %.0fms rid=%s\n%s",
+                stalled * 1000,
+                _running_request_id,
+                self._loop_stack(),
+            )
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return "<loop thread not running>"
+        return "".join(traceback.format_stack(frame))
@@ -0,0 +1,531 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+
+from core.config import settings
+
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _LocalValue:
+    """A float kept in this process's memory."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float) -> None:
+        with self._lock:
+            self._value += amount
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def get(self) -> float:
+        return self._value
+
+
+class MmapValueFile:
+    """Append-only key -> float64 table in a memory-mapped file.
+
+    Each worker process writes only its own file, so updates need no
+    cross-process locking; the /metrics handler reads every worker's file
+    and aggregates. Layout: a 4-byte "used bytes" header padded to 8, then
+    entries of ``[uint32 key length][key padded to 8 bytes][float64]``.
+    """
+
+    _INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(self._INITIAL_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._positions: dict[str, int] = {}
+        self._used = struct.unpack_from("i", self._map, 0)[0]
+        if self._used == 0:
+            self._used = 8
+            struct.pack_into("i", self._map, 0, self._used)
+        for key, _, position in _iter_entries(self._map, self._used):
+            self._positions[key] = position
+
+    def _position(self, key: str) -> int:
+        position = self._positions.get(key)
+        if position is not None:
+            return position
+        with self._lock:
+            if key in self._positions:
+                return self._positions[key]
+            encoded = key.encode("utf-8")
+            padding = b" " * (8 - (len(encoded) + 4) % 8)
+            entry = struct.pack(f"i{len(encoded)}s{len(padding)}sd", len(encoded), encoded, padding, 0.0)
+            while self._used + len(entry) > self._capacity:
+                self._capacity *= 2
+                self._file.truncate(self._capacity)
+                self._map = mmap.mmap(self._file.fileno(), self._capacity)
+            self._map[self._used:self._used + len(entry)] = entry
+            self._used += len(entry)
+            struct.pack_into("i", self._map, 0, self._used)
+            position = self._used - 8
+            self._positions[key] = position
+            return position
+
+    def read(self, key: str) -> float:
+        return struct.unpack_from("d", self._map, self._position(key))[0]
+
+    def write(self, key: str, value: float) -> None:
+        struct.pack_into("d", self._map, self._position(key), value)
+
+    def increment(self, key: str, amount: float) -> None:
+        position = self._position(key)
+        with self._lock:
+            current = struct.unpack_from("d", self._map, position)[0]
+            struct.pack_into("d", self._map, position, current + amount)
+
+    @staticmethod
+    def read_all(path: str) -> list[tuple[str, float]]:
+        with open(path, "rb") as handle:
+            data = handle.read()
+        if len(data) < 8:
+            return []
+        used = struct.unpack_from("i", data, 0)[0]
+        return [(key, value) for key, value, _ in _iter_entries(data, used)]
+
+
+def _iter_entries(data, used: int):
+    position = 8
+    while position < used:
+        key_length = struct.unpack_from("i", data, position)[0]
+        key_end = position + 4 + key_length
+        key = bytes(data[position + 4:key_end]).decode("utf-8")
+        value_position = key_end + (8 - (4 + key_length) % 8)
+        value = struct.unpack_from("d", data, value_position)[0]
+        yield key, value, value_position
+        position = value_position + 8
+
+
+class _MmapValue:
+    """A float stored in this process's metrics file."""
+
+    def __init__(self, kind: str, key: str):
+        self._kind = kind
+        self._key = key
+        self._pid: Optional[int] = None
+        self._file: Optional[MmapValueFile] = None
+
+    def _value_file(self) -> "MmapValueFile":
+        # Re-resolve after a fork so a child never writes into its parent's file.
+        pid = os.getpid()
+        if self._pid != pid:
+            self._file = _process_file(self._kind)
+            self._pid = pid
+        return self._file
+
+    def inc(self, amount: float) -> None:
+        self._value_file().increment(self._key, amount)
+
+    def set(self, value: float) -> None:
+        self._value_file().write(self._key, value)
+
+    def get(self) -> float:
+        return self._value_file().read(self._key)
+
+
+_files: dict[str, MmapValueFile] = {}
+_files_pid: Optional[int] = None
+_files_lock = threading.Lock()
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Directory shared by all workers, or None for single-process metrics."""
+    return settings.METRICS_MULTIPROC_DIR
+
+
+def _process_file(kind: str) -> MmapValueFile:
+    global _files_pid
+    pid = os.getpid()
+    if _files_pid != pid:
+        # First use, or we are a freshly forked worker: never share files.
+        with _files_lock:
+            if _files_pid != pid:
+                _files.clear()
+                _files_pid = pid
+    directory = multiprocess_dir()
+    path = os.path.join(directory, f"{kind}_{pid}.db")
+    value_file = _files.get(path)
+    if value_file is None:
+        with _files_lock:
+            value_file = _files.get(path)
+            if value_file is None:
+                os.makedirs(directory, exist_ok=True)
+                value_file = _files[path] = MmapValueFile(path)
+    return value_file
+
+
+def _new_value(kind: str, metric_name: str, sample_name: str, labels: dict):
+    if multiprocess_dir() is None:
+        return _LocalValue()
+    key = json.dumps([metric_name, sample_name, labels], sort_keys=True)
+    return _MmapValue(kind, key)
+
+
+class _Metric:
+    """Base for labelled metrics."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple, object] = {}
+
+    def labels(self, **labels):
+        """Return the child series for the given label values."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child(dict(zip(self.labelnames, key)))
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self.labels()
+
+    def _new_child(self, labels: dict):
+        raise NotImplementedError
+
+    def collect(self) -> list[tuple[str, dict, float]]:
+        """Return ``(sample_name, labels, value)`` tuples for this process."""
+        samples = []
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            samples.extend(child.samples(self.name, labels))
+        return samples
+
+
+class _CounterChild:
+    def __init__(self, name: str, labels: dict):
+        self._value = _new_value("counter", name, f"{name}_total", labels)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._value.inc(amount)
+
+    def get(self) -> float:
+        return self._value.get()
+
+    def samples(self, name: str, labels: dict):
+        return [(f"{name}_total", labels, self._value.get())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self, labels: dict):
+        return _CounterChild(self.name, labels)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self, name: str, labels: dict):
+        self._value = _new_value("gauge", name, name, labels)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value.set(float(value))
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the value lazily at collection time."""
+        self._function = function
+
+    def refresh(self) -> None:
+        """Store the function's current value so other workers can read it."""
+        if self._function is not None:
+            self._value.set(float(self._function()))
+
+    def get(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._value.get()
+
+    def samples(self, name: str, labels: dict):
+        return [(name, labels, self.get())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self, labels: dict):
+        return _GaugeChild(self.name, labels)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+
+class _HistogramChild:
+    def __init__(self, name: str, labels: dict, buckets: tuple[float, ...]):
+        self._buckets = buckets
+        # Per-bucket (non-cumulative) counts; the last slot is +Inf.
+        bounds = [repr(bound) for bound in buckets] + ["+Inf"]
+        self._counts = [
+            _new_value("histogram", name, f"{name}_bucket", {**labels, "le": bound})
+            for bound in bounds
+        ]
+        self._sum = _new_value("histogram", name, f"{name}_sum", labels)
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._buckets, value)].inc(1)
+        self._sum.inc(value)
+
+    @property
+    def count(self) -> int:
+        return int(sum(bucket.get() for bucket in self._counts))
+
+    @property
+    def sum(self) -> float:
+        return self._sum.get()
+
+    def samples(self, name: str, labels: dict):
+        return _histogram_samples(
+            name,
+            labels,
+            [(repr(bound), bucket.get()) for bound, bucket in zip(self._buckets, self._counts)]
+            + [("+Inf", self._counts[-1].get())],
+            self._sum.get(),
+        )
+
+
+def _histogram_samples(name: str, labels: dict, buckets: list[tuple[str, float]], total: float):
+    samples = []
+    cumulative = 0.0
+    for bound, bucket_count in buckets:
+        cumulative += bucket_count
+        samples.append((f"{name}_bucket", {**labels, "le": bound}, cumulative))
+    samples.append((f"{name}_count", labels, cumulative))
+    samples.append((f"{name}_sum", labels, total))
+    return samples
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self, labels: dict):
+        return _HistogramChild(self.name, labels, self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+
+class Registry:
+    """Process-wide collection of named metrics."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+
+    def _register(self, metric_cls, name: str, documentation: str, **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, metric_cls):
+                    raise ValueError(f"Metric {name} already registered as {existing.kind}")
+                return existing
+            metric = metric_cls(name, documentation, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames=labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames=labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(
+            Histogram, name, documentation, labelnames=labelnames, buckets=buckets
+        )
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def metrics(self) -> list[_Metric]:
+        return list(self._metrics.values())
+
+    def refresh_function_gauges(self, min_interval: float = 0.0) -> None:
+        """Write computed gauges to the shared store, at most every ``min_interval`` s."""
+        if multiprocess_dir() is None:
+            return
+        now = time.monotonic()
+        if now - self._refreshed_at < min_interval:
+            return
+        self._refreshed_at = now
+        for metric in self.metrics():
+            if isinstance(metric, Gauge):
+                for child in list(metric._children.values()):
+                    child.refresh()
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric, across all workers."""
+        directory = multiprocess_dir()
+        if directory is None:
+            samples_by_metric = {metric.name: metric.collect() for metric in self.metrics()}
+        else:
+            self.refresh_function_gauges()
+            samples_by_metric = _collect_multiprocess(directory, self._metrics)
+
+        lines = []
+        for metric in self.metrics():
+            samples = samples_by_metric.get(metric.name)
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _collect_multiprocess(directory: str, metrics: dict[str, _Metric]) -> dict[str, list]:
+    """Sum every worker's values; gauges only count workers that are still alive."""
+    totals: dict[tuple, float] = defaultdict(float)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        kind, _, pid = os.path.basename(path)[:-3].partition("_")
+        if kind == "gauge" and not _pid_alive(int(pid)):
+            continue
+        for key, value in MmapValueFile.read_all(path):
+            metric_name, sample_name, labels = json.loads(key)
+            totals[(metric_name, sample_name, json.dumps(labels, sort_keys=True))] += value
+
+    grouped: dict[str, dict] = defaultdict(dict)
+    for (metric_name, sample_name, labels_key), value in totals.items():
+        grouped[metric_name][(sample_name, labels_key)] = value
+
+    samples_by_metric = {}
+    for metric_name, values in grouped.items():
+        metric = metrics.get(metric_name)
+        if metric is None:
+            continue
+        if isinstance(metric, Histogram):
+            samples_by_metric[metric_name] = _merge_histogram(metric, values)
+        else:
+            samples_by_metric[metric_name] = [
+                (sample_name, json.loads(labels_key), value)
+                for (sample_name, labels_key), value in sorted(values.items())
+            ]
+    return samples_by_metric
+
+
+def _merge_histogram(metric: Histogram, values: dict) -> list:
+    series: dict[str, dict] = defaultdict(lambda: {"buckets": {}, "sum": 0.0})
+    for (sample_name, labels_key), value in values.items():
+        labels = json.loads(labels_key)
+        if sample_name.endswith("_bucket"):
+            bound = labels.pop("le")
+            series[json.dumps(labels, sort_keys=True)]["buckets"][bound] = value
+        else:
+            series[labels_key]["sum"] = value
+
+    bounds = [repr(bound) for bound in metric.buckets] + ["+Inf"]
+    samples = []
+    for labels_key in sorted(series):
+        entry = series[labels_key]
+        samples.extend(
+            _histogram_samples(
+                metric.name,
+                json.loads(labels_key),
+                [(bound, entry["buckets"].get(bound, 0.0)) for bound in bounds],
+                entry["sum"],
+            )
+        )
+    return samples
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return f"{int(value)}.0"
+    return repr(float(value))
+
+
+registry = Registry()
@@ -1,35 +1,150 @@
 import logging
+import time
 import uuid
+
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, Request
-import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.compression import CompressionMiddleware
+from core.config import settings
+from core.context import request_id_var
+from core.loop_monitor import attributed
+from core.metrics import registry
+from core.tracing import span
+from db.instrumentation import track_queries
+from db.routing import pending_cookie
 
 
 logger = logging.getLogger("app")
 
-def register_middleware(app: FastAPI):
-    origins = ["http://localhost:5173", "http://127.0.0.1:5173"]
-    app.add_middleware(CORSMiddleware, allow_origins=origins, allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response, by route template, method and status.",
+    labelnames=("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight",
+    "Requests currently being served.",
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Matched path template (``/api/v1/expenses/{expense_id}``) to keep label cardinality bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def request_header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _describe_root_span(root, scope: Scope, status: int) -> None:
+    # The route is only known once routing ran, so name the span at the end.
+    if root is None:
+        return
+    route = route_template(scope)
+    root.name = f"{scope['method']} {route}"
+    root.attributes.update({"http.method": scope["method"], "http.route": route, "http.status_code": status})
 
 
-    @app.middleware("http")
-    async def request_id_and_logging(request: Request, call_next):
-        
-        request_id= request.headers.get("X-Request-ID") or str(uuid.uuid4()) 
-        request.state.request_id = request_id
+class RequestContextMiddleware:
+    """Request id, query accounting, metrics and the access log line.
 
+    Plain ASGI: the response streams straight through and only the start
+    message is touched to add headers, so there is no per-request task or
+    body buffering as with ``@app.middleware("http")``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = request_header(scope, b"x-request-id") or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        request_id_token = request_id_var.set(request_id)
+        status = 500
         start = time.perf_counter()
-        response = await call_next(request)
-        duration = round((time.perf_counter()-start)*1000,2)
-        response.headers["X-Request-ID"]=request_id 
+        REQUESTS_IN_FLIGHT.inc()
+
+        with track_queries() as query_stats:
+
+            async def send_with_headers(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"x-request-id", request_id.encode("latin-1")))
+                    headers.append((b"x-db-queries", str(query_stats.count).encode()))
+                    headers.append((b"x-db-time", f"{round(query_stats.total_ms, 2)}ms".encode()))
+                    # Set by get_db once a write committed, before the response starts.
+                    cookie = pending_cookie(scope)
+                    if cookie is not None:
+                        headers.append((b"set-cookie", cookie.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                with span(f"{scope['method']} {scope['path']}", "http") as root:
+                    try:
+                        await attributed(self.app(scope, receive, send_with_headers))
+                    finally:
+                        _describe_root_span(root, scope, status)
+            finally:
+                request_id_var.reset(request_id_token)
+                REQUESTS_IN_FLIGHT.dec()
+                elapsed = time.perf_counter() - start
+                route = route_template(scope)
+                REQUEST_LATENCY.labels(
+                    method=scope["method"], route=route, status=status
+                ).observe(elapsed)
+                capture = getattr(scope["app"].state, "capture", None) if "app" in scope else None
+                if capture is not None:
+                    capture.record(scope, route, status, elapsed, query_stats.count)
+                registry.refresh_function_gauges(min_interval=1.0)
+                self._log(scope, status, elapsed, query_stats, request_id)
 
+    @staticmethod
+    def _log(scope: Scope, status: int, elapsed: float, query_stats, request_id: str) -> None:
+        db_time = round(query_stats.total_ms, 2)
         logger.info(
-            "%s %s -> %s (%sms) rid=%s",
-            request.method,
-            request.url.path,
-            response.status_code,
-            duration,
+            "%s %s -> %s (%sms) db=%s/%sms rid=%s",
+            scope["method"],
+            scope["path"],
+            status,
+            round(elapsed * 1000, 2),
+            query_stats.count,
+            db_time,
             request_id,
         )
 
-        return response
+        for shape, count in query_stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                "Possible N+1: statement ran %s times in %s %s rid=%s: %s",
+                count,
+                scope["method"],
+                scope["path"],
+                request_id,
+                shape,
+            )
+
+
+def register_middleware(app: FastAPI):
+    origins = ["http://localhost:5173", "http://127.0.0.1:5173"]
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+    app.add_middleware(CORSMiddleware, allow_origins=origins, allow_credentials=True, allow_methods=["*"], allow_headers=["*"], expose_headers=["ETag", "Last-Modified", "X-Request-ID"])
+    if settings.PROFILING_SECRET:
+        # Imported here so deployments without a secret never load the profiler.
+        from core.profiling import ProfilingMiddleware
+
+        app.add_middleware(
+            ProfilingMiddleware, secret=settings.PROFILING_SECRET, directory=settings.PROFILING_DIR
+        )
+    app.add_middleware(RequestContextMiddleware)
@@ -0,0 +1,193 @@
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.middleware import request_header
+from db.instrumentation import track_queries
+
+
+logger = logging.getLogger("app.profiling")
+
+PROFILE_HEADER = b"x-profile"
+
+# Functions whose cumulative time counts as response serialization.
+_SERIALIZATION_FUNCTIONS = {
+    ("fastapi/routing.py", "serialize_response"),
+    ("starlette/responses.py", "render"),
+    ("fastapi/responses.py", "render"),
+}
+_SAFE_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+# How long a signature from ``python -m core.profiling`` stays valid.
+SIGNATURE_TTL_SECONDS = 300
+
+
+def _digest(secret: str, request_id: str, expires: int) -> str:
+    message = f"{request_id}:{expires}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def profile_signature(secret: str, request_id: str, expires: int | None = None) -> str:
+    """Value of the ``X-Profile`` header that enables profiling for ``request_id``.
+
+    ``<expires>.<hex HMAC>``, where ``expires`` is a Unix time (default: in
+    SIGNATURE_TTL_SECONDS) after which the signature is refused.
+    """
+    if expires is None:
+        expires = int(time.time()) + SIGNATURE_TTL_SECONDS
+    return f"{expires}.{_digest(secret, request_id, expires)}"
+
+
+def verify_signature(secret: str, request_id: str, signature: str, now: float | None = None) -> bool:
+    expires, _, digest = signature.partition(".")
+    if not expires.isdigit():
+        return False
+    if not hmac.compare_digest(digest, _digest(secret, request_id, int(expires))):
+        return False
+    return int(expires) > (now or time.time())
+
+
+def summarize(profile: pstats.Stats, wall_seconds: float, query_stats, top: int = 25) -> dict:
+    """Split a request's wall time into DB, serialization and remaining Python time."""
+    serialization = 0.0
+    functions = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in profile.stats.items():
+        normalized = filename.replace(os.sep, "/")
+        if any(normalized.endswith(path) and function == name for path, name in _SERIALIZATION_FUNCTIONS):
+            serialization += cumulative
+        functions.append(
+            {
+                "function": f"{filename}:{line}({function})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+        )
+    functions.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    db_seconds = query_stats.total_seconds
+    return {
+        "wall_ms": round(wall_seconds * 1000, 3),
+        "db_ms": round(db_seconds * 1000, 3),
+        "db_queries": query_stats.count,
+        "serialization_ms": round(serialization * 1000, 3),
+        "python_ms": round(max(wall_seconds - db_seconds - serialization, 0.0) * 1000, 3),
+        "top_functions": functions[:top],
+    }
+
+
+class ProfilingMiddleware:
+    """Run a request under cProfile when it carries a valid signed header.
+
+    The caller sends ``X-Request-ID: <id>`` and ``X-Profile`` from
+    ``profile_signature`` (an HMAC-SHA256 over the id and an expiry time).
+    The profile is written to ``<directory>/<id>-<time>-<random>.prof``
+    (pstats format, e.g. for snakeviz) with a ``.json`` summary next to it;
+    the suffix keeps a reused id from overwriting an earlier profile. Only one request is profiled at
+    a time per worker because cProfile sees everything running on the event
+    loop thread; concurrent flagged requests run unprofiled. Only install
+    this middleware when a secret is configured, so normal deployments pay
+    nothing for it.
+    """
+
+    def __init__(self, app: ASGIApp, secret: str, directory: str):
+        self.app = app
+        self.secret = secret
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _requested(self, scope: Scope) -> str | None:
+        signature = request_header(scope, PROFILE_HEADER)
+        if signature is None:
+            return None
+        request_id = scope.get("state", {}).get("request_id") or request_header(scope, b"x-request-id")
+        if not request_id or not _SAFE_REQUEST_ID.match(request_id):
+            return None
+        if not verify_signature(self.secret, request_id, signature):
+            logger.warning("Rejected profiling request with a bad or expired signature rid=%s", request_id)
+            return None
+        return request_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_id = self._requested(scope) if scope["type"] == "http" else None
+        if request_id is None:
+            await self.app(scope, receive, send)
+            return
+        if not self._lock.acquire(blocking=False):
+            logger.warning("Profiler busy, serving rid=%s unprofiled", request_id)
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        profile_id = f"{request_id}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", ()), (b"x-profile-id", profile_id.encode())],
+                }
+            await send(message)
+
+        profiler = cProfile.Profile()
+        try:
+            with track_queries() as query_stats:
+                start = time.perf_counter()
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_with_status)
+                finally:
+                    profiler.disable()
+                    wall = time.perf_counter() - start
+        finally:
+            self._lock.release()
+
+        summary = {
+            "request_id": request_id,
+            "profile_id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            **summarize(pstats.Stats(profiler), wall, query_stats),
+        }
+        await asyncio.to_thread(self._write, profile_id, profiler, summary)
+
+    def _write(self, profile_id: str, profiler: cProfile.Profile, summary: dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile_id)
+        profiler.dump_stats(f"{base}.prof")
+        with open(f"{base}.json", "w") as handle:
+            json.dump(summary, handle, indent=2)
+        logger.info(
+            "Profiled %s %s rid=%s wall=%sms db=%sms python=%sms serialization=%sms -> %s.prof",
+            summary["method"],
+            summary["path"],
+            summary["request_id"],
+            summary["wall_ms"],
+            summary["db_ms"],
+            summary["python_ms"],
+            summary["serialization_ms"],
+            base,
+        )
+
+
+if __name__ == "__main__":
+    # python -m core.profiling <request-id> [ttl-seconds]  -> value for the X-Profile header
+    from core.config import settings
+
+    if not settings.PROFILING_SECRET:
+        sys.exit("PROFILING_SECRET is not set")
+    ttl = int(sys.argv[2]) if len(sys.argv) > 2 else SIGNATURE_TTL_SECONDS
+    print(profile_signature(settings.PROFILING_SECRET, sys.argv[1], int(time.time()) + ttl))
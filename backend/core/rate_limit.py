@@ -0,0 +1,238 @@
+import functools
+import ipaddress
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from core.config import Settings, settings
+from core.metrics import registry
+
+try:  # optional: pip install redis
+    from redis import asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - depends on the environment
+    redis_asyncio = None
+
+
+logger = logging.getLogger("app.rate_limit")
+
+RATE_LIMIT_DECISIONS = registry.counter(
+    "rate_limit_decisions",
+    "Rate limiter outcomes by route class (allowed or limited).",
+    labelnames=("route_class", "result"),
+)
+RATE_LIMIT_STORE_ERRORS = registry.counter(
+    "rate_limit_store_errors",
+    "Shared store failures; requests are let through when the store is down.",
+)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class BucketStore(Protocol):
+    async def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Decision:
+        ...
+
+    async def reset(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+def _refill(tokens: float, elapsed: float, capacity: float, refill_per_second: float) -> float:
+    return min(capacity, tokens + max(elapsed, 0.0) * refill_per_second)
+
+
+class MemoryBucketStore:
+    """Token buckets in this worker's memory.
+
+    Every uvicorn worker keeps its own buckets, so the effective limit is
+    roughly ``workers x capacity``; use the Redis store to share them.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Decision:
+        # No awaits in here: the read-modify-write cannot interleave on the loop.
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = _refill(tokens, now - updated_at, capacity, refill_per_second)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+        return Decision(allowed, tokens, retry_after)
+
+    async def reset(self) -> None:
+        self._buckets.clear()
+
+    async def close(self) -> None:
+        self._buckets.clear()
+
+
+# KEYS[1] bucket; ARGV: cost, capacity, refill_per_second. Uses the server
+# clock so every worker agrees on elapsed time.
+_TAKE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by all workers through Redis (atomic Lua script)."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        if redis_asyncio is None:
+            raise RuntimeError("RATE_LIMIT_STORE=redis requires the 'redis' package")
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> Decision:
+        allowed, tokens = await self._script(
+            keys=[self.prefix + key], args=[cost, capacity, refill_per_second]
+        )
+        tokens = float(tokens)
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+        return Decision(bool(allowed), tokens, retry_after)
+
+    async def reset(self) -> None:
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+ROUTE_CLASSES = ("default", "report", "auth")
+
+
+def build_store(name: str) -> BucketStore:
+    if name == "memory":
+        return MemoryBucketStore()
+    if name == "redis":
+        return RedisBucketStore(settings.REDIS_URL)
+    raise ValueError(f"Unknown RATE_LIMIT_STORE: {name}")
+
+
+class RateLimiter:
+    """A token bucket per client and route class; each class has its own cost per request."""
+
+    def __init__(
+        self,
+        store: BucketStore,
+        capacity: float,
+        refill_per_second: float,
+        costs: dict[str, float],
+    ):
+        # Retry-After and the Redis key expiry divide by the refill rate.
+        if refill_per_second <= 0:
+            raise ValueError("RATE_LIMIT_REFILL_PER_SECOND must be > 0")
+        # A request costing more than a full bucket would be refused forever.
+        for route_class, cost in costs.items():
+            if cost > capacity:
+                raise ValueError(
+                    f"The {route_class} route cost ({cost}) must be <= RATE_LIMIT_CAPACITY ({capacity})"
+                )
+        self.store = store
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.costs = costs
+
+    def cost(self, route_class: str) -> float:
+        return self.costs[route_class]
+
+    async def hit(self, client: str, route_class: str) -> Decision:
+        try:
+            decision = await self.store.take(
+                f"{route_class}:{client}",
+                self.cost(route_class),
+                self.capacity,
+                self.refill_per_second,
+            )
+        except Exception:
+            # A broken shared store must not take the API down with it.
+            logger.exception("Rate limit store failed; allowing request")
+            RATE_LIMIT_STORE_ERRORS.inc()
+            return Decision(True, self.capacity, 0.0)
+        RATE_LIMIT_DECISIONS.labels(
+            route_class=route_class, result="allowed" if decision.allowed else "limited"
+        ).inc()
+        return decision
+
+    async def close(self) -> None:
+        await self.store.close()
+
+
+@functools.lru_cache(maxsize=8)
+def _networks(trusted: tuple[str, ...]) -> tuple:
+    return tuple(ipaddress.ip_network(entry, strict=False) for entry in trusted)
+
+
+def _is_trusted(address: str, trusted: tuple[str, ...]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _networks(trusted))
+
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str], trusted: tuple[str, ...]) -> str:
+    """The client's IP: the peer, or behind trusted proxies the address they saw.
+
+    X-Forwarded-For is read right to left, skipping trusted proxies; the first
+    other address is the client. Entries further left were written by the
+    client itself and cannot be believed.
+    """
+    if not peer or not forwarded_for or not _is_trusted(peer, trusted):
+        return peer or "unknown"
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def build_limiter(settings: Settings) -> RateLimiter:
+    return RateLimiter(
+        build_store(settings.RATE_LIMIT_STORE),
+        capacity=settings.RATE_LIMIT_CAPACITY,
+        refill_per_second=settings.RATE_LIMIT_REFILL_PER_SECOND,
+        costs={
+            "default": 1,
+            "report": settings.RATE_LIMIT_REPORT_COST,
+            "auth": settings.RATE_LIMIT_AUTH_COST,
+        },
+    )
@@ -1,3 +1,4 @@
+import functools
 from core.config import settings
 from typing import Optional 
 
@@ -6,21 +7,22 @@ from jwt.exceptions import InvalidTokenError
 
 from fastapi.security import OAuth2PasswordBearer
 from pwdlib import PasswordHash
-from repositories import users as user_repo
-from db.session import get_db
 from fastapi import security, status, HTTPException
 
 from datetime import datetime, timedelta, timezone
 
-password_hash = PasswordHash.recommended()
-
 #Password Hashing
 
+@functools.cache
+def password_hasher() -> PasswordHash:
+    """Built on first use; the app lifespan calls it so requests don't pay for it."""
+    return PasswordHash.recommended()
+
 def hash_password(plaintext:str)->str:
-    return password_hash.hash(plaintext)
+    return password_hasher().hash(plaintext)
 
 def verify_hashed_password(plaintext:str, hashed_password:str)->bool:
-    return password_hash.verify(plaintext,hashed_password)
+    return password_hasher().verify(plaintext,hashed_password)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
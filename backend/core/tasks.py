@@ -0,0 +1,260 @@
+"""In-process background tasks for post-write side effects.
+
+Writes record their side effects as outbox rows in the same transaction
+(``repositories.outbox.enqueue``). Once the transaction commits, the rows go
+straight onto this worker's bounded queue and asyncio workers run their
+handlers. If the queue is full or the process dies, the rows stay in the
+table, and a periodic sweep claims them once their lease expires. Delivery
+is at-least-once, so handlers must be idempotent.
+
+The lease is renewed before each handler runs, so a slow task is not
+claimed again by a sweep meanwhile; a task whose row is gone or taken over
+is skipped. Handlers that succeeded are recorded on the row, and a retry
+runs only the ones that have not.
+"""
+
+import asyncio
+import datetime
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.metrics import registry
+from repositories import outbox as outbox_repo
+
+
+logger = logging.getLogger("app.tasks")
+
+TASK_QUEUE_DEPTH = registry.gauge(
+    "task_queue_depth",
+    "Tasks waiting in this worker's in-process queue.",
+)
+TASK_LAG_SECONDS = registry.histogram(
+    "task_lag_seconds",
+    "Time from the write committing its task to a handler starting on it.",
+    labelnames=("kind",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 1800.0),
+)
+TASKS_PROCESSED = registry.counter(
+    "tasks_processed",
+    "Handled tasks by kind and result (ok, retry, failed, skipped).",
+    labelnames=("kind", "result"),
+)
+TASKS_DEFERRED = registry.counter(
+    "tasks_deferred",
+    "Committed tasks that did not fit in the queue and were left for the sweep.",
+)
+
+
+@dataclass
+class Task:
+    id: int
+    kind: str
+    user_id: Optional[int]
+    payload: dict
+    created_at: datetime.datetime
+    attempts: int = 0
+    # The lease this worker holds on the row (its available_at), and the
+    # handlers that already succeeded on earlier attempts.
+    lease: Optional[datetime.datetime] = None
+    done: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_row(cls, row) -> "Task":
+        created_at = row.created_at or datetime.datetime.now(datetime.UTC)
+        return cls(
+            row.id,
+            row.kind,
+            row.user_id,
+            row.payload,
+            created_at,
+            row.attempts or 0,
+            row.available_at,
+            list(row.handlers_done or []),
+        )
+
+
+Handler = Callable[[Task], Awaitable[None]]
+HANDLERS: dict[str, list[Handler]] = {}
+
+
+def handles(*kinds: str):
+    """Register the decorated coroutine for each task kind."""
+
+    def register(handler: Handler) -> Handler:
+        for kind in kinds:
+            HANDLERS.setdefault(kind, []).append(handler)
+        return handler
+
+    return register
+
+
+def handler_name(handler: Handler) -> str:
+    return f"{handler.__module__}.{handler.__qualname__}"
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at five minutes."""
+    return min(300.0, 2 ** attempts) * random.uniform(0.5, 1.0)
+
+
+class TaskQueue:
+    """Bounded queue plus worker and sweeper tasks for one app worker."""
+
+    def __init__(
+        self,
+        session_factory,
+        *,
+        workers: int,
+        maxsize: int,
+        max_attempts: int,
+        poll_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.queue: asyncio.Queue[Task] = asyncio.Queue(maxsize)
+        self._tasks: list[asyncio.Task] = []
+        TASK_QUEUE_DEPTH.set_function(self.queue.qsize)
+
+    def submit(self, task: Task) -> bool:
+        """Queue a committed task; False leaves it to a later sweep."""
+        try:
+            self.queue.put_nowait(task)
+        except asyncio.QueueFull:
+            TASKS_DEFERRED.inc()
+            return False
+        return True
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"task-worker-{n}") for n in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._sweep(), name="task-sweeper"))
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Give queued tasks a moment to finish; the rest resume from the outbox."""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %s queued tasks; they stay in the outbox", self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self) -> None:
+        while True:
+            task = await self.queue.get()
+            try:
+                await self.run(task)
+            except Exception:
+                logger.exception("Task %s (%s) bookkeeping failed", task.id, task.kind)
+            finally:
+                self.queue.task_done()
+
+    async def run(self, task: Task) -> None:
+        TASK_LAG_SECONDS.labels(kind=task.kind).observe(
+            max(0.0, (datetime.datetime.now(datetime.UTC) - task.created_at).total_seconds())
+        )
+        for handler in HANDLERS.get(task.kind, ()):
+            name = handler_name(handler)
+            if name in task.done:
+                continue
+            async with self.session_factory() as db, db.begin():
+                lease = await outbox_repo.renew_lease(db, task.id, lease=task.lease, done=task.done)
+            if lease is None:
+                TASKS_PROCESSED.labels(kind=task.kind, result="skipped").inc()
+                logger.info("Task %s (%s) was completed or taken over elsewhere", task.id, task.kind)
+                return
+            task.lease = lease
+            try:
+                await handler(task)
+            except Exception as exc:
+                await self._failed(task, f"{type(exc).__name__}: {exc}")
+                return
+            task.done.append(name)
+        async with self.session_factory() as db, db.begin():
+            await outbox_repo.complete(db, task.id)
+        TASKS_PROCESSED.labels(kind=task.kind, result="ok").inc()
+
+    async def _failed(self, task: Task, error: str) -> None:
+        attempts = task.attempts + 1
+        async with self.session_factory() as db, db.begin():
+            if attempts >= self.max_attempts:
+                await outbox_repo.mark_failed(
+                    db, task.id, lease=task.lease, done=task.done, attempts=attempts, error=error
+                )
+                TASKS_PROCESSED.labels(kind=task.kind, result="failed").inc()
+                logger.error("Task %s (%s) failed for good: %s", task.id, task.kind, error)
+            else:
+                delay = retry_delay(attempts)
+                await outbox_repo.retry_later(
+                    db, task.id, lease=task.lease, done=task.done, attempts=attempts, delay=delay, error=error
+                )
+                TASKS_PROCESSED.labels(kind=task.kind, result="retry").inc()
+                logger.warning(
+                    "Task %s (%s) failed, retrying in %.0fs: %s", task.id, task.kind, delay, error
+                )
+
+    async def sweep_once(self) -> int:
+        """Claim due tasks (retries, expired leases) into the free queue space."""
+        room = self.queue.maxsize - self.queue.qsize() if self.queue.maxsize else 100
+        if room <= 0:
+            return 0
+        async with self.session_factory() as db, db.begin():
+            rows = await outbox_repo.claim_due(db, room)
+        for row in rows:
+            self.submit(Task.from_row(row))
+        return len(rows)
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.sweep_once()
+            except Exception:
+                logger.exception("Outbox sweep failed")
+
+
+_queue: Optional[TaskQueue] = None
+
+
+def use_queue(queue: Optional[TaskQueue]) -> None:
+    """Install this worker's queue (or None: committed tasks wait for a sweep)."""
+    global _queue
+    _queue = queue
+
+
+def build_task_queue(settings, database) -> Optional[TaskQueue]:
+    if not settings.TASK_QUEUE_ENABLED:
+        return None
+    return TaskQueue(
+        database.session_factory,
+        workers=settings.TASK_WORKERS,
+        maxsize=settings.TASK_QUEUE_SIZE,
+        max_attempts=settings.TASK_MAX_ATTEMPTS,
+        poll_interval=settings.TASK_POLL_SECONDS,
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed(session):
+    pending = session.info.pop(outbox_repo.PENDING_KEY, None)
+    if not pending or _queue is None:
+        return
+    for row in pending:
+        _queue.submit(Task.from_row(row))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction):
+    # Only the outermost transaction: rows from a rolled-back savepoint are
+    # gone too, but they are not worth tracking separately.
+    if previous_transaction.parent is None:
+        session.info.pop(outbox_repo.PENDING_KEY, None)
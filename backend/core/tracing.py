@@ -0,0 +1,312 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from core.config import settings
+from core.context import request_id_var
+from core.metrics import registry
+
+
+logger = logging.getLogger("app.tracing")
+
+SPANS_DROPPED = registry.counter(
+    "trace_spans_dropped",
+    "Finished spans never exported, by reason (queue_full or write_error).",
+    labelnames=("reason",),
+)
+
+
+@dataclass
+class Span:
+    name: str
+    layer: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    request_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    status: str = "ok"
+    attributes: dict = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "layer": self.layer,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "request_id": self.request_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list; for tests."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _BackgroundExporter:
+    """Hands spans to a writer thread so request code never waits on I/O.
+
+    The queue is bounded: when the writer falls behind (a slow collector),
+    new spans are dropped and counted rather than piling up in memory.
+    """
+
+    batch_size = 256
+
+    def __init__(self, max_queue: int = 10_000):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            SPANS_DROPPED.labels(reason="queue_full").inc()
+
+    def shutdown(self) -> None:
+        try:
+            self._queue.put(None, timeout=5)
+        except queue.Full:
+            logger.warning("Span writer is stuck; %s spans not exported", self._queue.qsize())
+            return
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=0.5))
+                except queue.Empty:
+                    break
+            stop = None in batch
+            spans = [span for span in batch if span is not None]
+            if spans:
+                try:
+                    self.write(spans)
+                except Exception:
+                    SPANS_DROPPED.labels(reason="write_error").inc(len(spans))
+                    logger.exception("Dropped %s spans", len(spans))
+            if stop:
+                return
+
+    def write(self, spans: list[Span]) -> None:
+        raise NotImplementedError
+
+
+class JsonLinesExporter(_BackgroundExporter):
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str, max_queue: int = 10_000):
+        self.path = path
+        super().__init__(max_queue)
+
+    def write(self, spans: list[Span]) -> None:
+        with open(self.path, "a") as handle:
+            for span in spans:
+                handle.write(json.dumps(span.to_dict()) + "\n")
+
+
+class OtlpHttpExporter(_BackgroundExporter):
+    """Sends spans to an OpenTelemetry collector as OTLP/HTTP JSON."""
+
+    def __init__(
+        self, endpoint: str, service_name: str = "smart-expense-tracker", max_queue: int = 10_000
+    ):
+        import httpx
+
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=5.0)
+        super().__init__(max_queue)
+
+    def write(self, spans: list[Span]) -> None:
+        self._client.post(self.url, json=otlp_payload(spans, self.service_name)).raise_for_status()
+
+
+def otlp_payload(spans: list[Span], service_name: str) -> dict:
+    """OTLP/JSON ``ExportTraceServiceRequest`` body for a batch of spans."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "app"},
+                        "spans": [_otlp_span(span) for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> dict:
+    attributes = {"app.layer": span.layer, **span.attributes}
+    if span.request_id:
+        attributes["request.id"] = span.request_id
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 2 if span.layer == "http" else 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in attributes.items()],
+        "status": {"code": 2 if span.status == "error" else 1},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def build_exporter(name: str):
+    """Exporter for TRACE_EXPORTER: none, memory, jsonl or otlp."""
+    name = (name or "none").lower()
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryExporter()
+    if name == "jsonl":
+        return JsonLinesExporter(settings.TRACE_FILE, max_queue=settings.TRACE_QUEUE_SIZE)
+    if name == "otlp":
+        return OtlpHttpExporter(settings.OTLP_ENDPOINT, max_queue=settings.TRACE_QUEUE_SIZE)
+    raise ValueError(f"Unknown TRACE_EXPORTER: {name}")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(self, name: str, layer: str, attributes: Optional[dict] = None) -> Span:
+        parent = _current_span.get()
+        return Span(
+            name=name,
+            layer=layer,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            request_id=request_id_var.get(),
+            start_ns=time.time_ns(),
+            attributes=dict(attributes or {}),
+        )
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.status = "error"
+            span.attributes["error.type"] = type(error).__name__
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+
+# Disabled until the app lifespan installs the TRACE_EXPORTER exporter.
+tracer = Tracer()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def use_exporter(exporter) -> None:
+    """Swap the exporter at runtime (tests, or ``None`` to disable tracing)."""
+    previous = tracer.exporter
+    tracer.exporter = exporter
+    if previous is not None and previous is not exporter:
+        previous.shutdown()
+
+
+@contextmanager
+def span(name: str, layer: str, **attributes) -> Iterator[Optional[Span]]:
+    """Trace the enclosed block as a child of the current span."""
+    if not tracer.enabled:
+        yield None
+        return
+    current = tracer.start_span(name, layer, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        tracer.end_span(current, exc)
+        raise
+    else:
+        tracer.end_span(current)
+    finally:
+        _current_span.reset(token)
+
+
+def traced(layer: str):
+    """Decorator recording a span named ``<module>.<function>`` for each call."""
+
+    def decorate(function):
+        name = f"{function.__module__}.{function.__qualname__}"
+
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await function(*args, **kwargs)
+                with span(name, layer):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with span(name, layer):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -11,4 +11,6 @@ class Base(DeclarativeBase):
 import models.categories  # noqa: E402,F401
 import models.expense  # noqa: E402,F401
 import models.goals  # noqa: E402,F401
+import models.outbox  # noqa: E402,F401
+import models.recurring  # noqa: E402,F401
 import models.user  # noqa: E402,F401
@@ -0,0 +1,147 @@
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.metrics import registry
+from db.routing import session_has_writes
+
+
+Read = Callable[[AsyncSession], Awaitable[Any]]
+
+CONCURRENT_READS = registry.counter(
+    "db_concurrent_read_batches",
+    "gather_reads calls, by whether any read borrowed a connection or all ran on the request session.",
+    labelnames=("mode",),
+)
+
+
+class _Budget:
+    """Connection slots taken without waiting: a read either gets one now or
+    runs on the request's own session."""
+
+    def __init__(self, slots: int):
+        self.free = slots
+
+    def try_acquire(self) -> bool:
+        if self.free <= 0:
+            return False
+        self.free -= 1
+        return True
+
+    def release(self) -> None:
+        self.free += 1
+
+
+# One budget per pool, shared by every request on this worker.
+_pool_budgets: "weakref.WeakKeyDictionary[Any, _Budget]" = weakref.WeakKeyDictionary()
+
+
+def _pool_budget(session: AsyncSession) -> _Budget:
+    pool = session.bind.pool
+    budget = _pool_budgets.get(pool)
+    if budget is None:
+        # Borrowed connections belong to requests that already hold one. Up
+        # to half the pool may be borrowed, so the other half is always left
+        # to holders that are not waiting, and borrowers never starve each
+        # other until pool_timeout.
+        capacity = pool.size() + max(settings.DB_MAX_OVERFLOW, 0)
+        budget = _pool_budgets[pool] = _Budget(capacity // 2)
+    return budget
+
+
+def _request_budget(session: AsyncSession) -> _Budget:
+    # Kept on the request's session, so every gather_reads call in the
+    # request shares one budget. The session's own connection counts too.
+    budget = session.info.get("read_budget")
+    if budget is None:
+        budget = session.info["read_budget"] = _Budget(settings.DB_REQUEST_CONCURRENCY - 1)
+    return budget
+
+
+def _session_lock(session: AsyncSession) -> asyncio.Lock:
+    # A session runs one statement at a time.
+    lock = session.info.get("read_lock")
+    if lock is None:
+        lock = session.info["read_lock"] = asyncio.Lock()
+    return lock
+
+
+def _run_sequentially(session: AsyncSession, reads: tuple) -> bool:
+    if len(reads) < 2 or settings.DB_REQUEST_CONCURRENCY < 2:
+        return True
+    if not isinstance(session, AsyncSession) or session.bind is None:
+        return True
+    # Pending or flushed writes are only visible on this session's connection.
+    return bool(session_has_writes(session) or session.new or session.dirty or session.deleted)
+
+
+async def gather_reads(session: AsyncSession, *reads: Read) -> list[Any]:
+    """Run independent reads concurrently on the request session and borrowed connections.
+
+    Each read is a callable taking a session, e.g. ``lambda db:
+    repo.count_for_user(db, user)``. Results come back in argument order, and
+    request latency becomes that of the slowest read instead of the sum.
+
+    The first read runs on ``session`` itself, whose connection the request
+    already holds. The others borrow a connection each, on short sessions
+    bound to the same engine, so replica routing, statement timeouts, query
+    counts and trace spans carry over. A request uses at most
+    DB_REQUEST_CONCURRENCY connections including its own, and a worker lends
+    out at most half its pool. Slots are only taken when free: a read that
+    gets none queues behind the first one on ``session`` instead of holding
+    the request's connection while waiting for the pool.
+
+    Under READ COMMITTED each statement already sees its own snapshot, so
+    splitting statements across connections loses no consistency. Objects
+    loaded on borrowed sessions are detached: they should not need lazy
+    loads afterwards.
+
+    Everything runs one after another on ``session`` when it holds writes
+    the reads must see, or when ``session`` is not a real AsyncSession.
+    """
+    if _run_sequentially(session, reads):
+        CONCURRENT_READS.labels(mode="sequential").inc()
+        return [await read(session) for read in reads]
+
+    request_budget = _request_budget(session)
+    pool_budget = _pool_budget(session)
+    local: list[int] = [0]
+    borrowed: list[int] = []
+    for index in range(1, len(reads)):
+        if request_budget.try_acquire():
+            if pool_budget.try_acquire():
+                borrowed.append(index)
+                continue
+            request_budget.release()
+        local.append(index)
+    CONCURRENT_READS.labels(mode="concurrent" if borrowed else "sequential").inc()
+
+    results: list[Any] = [None] * len(reads)
+
+    async def run_local():
+        async with _session_lock(session):
+            for index in local:
+                results[index] = await reads[index](session)
+
+    async def run_borrowed(index: int):
+        try:
+            async with AsyncSession(bind=session.bind, expire_on_commit=False) as own:
+                results[index] = await reads[index](own)
+        finally:
+            pool_budget.release()
+            request_budget.release()
+
+    tasks = [asyncio.create_task(run_local())]
+    tasks += [asyncio.create_task(run_borrowed(index)) for index in borrowed]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Do not leave sibling queries holding connections after a failure.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return results
@@ -0,0 +1,135 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+from core.context import request_id_var
+from core.tracing import tracer
+
+
+slow_query_logger = logging.getLogger("app.db.slow")
+
+
+_WHITESPACE = re.compile(r"\s+")
+_EXPANDED_IN = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse whitespace and expanded IN lists so equal queries compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _EXPANDED_IN.sub("IN (...)", shape)
+
+
+def bind_shape(parameters, executemany: bool = False) -> str:
+    """Describe bound parameters by name and type without leaking their values."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else {}
+        return f"{len(parameters)}x {bind_shape(first)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+class QueryStats:
+    """Statements executed while a tracking scope is active."""
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        shape = statement_shape(statement)
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.shapes[shape] += 1
+            stats = stats.parent
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times (likely N+1)."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count statements run in this context; nested scopes also feed their parent."""
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if tracer.enabled:
+        conn.info["query_span"] = tracer.start_span(
+            "sql", "db", {"db.statement": statement_shape(statement)}
+        )
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish(conn, statement, parameters, executemany)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    if exception_context.connection is not None and exception_context.statement is not None:
+        _finish(
+            exception_context.connection,
+            exception_context.statement,
+            exception_context.parameters,
+            bool(exception_context.execution_context and exception_context.execution_context.executemany),
+            failed=True,
+        )
+
+
+def _finish(conn, statement: str, parameters, executemany: bool, failed: bool = False) -> None:
+    query_span = conn.info.pop("query_span", None)
+    if query_span is not None:
+        if failed:
+            query_span.status = "error"
+        tracer.end_span(query_span)
+    started = conn.info.pop("query_started_at", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= settings.SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            "Slow query %.1fms%s rid=%s binds=%s sql=%s",
+            elapsed_ms,
+            " (failed)" if failed else "",
+            request_id_var.get(),
+            bind_shape(parameters, executemany),
+            statement_shape(statement),
+        )
@@ -0,0 +1,105 @@
+import logging
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.config import settings
+from core.metrics import registry
+
+
+logger = logging.getLogger("app.db.pool")
+
+POOL_CHECKOUT_SECONDS = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled connection (including connect and pre-ping).",
+    labelnames=("pool",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up after the pool timeout.",
+    labelnames=("pool",),
+)
+POOL_CHECKED_OUT = registry.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    labelnames=("pool",),
+)
+POOL_OVERFLOW = registry.gauge(
+    "db_pool_overflow",
+    "Connections currently open beyond pool_size.",
+    labelnames=("pool",),
+)
+POOL_IDLE = registry.gauge(
+    "db_pool_idle",
+    "Connections sitting idle in the pool.",
+    labelnames=("pool",),
+)
+POOL_CAPACITY = registry.gauge(
+    "db_pool_capacity",
+    "Maximum connections the pool may open (pool_size + max_overflow).",
+    labelnames=("pool",),
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits."""
+
+    def connect(self):
+        pool_name = self.logging_name or "default"
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(pool=pool_name).inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            POOL_CHECKOUT_SECONDS.labels(pool=pool_name).observe(waited)
+            waited_ms = waited * 1000
+            if waited_ms > settings.DB_POOL_CHECKOUT_WARN_MS:
+                logger.warning(
+                    "Slow pool checkout pool=%s waited=%.1fms %s",
+                    pool_name,
+                    waited_ms,
+                    self.status(),
+                )
+
+
+def engine_options(name: str) -> dict:
+    """Pool keyword arguments for create_async_engine built from settings."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_logging_name": name,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def register_pool_metrics(engine: AsyncEngine, name: str) -> None:
+    """Expose live pool occupancy gauges for the given engine."""
+    # Read through engine.pool on every collection: the pool object is
+    # replaced when the engine is disposed or recreated.
+    POOL_CHECKED_OUT.labels(pool=name).set_function(lambda: engine.pool.checkedout())
+    POOL_OVERFLOW.labels(pool=name).set_function(lambda: max(engine.pool.overflow(), 0))
+    POOL_IDLE.labels(pool=name).set_function(lambda: engine.pool.checkedin())
+    POOL_CAPACITY.labels(pool=name).set_function(
+        lambda: engine.pool.size() + max(engine.pool._max_overflow, 0)
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Point-in-time occupancy snapshot of an engine's pool."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "idle": pool.checkedin(),
+    }
@@ -0,0 +1,76 @@
+import hashlib
+import hmac
+import math
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.types import Scope
+
+
+COOKIE_NAME = "read_primary_until"
+# Where get_db leaves the cookie for RequestContextMiddleware to send.
+PENDING_COOKIE = "read_after_write_cookie"
+
+
+class ReadAfterWrite:
+    """Keep a client's reads on the primary for a short window after it writes.
+
+    Replicas lag the primary slightly; routing a client's reads to the
+    primary for a short window after it writes gives read-your-writes
+    without pinning everyone to the primary. The window's end travels with
+    the client in a signed cookie, so it holds whichever worker serves the
+    next request, and the server keeps no state.
+    """
+
+    def __init__(self, window_seconds: float, secret: str):
+        self.window_seconds = window_seconds
+        self._key = secret.encode()
+
+    def _sign(self, until: int) -> str:
+        return hmac.new(self._key, f"read-after-write:{until}".encode(), hashlib.sha256).hexdigest()
+
+    def cookie(self, now: Optional[float] = None) -> Optional[str]:
+        """The Set-Cookie value that starts a client's window, or None if disabled."""
+        if self.window_seconds <= 0:
+            return None
+        until = math.ceil((now or time.time()) + self.window_seconds)
+        max_age = math.ceil(self.window_seconds)
+        return f"{COOKIE_NAME}={until}.{self._sign(until)}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+
+    def mark(self, request: Request) -> None:
+        cookie = self.cookie()
+        if cookie is not None:
+            setattr(request.state, PENDING_COOKIE, cookie)
+
+    def is_recent(self, request: Request, now: Optional[float] = None) -> bool:
+        value = request.cookies.get(COOKIE_NAME)
+        if not value or self.window_seconds <= 0:
+            return False
+        until, _, signature = value.partition(".")
+        if not until.isdigit() or not hmac.compare_digest(signature, self._sign(int(until))):
+            return False
+        # Bounded by the window too, so a leaked cookie cannot pin reads for long.
+        now = now or time.time()
+        return now < int(until) <= now + self.window_seconds + 1
+
+
+def pending_cookie(scope: Scope) -> Optional[str]:
+    return scope.get("state", {}).get(PENDING_COOKIE)
+
+
+def session_has_writes(session) -> bool:
+    return bool(session.info.get("has_writes"))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
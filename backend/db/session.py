@@ -1,15 +1,112 @@
+from fastapi import Depends, Request
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine 
-from core.config import settings
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from core.config import Settings
+from db import instrumentation  # noqa: F401  (registers query hooks)
+from db.pool import engine_options, register_pool_metrics
+from db.timeouts import connect_args
+from db.routing import ReadAfterWrite, session_has_writes
 
 
-engine = create_async_engine(settings.db_url,pool_size=5, max_overflow=10)
+class Database:
+    """Engines, session factories and read-your-writes state for one worker.
 
-AsyncSessionLocal = sessionmaker(bind = engine, expire_on_commit=False, class_=AsyncSession)
+    Created in the application lifespan (see app.main.create_app) and kept on
+    ``app.state.database``; nothing connects to Postgres at import time.
+    """
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
+    def __init__(self, settings: Settings):
+        self.engine = create_async_engine(
+            settings.db_url, connect_args=connect_args(), **engine_options("primary")
+        )
+        register_pool_metrics(self.engine, "primary")
+        self.session_factory = sessionmaker(
+            bind=self.engine, expire_on_commit=False, class_=AsyncSession
+        )
+
+        # Without a replica, reads share the primary session and its pool.
+        if settings.read_db_url:
+            self.read_engine = create_async_engine(
+                settings.read_db_url, connect_args=connect_args(), **engine_options("replica")
+            )
+            register_pool_metrics(self.read_engine, "replica")
+            self.read_session_factory = sessionmaker(
+                bind=self.read_engine, expire_on_commit=False, class_=AsyncSession
+            )
+        else:
+            self.read_engine = self.engine
+            self.read_session_factory = None
+
+        self.read_after_write = ReadAfterWrite(settings.READ_AFTER_WRITE_SECONDS, settings.JWT_SECRET)
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        if self.read_engine is not self.engine:
+            await self.read_engine.dispose()
+
+
+def get_database(request: Request) -> Database:
+    return request.app.state.database
+
+
+async def get_db(request: Request):
+    """Request-scoped unit of work.
+
+    Repositories only flush; the whole request commits once here, or rolls
+    back together if the handler raises. Declare it with scope="function" so
+    the commit happens, and the connection goes back to the pool, before the
+    response is serialized and sent. No connection is checked out until the
+    handler runs its first statement.
+    """
+    database = get_database(request)
+    async with database.session_factory() as session:
+        try:
+            yield session
+            if session.in_transaction():
+                await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        if session_has_writes(session):
+            database.read_after_write.mark(request)
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """Hand a read-only session's pooled connection back before slow non-DB work.
+
+    Sessions check a connection out lazily on their first statement and keep
+    it until the transaction ends. Call this after the last query when the
+    handler still has CPU-bound work to do (password hashing, report
+    aggregation). Loaded objects stay usable because expire_on_commit is off;
+    a later statement simply checks a connection out again. Sessions holding
+    writes are left alone so the request still commits them atomically.
+    """
+    if not session.in_transaction():
+        return
+    if session_has_writes(session) or session.new or session.dirty or session.deleted:
+        return
+    await session.commit()
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db, scope="function")):
+    """Session for read-only handlers, served by the replica when configured.
+
+    Clients that wrote within READ_AFTER_WRITE_SECONDS keep reading from the
+    primary so they see their own changes; the signed cookie set after their
+    write says so (see db.routing.ReadAfterWrite).
+
+    When the replica serves the request, the primary's connection (held since
+    the user lookup) is handed back first, so declare get_current_user before
+    this dependency.
+    """
+    database = get_database(request)
+    if database.read_session_factory is None or database.read_after_write.is_recent(request):
+        yield db
+        return
+
+    await release_connection(db)
+    async with database.read_session_factory() as session:
         try:
             yield session
         finally:
-            await session.close()    
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,47 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+
+
+# Per-request override of the connection's default statement_timeout.
+statement_timeout_var: ContextVar[Optional[int]] = ContextVar("statement_timeout_ms", default=None)
+
+
+TIMEOUT_GROUPS = ("interactive", "report")
+
+
+def timeout_budgets() -> dict[str, int]:
+    """Statement timeout (ms) for each endpoint group."""
+    return {
+        "interactive": settings.STATEMENT_TIMEOUT_MS,
+        "report": settings.REPORT_STATEMENT_TIMEOUT_MS,
+    }
+
+
+def connect_args() -> dict:
+    """Make the interactive budget the server-side default for every connection.
+
+    Interactive requests then pay no extra round trip; only groups with a
+    different budget issue a SET LOCAL at the start of their transaction.
+    """
+    return {"options": f"-c statement_timeout={settings.STATEMENT_TIMEOUT_MS}"}
+
+
+def use_statement_timeout(timeout_ms: int) -> None:
+    statement_timeout_var.set(timeout_ms)
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    timeout_ms = statement_timeout_var.get()
+    if timeout_ms is None or timeout_ms == settings.STATEMENT_TIMEOUT_MS:
+        return
+    if connection.dialect.name != "postgresql":
+        return
+    # SET LOCAL reverts at transaction end, so pooled connections never keep
+    # another request's budget.
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
@@ -0,0 +1,6 @@
+class NotModified(Exception):
+    """The client's cached representation is still current (HTTP 304)."""
+
+    def __init__(self, headers: dict[str, str]):
+        super().__init__("Not modified")
+        self.headers = headers
@@ -0,0 +1,6 @@
+class RateLimited(Exception):
+    """The client spent its token bucket; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too many requests")
+        self.retry_after = retry_after
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, validates
-from sqlalchemy import Float, Integer, String, DateTime, Text, ForeignKey, CheckConstraint
+from sqlalchemy import Float, Integer, String, DateTime, Text, ForeignKey, CheckConstraint, Index, UniqueConstraint
 from db.base import Base
 import datetime 
 
@@ -8,6 +8,11 @@ def utc_now():
 
 class Expense(Base):
     __tablename__="expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_id_occurred_at", "user_id", "occurred_at"),
+        # One expense per rule occurrence, so materializing twice is a no-op.
+        UniqueConstraint("recurring_id", "occurrence", name="uq_expenses_recurring_occurrence"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id:Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
@@ -16,6 +21,10 @@ class Expense(Base):
     occurred_at:Mapped[datetime.datetime] = mapped_column(DateTime, default = utc_now)
     title : Mapped[str] = mapped_column(String(50))
     note : Mapped[str]= mapped_column(Text)
+    recurring_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("recurring_expenses.id", ondelete="SET NULL"), nullable=True
+    )
+    occurrence: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     @validates("amount")
     def validate_amount(self, key, value):
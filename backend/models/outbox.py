@@ -0,0 +1,42 @@
+import datetime
+
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class OutboxTask(Base):
+    """A side effect recorded in the same transaction as the write that caused it.
+
+    Rows are deleted once their handler succeeds. ``available_at`` is both the
+    retry time and a lease: the worker that wrote or claimed a row pushes it
+    into the future, and any worker may take the row over once it passes.
+    ``handlers_done`` lists the handlers that already succeeded, so a retry
+    runs only the ones that have not.
+    """
+
+    __tablename__ = "outbox_tasks"
+    __table_args__ = (
+        Index(
+            "ix_outbox_tasks_pending",
+            "available_at",
+            postgresql_where=text("failed_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    available_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    handlers_done: Mapped[list] = mapped_column(JSON, nullable=False, default=list, server_default="[]")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set when the task ran out of attempts; kept for inspection.
+    failed_at: Mapped[datetime.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,62 @@
+import datetime
+
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+
+
+class RecurringExpense(Base):
+    """A rule that turns into one expense per occurrence (services.scheduler).
+
+    Occurrence ``n`` (counting from 0) falls ``n * every`` frequency units
+    after ``starts_at``. ``next_occurrence`` is the first occurrence not yet
+    materialized. ``next_run_at`` is when that occurrence is due, and it is
+    NULL once the rule has ended. Like ``expenses.occurred_at``, timestamps
+    are naive UTC.
+    """
+
+    __tablename__ = "recurring_expenses"
+    __table_args__ = (
+        Index(
+            "ix_recurring_expenses_due",
+            "next_run_at",
+            postgresql_where=text("active AND next_run_at IS NOT NULL"),
+        ),
+        Index("ix_recurring_expenses_user_id", "user_id"),
+        CheckConstraint("every > 0", name="ck_recurring_expenses_every"),
+        CheckConstraint("amount > 0", name="ck_recurring_expenses_amount"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    category_id: Mapped[int] = mapped_column(Integer, ForeignKey("categories.id", ondelete="CASCADE"))
+    amount: Mapped[float] = mapped_column(Float)
+    title: Mapped[str] = mapped_column(String(50))
+    note: Mapped[str] = mapped_column(Text, default="")
+    frequency: Mapped[str] = mapped_column(String(16))
+    every: Mapped[int] = mapped_column(Integer, default=1)
+    starts_at: Mapped[datetime.datetime] = mapped_column(DateTime)
+    ends_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    max_occurrences: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    next_occurrence: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_run_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    active: Mapped[bool] = mapped_column(Boolean, default=True, server_default=text("true"))
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.datetime.now(datetime.UTC),
+    )
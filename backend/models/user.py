@@ -1,7 +1,7 @@
 from datetime import datetime, UTC
 import re
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import DateTime, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, validates
 from db.base import Base
 
@@ -13,6 +13,12 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(UTC))
+    # Bumped whenever the user's expenses, categories or goals change; read
+    # endpoints derive their ETag / Last-Modified validators from it.
+    data_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    data_updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
 
     def __repr__(self) -> str:
         return (
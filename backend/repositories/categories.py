@@ -1,10 +1,13 @@
 from models.categories import Category
 from models.user import User
+from repositories.users import bump_data_version
+from repositories import outbox
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select, and_, delete
 from typing import List, Optional
 from exceptions.categories import CategoryAlreadyExists
+from core.tracing import traced
 
 
 
@@ -22,46 +25,56 @@ class Category(Base):
 """
 
 
+@traced("repository")
 async def list_for_user(db: AsyncSession, user: User)->List[Category]:
     query = select(Category).where(Category.user_id == user.id).order_by(Category.name)
     result = await db.execute(query)
     return result.scalars().all()
 
 
+@traced("repository")
 async def get_for_user(db: AsyncSession, user: User, category_id:int) -> Optional[Category]:
     query = select(Category).where(and_(Category.id == category_id, Category.user_id == user.id))
     result = await db.execute(query)
     return result.scalars().one_or_none()
 
 
+@traced("repository")
 async def get_by_name_for_user(db: AsyncSession, user: User, category_name:str)->Optional[Category]:
     query = select(Category).where(and_(Category.user_id == user.id, Category.name == category_name))
     result = await db.execute(query)
     return result.scalars().one_or_none()
 
+@traced("repository")
 async def create_for_user(db: AsyncSession, user: User, name:str, description:str) -> Optional[Category]:
     if await get_by_name_for_user(db, user, name):
         raise CategoryAlreadyExists(f"Category with '{name}' already exists") 
-    try :
-        category = Category(user_id=user.id, name=name, description=description)
-        db.add(category)
-        await db.commit()
-        await db.refresh(category)
-        return category
+    category = Category(user_id=user.id, name=name, description=description)
+    db.add(category)
+    try:
+        await db.flush()
     except IntegrityError:
-        await db.rollback()
-              
+        raise CategoryAlreadyExists(f"Category with '{name}' already exists")
+    version = await bump_data_version(db, user)
+    await outbox.enqueue(
+        db, "category.created", user, {"id": category.id, "name": category.name}, data_version=version
+    )
     return category
 
 
 #Optional stuff
 
+@traced("repository")
 async def delete_for_user(db: AsyncSession, user: User, category_id:str):
     query = delete(Category).where(and_(Category.id == category_id, Category.user_id == user.id))
-    await db.execute(query)
-    await db.commit()
+    result = await db.execute(query)
+    version = await bump_data_version(db, user)
+    if result.rowcount:
+        # The category's expenses go with it (ON DELETE CASCADE).
+        await outbox.enqueue(db, "category.deleted", user, {"id": int(category_id)}, data_version=version)
 
 
+@traced("repository")
 async def update_for_user(db: AsyncSession, user: User, category_id : int, **fields):
     ALLOW_UPDATE_FIELDS = ["name", "description"]
     category = await get_for_user(db, user, category_id)
@@ -78,7 +91,10 @@ async def update_for_user(db: AsyncSession, user: User, category_id : int, **fie
             continue
         setattr(category, key, value)
 
-    await db.commit()
-    await db.refresh(category)
+    await db.flush()
+    version = await bump_data_version(db, user)
+    await outbox.enqueue(
+        db, "category.updated", user, {"id": category.id, "name": category.name}, data_version=version
+    )
     return category
 
@@ -3,10 +3,13 @@ from models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from .categories import get_for_user as get_category_for_user
+from .users import bump_data_version
+from . import outbox
 from sqlalchemy import select, and_, asc, desc, func
 from datetime import datetime, timedelta, timezone
 from typing import List
 from exceptions.expenses import CategoryDoesNotExist
+from core.tracing import traced
 
 
 def _append_date_filters(filters: list, from_date: datetime = None, to_date: datetime = None) -> list:
@@ -19,12 +22,26 @@ def _append_date_filters(filters: list, from_date: datetime = None, to_date: dat
    return filters
 
 
+def _snapshot(expense: Expense) -> dict:
+   """The fields side-effect handlers need, in JSON-safe form."""
+   return {
+      "id": expense.id,
+      "category_id": expense.category_id,
+      "amount": expense.amount,
+      "occurred_at": expense.occurred_at.isoformat() if expense.occurred_at else None,
+      "title": expense.title,
+      "note": expense.note,
+   }
+
+
+@traced("repository")
 async def get_for_user(db: AsyncSession, user: User, expense_id: int):
    query = select(Expense).where(and_(Expense.user_id == user.id, Expense.id == expense_id))
    result = await db.execute(query)
    return result.scalars().one_or_none()
 
 
+@traced("repository")
 async def list_for_user(
     db: AsyncSession,
     user: User,
@@ -74,6 +91,7 @@ async def list_for_user(
    return result.scalars().all()
 
 
+@traced("repository")
 async def create_for_user(
     db: AsyncSession,
     user: User,
@@ -104,16 +122,17 @@ async def create_for_user(
 
     db.add(expense)
     try:
-      await db.commit()
-      await db.refresh(expense)
+      await db.flush()
     except IntegrityError:
-       await db.rollback()
        raise ValueError("Could not create the expense")
 
+    version = await bump_data_version(db, user)
+    await outbox.enqueue(db, "expense.created", user, _snapshot(expense), data_version=version)
     return expense   
 
  
 
+@traced("repository")
 async def count_for_user(db: AsyncSession, user: User, from_date: datetime = None, to_date:datetime=None):
    filter = [Expense.user_id == user.id]
    _append_date_filters(filter, from_date, to_date)
@@ -122,6 +141,7 @@ async def count_for_user(db: AsyncSession, user: User, from_date: datetime = Non
    return int(result.scalars().one())
 
 
+@traced("repository")
 async def total_amount_for_user(
    db: AsyncSession,
    user: User,
@@ -136,6 +156,7 @@ async def total_amount_for_user(
    return float(total or 0.0)
 
 
+@traced("repository")
 async def total_amount_for_month(
    db: AsyncSession,
    user: User,
@@ -157,6 +178,7 @@ async def total_amount_for_month(
 
    return await total_amount_for_user(db, user, from_date=start_at, to_date=end_at)
 
+@traced("repository")
 async def update_for_user(db: AsyncSession, user: User, expense_id: int, **fields):
    ALLOW_UPDATE_FIELDS = ["category_id", "amount", "occurred_at", "title", "note"]
    expense = await get_for_user(db, user, expense_id)
@@ -170,19 +192,28 @@ async def update_for_user(db: AsyncSession, user: User, expense_id: int, **field
    if "amount" in fields and not fields["amount"] > 0:
       raise ValueError("Amount of the expense has to be greater than 0")
 
+   before = _snapshot(expense)
    for key, value in fields.items():
       if key not in ALLOW_UPDATE_FIELDS:
          continue
       setattr(expense, key, value)
 
-   await db.commit()
-   await db.refresh(expense)
+   await db.flush()
+   version = await bump_data_version(db, user)
+   await outbox.enqueue(
+       db, "expense.updated", user, {**_snapshot(expense), "before": before}, data_version=version
+   )
    return expense
 
+@traced("repository")
 async def delete_for_user(db: AsyncSession, user: User, expense_id: int):
    expense = await get_for_user(db, user, expense_id)
    if expense is None:
       return None
    await db.delete(expense)
-   await db.commit()
+   await db.flush()
+   version = await bump_data_version(db, user)
+   await outbox.enqueue(
+       db, "expense.deleted", user, {"id": expense_id, "before": _snapshot(expense)}, data_version=version
+   )
    return expense
@@ -6,14 +6,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.goals import Goal
 from models.user import User
+from repositories.users import bump_data_version
+from repositories import outbox
+from core.tracing import traced
 
 
+@traced("repository")
 async def get_for_user(db: AsyncSession, user: User, goal_id: int) -> Optional[Goal]:
     query = select(Goal).where(and_(Goal.id == goal_id, Goal.user_id == user.id))
     result = await db.execute(query)
     return result.scalars().one_or_none()
 
 
+@traced("repository")
 async def get_latest_for_user(db: AsyncSession, user: User) -> Optional[Goal]:
     query = (
         select(Goal)
@@ -25,6 +30,7 @@ async def get_latest_for_user(db: AsyncSession, user: User) -> Optional[Goal]:
     return result.scalars().first()
 
 
+@traced("repository")
 async def create_goal(db: AsyncSession, user: User, goal_limit: float) -> Goal:
     if goal_limit <= 0:
         raise ValueError("Goal limit has to be greater than 0")
@@ -33,15 +39,18 @@ async def create_goal(db: AsyncSession, user: User, goal_limit: float) -> Goal:
     db.add(goal)
 
     try:
-        await db.commit()
-        await db.refresh(goal)
+        await db.flush()
     except IntegrityError:
-        await db.rollback()
         raise ValueError("Could not create the goal")
 
+    version = await bump_data_version(db, user)
+    await outbox.enqueue(
+        db, "goal.created", user, {"id": goal.id, "goal_limit": goal.goal_limit}, data_version=version
+    )
     return goal
 
 
+@traced("repository")
 async def update_goal(db: AsyncSession, user: User, goal_id: int, **fields) -> Optional[Goal]:
     ALLOW_UPDATE_FIELDS = ["goal_limit"]
 
@@ -52,34 +61,48 @@ async def update_goal(db: AsyncSession, user: User, goal_id: int, **fields) -> O
     if "goal_limit" in fields and fields["goal_limit"] <= 0:
         raise ValueError("Goal limit has to be greater than 0")
 
+    before = {"id": goal.id, "goal_limit": goal.goal_limit}
     for key, value in fields.items():
         if key not in ALLOW_UPDATE_FIELDS:
             continue
         setattr(goal, key, value)
 
-    await db.commit()
-    await db.refresh(goal)
+    await db.flush()
+    version = await bump_data_version(db, user)
+    await outbox.enqueue(
+        db,
+        "goal.updated",
+        user,
+        {"id": goal.id, "goal_limit": goal.goal_limit, "before": before},
+        data_version=version,
+    )
     return goal
 
 
+@traced("repository")
 async def delete_goal(db: AsyncSession, user: User, goal_id: int) -> Optional[Goal]:
     goal = await get_for_user(db, user, goal_id)
     if goal is None:
         return None
 
     await db.delete(goal)
-    await db.commit()
+    await db.flush()
+    version = await bump_data_version(db, user)
+    await outbox.enqueue(db, "goal.deleted", user, {"id": goal_id}, data_version=version)
     return goal
 
 
 # Compatibility aliases with the existing repository naming style.
+@traced("repository")
 async def create_for_user(db: AsyncSession, user: User, goal_limit: float) -> Goal:
     return await create_goal(db, user, goal_limit)
 
 
+@traced("repository")
 async def update_for_user(db: AsyncSession, user: User, goal_id: int, **fields) -> Optional[Goal]:
     return await update_goal(db, user, goal_id, **fields)
 
 
+@traced("repository")
 async def delete_for_user(db: AsyncSession, user: User, goal_id: int) -> Optional[Goal]:
     return await delete_goal(db, user, goal_id)
@@ -0,0 +1,148 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.tracing import traced
+from models.outbox import OutboxTask
+from models.user import User
+
+
+PENDING_KEY = "outbox_pending"
+
+
+def _lease_until(now: Optional[datetime.datetime] = None) -> datetime.datetime:
+    now = now or datetime.datetime.now(datetime.UTC)
+    return now + datetime.timedelta(seconds=settings.TASK_LEASE_SECONDS)
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    user: Optional[User],
+    payload: dict,
+    *,
+    data_version: Optional[int] = None,
+) -> OutboxTask:
+    """Record a side effect in the caller's transaction.
+
+    The row commits or rolls back with the write. After commit the worker
+    that wrote it hands it straight to its task queue (see core.tasks); the
+    lease keeps other workers' sweeps off it unless this one dies first.
+    ``data_version`` is the user's version after the write (from
+    ``bump_data_version``) and goes into the payload.
+    """
+    if data_version is not None:
+        payload = {**payload, "data_version": data_version}
+    # Timestamps are set here rather than by the server default so the
+    # committed row can be handed to the queue without a refresh.
+    now = datetime.datetime.now(datetime.UTC)
+    task = OutboxTask(
+        kind=kind,
+        user_id=user.id if user is not None else None,
+        payload=payload,
+        created_at=now,
+        available_at=_lease_until(now),
+        attempts=0,
+        handlers_done=[],
+    )
+    db.add(task)
+    db.info.setdefault(PENDING_KEY, []).append(task)
+    return task
+
+
+@traced("repository")
+async def claim_due(db: AsyncSession, limit: int) -> list[OutboxTask]:
+    """Lease up to ``limit`` tasks whose lease or retry time has passed.
+
+    SKIP LOCKED lets several workers sweep at once without taking the same rows.
+    """
+    due = (
+        select(OutboxTask.id)
+        .where(OutboxTask.failed_at.is_(None), OutboxTask.available_at <= func.now())
+        .order_by(OutboxTask.available_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    query = (
+        update(OutboxTask)
+        .where(OutboxTask.id.in_(due.scalar_subquery()))
+        .values(available_at=_lease_until())
+        .returning(OutboxTask)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+def _held(task_id: int, lease: Optional[datetime.datetime]):
+    """Match the row only while the caller's lease on it still stands."""
+    conditions = [OutboxTask.id == task_id, OutboxTask.failed_at.is_(None)]
+    if lease is not None:
+        conditions.append(OutboxTask.available_at == lease)
+    return conditions
+
+
+@traced("repository")
+async def renew_lease(
+    db: AsyncSession, task_id: int, *, lease: Optional[datetime.datetime], done: list[str]
+) -> Optional[datetime.datetime]:
+    """Extend the caller's lease and record the handlers that already succeeded.
+
+    Returns the new lease, or None when the row is gone (another worker
+    completed it) or its lease ran out and another worker took it over; the
+    caller must then leave the task alone.
+    """
+    result = await db.execute(
+        update(OutboxTask)
+        .where(*_held(task_id, lease))
+        .values(available_at=_lease_until(), handlers_done=done)
+        .returning(OutboxTask.available_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
+@traced("repository")
+async def complete(db: AsyncSession, task_id: int) -> None:
+    await db.execute(delete(OutboxTask).where(OutboxTask.id == task_id))
+
+
+@traced("repository")
+async def retry_later(
+    db: AsyncSession,
+    task_id: int,
+    *,
+    lease: Optional[datetime.datetime],
+    done: list[str],
+    attempts: int,
+    delay: float,
+    error: str,
+) -> None:
+    available_at = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=delay)
+    await db.execute(
+        update(OutboxTask)
+        .where(*_held(task_id, lease))
+        .values(attempts=attempts, available_at=available_at, handlers_done=done, last_error=error[:2000])
+        .execution_options(synchronize_session=False)
+    )
+
+
+@traced("repository")
+async def mark_failed(
+    db: AsyncSession,
+    task_id: int,
+    *,
+    lease: Optional[datetime.datetime],
+    done: list[str],
+    attempts: int,
+    error: str,
+) -> None:
+    await db.execute(
+        update(OutboxTask)
+        .where(*_held(task_id, lease))
+        .values(attempts=attempts, failed_at=func.now(), handlers_done=done, last_error=error[:2000])
+        .execution_options(synchronize_session=False)
+    )
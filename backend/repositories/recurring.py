@@ -0,0 +1,111 @@
+import datetime
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.tracing import traced
+from models.expense import Expense
+from models.recurring import RecurringExpense
+from models.user import User
+
+
+ALLOW_UPDATE_FIELDS = [
+    "category_id", "amount", "title", "note", "ends_at", "max_occurrences", "active", "next_occurrence", "next_run_at",
+]
+# Multi-row INSERT ... VALUES chunks; nine columns per row stays far
+# below the 65535 bind parameter limit.
+INSERT_CHUNK_ROWS = 1000
+
+
+@traced("repository")
+async def get_for_user(db: AsyncSession, user: User, rule_id: int) -> Optional[RecurringExpense]:
+    query = select(RecurringExpense).where(
+        and_(RecurringExpense.id == rule_id, RecurringExpense.user_id == user.id)
+    )
+    result = await db.execute(query)
+    return result.scalars().one_or_none()
+
+
+@traced("repository")
+async def list_for_user(db: AsyncSession, user: User) -> List[RecurringExpense]:
+    query = (
+        select(RecurringExpense)
+        .where(RecurringExpense.user_id == user.id)
+        .order_by(RecurringExpense.id)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+@traced("repository")
+async def create_for_user(db: AsyncSession, user: User, **fields) -> RecurringExpense:
+    rule = RecurringExpense(user_id=user.id, next_occurrence=0, active=True, **fields)
+    db.add(rule)
+    await db.flush()
+    return rule
+
+
+@traced("repository")
+async def update_for_user(db: AsyncSession, user: User, rule_id: int, **fields) -> Optional[RecurringExpense]:
+    rule = await get_for_user(db, user, rule_id)
+    if rule is None:
+        return None
+    for key, value in fields.items():
+        if key not in ALLOW_UPDATE_FIELDS:
+            continue
+        setattr(rule, key, value)
+    await db.flush()
+    return rule
+
+
+@traced("repository")
+async def delete_for_user(db: AsyncSession, user: User, rule_id: int) -> bool:
+    """Delete the rule; expenses it already produced stay, unlinked."""
+    query = delete(RecurringExpense).where(
+        and_(RecurringExpense.id == rule_id, RecurringExpense.user_id == user.id)
+    )
+    result = await db.execute(query)
+    return bool(result.rowcount)
+
+
+@traced("repository")
+async def claim_due(db: AsyncSession, now: datetime.datetime, limit: int) -> List[RecurringExpense]:
+    """Lock up to ``limit`` due rules for this transaction.
+
+    SKIP LOCKED lets several schedulers (one per worker, or a CLI run) work
+    through the backlog together without waiting on each other's rows.
+    """
+    query = (
+        select(RecurringExpense)
+        .where(
+            RecurringExpense.active.is_(True),
+            RecurringExpense.next_run_at.is_not(None),
+            RecurringExpense.next_run_at <= now,
+        )
+        .order_by(RecurringExpense.next_run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+@traced("repository")
+async def insert_occurrences(db: AsyncSession, rows: list[dict]) -> list[tuple[int, int]]:
+    """Insert materialized expenses, skipping occurrences that already exist.
+
+    Returns ``(expense_id, user_id)`` for the rows actually inserted.
+    """
+    inserted: list[tuple[int, int]] = []
+    for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+        query = (
+            insert(Expense)
+            .values(rows[start:start + INSERT_CHUNK_ROWS])
+            .on_conflict_do_nothing(constraint="uq_expenses_recurring_occurrence")
+            .returning(Expense.id, Expense.user_id)
+        )
+        result = await db.execute(query)
+        inserted.extend((row.id, row.user_id) for row in result)
+    return inserted
@@ -4,27 +4,39 @@ from models.categories import Category
 from repositories import categories
 from repositories import expenses
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, extract, and_
-from datetime import datetime
+from sqlalchemy import select, func, desc, and_
+from datetime import datetime, timezone
 from models.user import User
+from core.tracing import traced
 
-async def monthly_summary(db: AsyncSession, user: User, month: int)-> float:
-    query = select(Expense).where(and_(extract("month",Expense.occurred_at) == month, User.id == user.id))
-    results = await db.execute(query)
-    total_expenditure = sum(expense.amount for expense in results.scalars().all())
-    return total_expenditure
+@traced("repository")
+async def monthly_summary(db: AsyncSession, user: User, month: int, year: int | None = None)-> float:
+    # A bounded occurred_at range can use the (user_id, occurred_at) index;
+    # extract("month", ...) scanned every year's rows for the month.
+    if year is None:
+        year = datetime.now(timezone.utc).year
+    return await expenses.total_amount_for_month(db, user, month=month, year=year)
 
 
+@traced("repository")
 async def category_breakdown(db: AsyncSession, user: User, from_date : datetime | None = None , to_date: datetime | None = None):
-   categories = await categories.list_for_user(db, user)
-   total_by_category = {}
-   for category in categories:
-       expenses = await expenses.list_for_user(db, user,category_id = category.id, from_date= from_date, to_date=to_date)
-       total_expenditure = sum(expense.amount for expense in expenses)
-       total_by_category[f"{category.name}"] = total_expenditure
-   return total_by_category    
-
-
+   # One grouped query instead of a list_for_user call per category.
+   expense_filters = expenses._append_date_filters(
+       [Expense.category_id == Category.id, Expense.user_id == user.id], from_date, to_date
+   )
+   query = (
+       select(Category.name, func.coalesce(func.sum(Expense.amount), 0.0))
+       .select_from(Category)
+       .outerjoin(Expense, and_(*expense_filters))
+       .where(Category.user_id == user.id)
+       .group_by(Category.id, Category.name)
+       .order_by(Category.name)
+   )
+   result = await db.execute(query)
+   return {name: float(total) for name, total in result.all()}
+
+
+@traced("repository")
 async def top_categories(db:AsyncSession, user:User):
     query = select(Category.id, Category.name, func.sum(Expense.amount).label("total")).join(Expense, Expense.category_id == Category.id).where(Expense.user_id == user.id, Category.user_id == user.id).group_by(Category.id, Category.name).order_by(desc(func.sum(Expense.amount))).limit(5)
     result = await db.execute(query)
@@ -1,11 +1,12 @@
 from models.user import User
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from fastapi import Depends
 from typing import Annotated, Optional, Any
 from enum import Enum
 from exceptions.users import UserNotFoundError, EmailAlreadyExists
+from core.tracing import traced
 
 
 
@@ -30,6 +31,7 @@ FIELD_TO_COLUMN = {
     UserLookupField.EMAIL : User.email,
 }    
 
+@traced("repository")
 async def get_by_field(db: AsyncSession, field: UserLookupField ,value: Any)-> Optional[User]:
     column = FIELD_TO_COLUMN[field]
     query = select(User).where(column == value)
@@ -38,6 +40,7 @@ async def get_by_field(db: AsyncSession, field: UserLookupField ,value: Any)-> O
     return user
    
 
+@traced("repository")
 async def get_by_field_or_404(db: AsyncSession, field: UserLookupField ,value: Any):
     user = await get_by_field(db, field, value)
     if  user is None:
@@ -45,6 +48,7 @@ async def get_by_field_or_404(db: AsyncSession, field: UserLookupField ,value: A
     return user
 
 
+@traced("repository")
 async def email_exists(db: AsyncSession, email:str)->bool:
     user = await get_by_field(db, UserLookupField.EMAIL, email) 
     if user is None:
@@ -52,21 +56,21 @@ async def email_exists(db: AsyncSession, email:str)->bool:
     else:
         return True    
 
+@traced("repository")
 async def create(db: AsyncSession, *, username: str, email: str, password_hash: str)->Optional[User]:
    if await email_exists(db, email):
          raise EmailAlreadyExists(f"User with {email} already exists")
    user = User(username=username, email=email, password_hash=password_hash)
 
-   try: 
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        
+   db.add(user)
+   try:
+        await db.flush()
    except IntegrityError:
-        await db.rollback()
+        raise EmailAlreadyExists(f"User with {email} already exists")
    return user
       
 
+@traced("repository")
 async def update_for_user(db: AsyncSession, user: User, **fields):
     ALLOW_UPDATE_FIELDS = ["username","email","password"]
     if "password" in fields.keys():
@@ -78,10 +82,54 @@ async def update_for_user(db: AsyncSession, user: User, **fields):
          if key  not in ALLOW_UPDATE_FIELDS:
              continue
          setattr(user, key, value)
-    await db.commit()    
+    await db.flush()
     return user    
 
 
+@traced("repository")
 async def delete_for_user(db:AsyncSession, user: User):
    await db.delete(user)
-   await db.commit()
+   await db.flush()
+
+
+@traced("repository")
+async def bump_data_version(db: AsyncSession, user: User) -> int:
+    """Record that the user's expenses, categories or goals changed.
+
+    Invalidates every ETag handed out for the user's read endpoints. Returns
+    the new version, which live events carry so clients can tell whether a
+    fetched report already includes the write.
+    """
+    query = (
+        update(User)
+        .where(User.id == user.id)
+        .values(data_version=User.data_version + 1, data_updated_at=func.now())
+        .returning(User.data_version)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(query)
+    return result.scalar_one()
+
+
+@traced("repository")
+async def bump_data_version_for_ids(db: AsyncSession, user_ids: list[int]) -> dict[int, int]:
+    """bump_data_version for many users in one statement (batch jobs)."""
+    if not user_ids:
+        return {}
+    query = (
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(data_version=User.data_version + 1, data_updated_at=func.now())
+        .returning(User.id, User.data_version)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(query)
+    return {row.id: row.data_version for row in result}
+
+
+@traced("repository")
+async def get_data_version(db: AsyncSession, user: User):
+    """Current ``(data_version, data_updated_at)`` for the user as seen by ``db``."""
+    query = select(User.data_version, User.data_updated_at).where(User.id == user.id)
+    result = await db.execute(query)
+    return result.one()
@@ -0,0 +1,62 @@
+import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, field_validator
+
+
+class RecurringExpenseIn(BaseModel):
+    category_id: int
+    amount: float
+    title: str
+    note: str = ""
+    frequency: Literal["daily", "weekly", "monthly", "yearly"]
+    every: int = 1
+    starts_at: datetime.datetime
+    ends_at: Optional[datetime.datetime] = None
+    max_occurrences: Optional[int] = None
+
+
+class RecurringExpenseUpdate(BaseModel):
+    """Fields a rule accepts after creation; the schedule itself is fixed.
+
+    Omitted fields are left alone. Only ends_at and max_occurrences can be
+    cleared with null (and a null note empties it).
+    """
+
+    category_id: Optional[int] = None
+    amount: Optional[float] = None
+    title: Optional[str] = None
+    note: Optional[str] = None
+    ends_at: Optional[datetime.datetime] = None
+    max_occurrences: Optional[int] = None
+    active: Optional[bool] = None
+
+    class Config:
+        extra = "forbid"
+
+    @field_validator("category_id", "amount", "title", "active")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class RecurringExpenseOut(BaseModel):
+    id: int
+    user_id: int
+    category_id: int
+    amount: float
+    title: str
+    note: str
+    frequency: str
+    every: int
+    starts_at: datetime.datetime
+    ends_at: Optional[datetime.datetime]
+    max_occurrences: Optional[int]
+    next_occurrence: int
+    next_run_at: Optional[datetime.datetime]
+    active: bool
+
+    class Config:
+        from_attributes = True
@@ -4,10 +4,12 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.security import create_access_token, hash_password, verify_hashed_password
+from db.session import release_connection
 from models.user import User
 from repositories import users as users_repo
 from repositories.users import UserLookupField
 from exceptions.users import EmailAlreadyExists, InvalidCredentials
+from core.tracing import traced
 
 
 def _validate_registration_input(username: str, email: str, password: str) -> None:
@@ -28,6 +30,7 @@ def _validate_registration_input(username: str, email: str, password: str) -> No
         raise ValueError("Password is required")
 
 
+@traced("service")
 async def register_user(
     db: AsyncSession, *, username: str, email: str, password: str
 ) -> User:
@@ -37,6 +40,8 @@ async def register_user(
     if existing_user is not None:
         raise EmailAlreadyExists(f"User with {email} already exists")
 
+    # Don't hold a pooled connection while argon2 runs.
+    await release_connection(db)
     hashed_password = hash_password(password)
     return await users_repo.create(
         db,
@@ -46,6 +51,7 @@ async def register_user(
     )
 
 
+@traced("service")
 async def authenticate_user(
     db: AsyncSession, *, email: str, password: str
 ) -> Optional[User]:
@@ -58,12 +64,14 @@ async def authenticate_user(
     if user is None:
         return None
 
+    await release_connection(db)
     if not verify_hashed_password(password, user.password_hash):
         return None
 
     return user
 
 
+@traced("service")
 async def login_user(db: AsyncSession, *, email: str, password: str) -> str:
     user = await authenticate_user(db, email=email, password=password)
     if user is None:
@@ -73,5 +81,6 @@ async def login_user(db: AsyncSession, *, email: str, password: str) -> str:
     return access_token
 
 
+@traced("service")
 async def get_profile(user: User):
     return user
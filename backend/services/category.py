@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user import User
 from repositories import categories as categories_repo
+from core.tracing import traced
 
 
 def _validate_category_id(category_id: int) -> None:
@@ -30,21 +31,25 @@ def _normalize_description(description: Optional[str]) -> str:
     return description.strip()
 
 
+@traced("service")
 async def create_category(db: AsyncSession, *, user: User, payload: dict):
     name = _normalize_name(payload.get("name"))
     description = _normalize_description(payload.get("description"))
     return await categories_repo.create_for_user(db, user, name, description)
 
 
+@traced("service")
 async def get_category(db: AsyncSession, *, user: User, category_id: int):
     _validate_category_id(category_id)
     return await categories_repo.get_for_user(db, user, category_id)
 
 
+@traced("service")
 async def list_categories(db: AsyncSession, *, user: User):
     return await categories_repo.list_for_user(db, user)
 
 
+@traced("service")
 async def update_category(
     db: AsyncSession,
     *,
@@ -63,6 +68,7 @@ async def update_category(
     return await categories_repo.update_for_user(db, user, category_id, **fields)
 
 
+@traced("service")
 async def delete_category(db: AsyncSession, *, user: User, category_id: int):
     _validate_category_id(category_id)
     category = await categories_repo.get_for_user(db, user, category_id)
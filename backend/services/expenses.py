@@ -9,6 +9,8 @@ from models.user import User
 from repositories import expenses as expenses_repo
 from repositories import categories as categories_repo
 from exceptions.expenses import CategoryDoesNotExist
+from core.tracing import traced
+from db.concurrent import gather_reads
 
 
 MAX_PAGE_SIZE = 100
@@ -61,6 +63,7 @@ def _normalize_pagination(page: Optional[int], limit: Optional[int]) -> tuple[in
     return page_value, limit_value, (page_value - 1) * limit_value
 
 
+@traced("service")
 async def ensure_category_belongs_to_user(db: AsyncSession, user: User, category_id: int) -> None:
     """Utility to assert category ownership."""
     _validate_positive_int(category_id, "category_id")
@@ -69,6 +72,7 @@ async def ensure_category_belongs_to_user(db: AsyncSession, user: User, category
         raise CategoryDoesNotExist(f"Category with '{category_id}' does not exist")
 
 
+@traced("service")
 async def create_expense(db: AsyncSession, *, user: User, payload: dict):
     """Validate input then delegate to repository create."""
     amount = payload.get("amount")
@@ -94,12 +98,14 @@ async def create_expense(db: AsyncSession, *, user: User, payload: dict):
     )
 
 
+@traced("service")
 async def get_expense(db: AsyncSession, *, user: User, expense_id: int):
     """Ownership-safe fetch."""
     _validate_positive_int(expense_id, "expense_id")
     return await expenses_repo.get_for_user(db, user, expense_id)
 
 
+@traced("service")
 async def list_expenses(
     db: AsyncSession,
     *,
@@ -124,22 +130,24 @@ async def list_expenses(
     if category_id is not None:
         await ensure_category_belongs_to_user(db, user, category_id)
 
-    items = await expenses_repo.list_for_user(
+    items, total = await gather_reads(
         db,
-        user=user,
-        page=page_value,
-        limit=limit_value,
-        category_id=category_id,
-        from_date=from_date,
-        to_date=to_date,
-        sort=sort_param,
-    )
-
-    total = await expenses_repo.count_for_user(
-        db,
-        user=user,
-        from_date=from_date,
-        to_date=to_date,
+        lambda session: expenses_repo.list_for_user(
+            session,
+            user=user,
+            page=page_value,
+            limit=limit_value,
+            category_id=category_id,
+            from_date=from_date,
+            to_date=to_date,
+            sort=sort_param,
+        ),
+        lambda session: expenses_repo.count_for_user(
+            session,
+            user=user,
+            from_date=from_date,
+            to_date=to_date,
+        ),
     )
 
     meta = {
@@ -151,6 +159,7 @@ async def list_expenses(
     return items, meta
 
 
+@traced("service")
 async def update_expense(db: AsyncSession, *, user: User, expense_id: int, payload: dict):
     """Ownership check, validations, delegate update."""
     _validate_positive_int(expense_id, "expense_id")
@@ -182,6 +191,7 @@ async def update_expense(db: AsyncSession, *, user: User, expense_id: int, paylo
     return await expenses_repo.update_for_user(db, user, expense_id, **fields)
 
 
+@traced("service")
 async def delete_expense(db: AsyncSession, *, user: User, expense_id: int) -> None:
     """Ownership check then delete."""
     _validate_positive_int(expense_id, "expense_id")
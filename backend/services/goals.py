@@ -8,6 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import User
 from repositories import expenses as expenses_repo
 from repositories import goals as goals_repo
+from core.tracing import traced
+from db.concurrent import gather_reads
+from services.live import read_at_version
 
 
 def _validate_goal_id(goal_id: int) -> None:
@@ -34,6 +37,7 @@ def _resolve_year(year: Optional[int]) -> int:
     return resolved
 
 
+@traced("service")
 async def set_monthly_goals(
     db: AsyncSession,
     *,
@@ -55,6 +59,7 @@ async def set_monthly_goals(
     return await goals_repo.update_for_user(db, user, goal_id, goal_limit=goal_limit)
 
 
+@traced("service")
 async def get_monthly_goals(
     db: AsyncSession,
     *,
@@ -68,6 +73,7 @@ async def get_monthly_goals(
     return await goals_repo.get_for_user(db, user, goal_id)
 
 
+@traced("service")
 async def get_monthy_progress(
     db: AsyncSession,
     *,
@@ -83,16 +89,25 @@ async def get_monthy_progress(
     _validate_month(month)
     target_year = _resolve_year(year)
 
-    goal = await get_monthly_goals(db, user=user, goal_id=goal_id)
-    if goal is None:
-        return None
-
-    total_expense = await expenses_repo.total_amount_for_month(
+    if goal_id is not None:
+        _validate_goal_id(goal_id)
+    # The month total does not depend on the goal, so both are read at once.
+    (goal, total_expense), data_version = await read_at_version(
         db,
         user,
-        month=month,
-        year=target_year,
+        lambda: gather_reads(
+            db,
+            lambda session: get_monthly_goals(session, user=user, goal_id=goal_id),
+            lambda session: expenses_repo.total_amount_for_month(
+                session,
+                user,
+                month=month,
+                year=target_year,
+            ),
+        ),
     )
+    if goal is None:
+        return None
     difference = goal.goal_limit - total_expense
 
     return {
@@ -102,9 +117,11 @@ async def get_monthy_progress(
         "goal_limit": goal.goal_limit,
         "total_expense": total_expense,
         "difference": difference,
+        "data_version": data_version,
     }
 
 
+@traced("service")
 async def get_monthly_progress(
     db: AsyncSession,
     *,
@@ -0,0 +1,136 @@
+import asyncio
+import functools
+import time
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+from db.pool import pool_stats
+from db.session import Database
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+
+
+@functools.cache
+def _script_directory() -> ScriptDirectory:
+    return ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+
+
+def migration_heads() -> frozenset[str]:
+    """Head revisions shipped with this build (alembic-conf/versions)."""
+    return frozenset(_script_directory().get_heads())
+
+
+def pool_saturated(stats: dict) -> bool:
+    return stats["checked_out"] >= stats["size"] + max(stats["max_overflow"], 0)
+
+
+async def _applied_revisions(db_engine: AsyncEngine) -> set[str]:
+    async with db_engine.connect() as conn:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        return set(result.scalars())
+
+
+def migration_status(applied: set[str], heads: frozenset[str]) -> str:
+    """current: schema matches this build; behind: migrations still pending;
+    ahead: the database was migrated by a newer build."""
+    if applied == heads:
+        return "current"
+    script = _script_directory()
+    for revision in applied:
+        try:
+            script.get_revision(revision)
+        except CommandError:
+            return "ahead"
+    return "behind"
+
+
+async def check_database(name: str, db_engine: AsyncEngine, check_migrations: bool) -> dict:
+    stats = pool_stats(db_engine)
+    result = {"pool": {**stats, "saturated": pool_saturated(stats)}}
+    if result["pool"]["saturated"]:
+        # A probe query would just queue behind the requests holding the pool.
+        result.update(status="fail", error="connection pool exhausted")
+        return result
+
+    try:
+        applied = await asyncio.wait_for(
+            _applied_revisions(db_engine), timeout=settings.HEALTH_DB_TIMEOUT_SECONDS
+        )
+    except Exception as exc:
+        result.update(status="fail", error=type(exc).__name__)
+        return result
+
+    result["status"] = "ok"
+    if check_migrations:
+        status = migration_status(applied, migration_heads())
+        result["migrations"] = {
+            "status": status,
+            "applied": sorted(applied),
+            "heads": sorted(migration_heads()),
+        }
+        # Code running ahead of its schema would fail on missing columns.
+        if status == "behind":
+            result["status"] = "fail"
+    return result
+
+
+async def check_readiness(database: Database, warmup=None) -> dict:
+    engines = {"primary": database.engine}
+    if database.read_engine is not database.engine:
+        engines["replica"] = database.read_engine
+
+    checks = dict(
+        zip(
+            engines,
+            await asyncio.gather(
+                *(
+                    check_database(name, db_engine, check_migrations=name == "primary")
+                    for name, db_engine in engines.items()
+                )
+            ),
+        )
+    )
+    ready = all(check["status"] == "ok" for check in checks.values())
+    if warmup is not None:
+        # Only warm workers take traffic; a failed warm-up is reported but
+        # the database checks above decide whether the worker can serve.
+        checks["warmup"] = warmup.status()
+        ready = ready and warmup.finished
+    return {"status": "ok" if ready else "fail", "checks": checks}
+
+
+class ReadinessCache:
+    """Serve the last readiness result for ``ttl`` seconds.
+
+    Concurrent probes share one in-flight check, so however often the load
+    balancer polls, each worker runs at most one probe query per interval.
+    """
+
+    def __init__(self, check, ttl: float):
+        self.check = check
+        self.ttl = ttl
+        self._result: dict | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self.ttl
+
+    async def get(self) -> dict:
+        if self._fresh():
+            return self._result
+        async with self._lock:
+            if not self._fresh():
+                self._result = await self.check()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def clear(self) -> None:
+        self._result = None
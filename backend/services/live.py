@@ -0,0 +1,138 @@
+"""Live dashboard events computed from a write's outbox payload.
+
+The payload already holds the expense before and after the write, so the
+change to each affected month's totals is a subtraction. Nothing is read
+back from the database. Clients apply the deltas to the monthly report and
+goal progress they already hold.
+
+Events reach clients some time after the write commits, so a report fetched
+in between may already include it. Every event carries the user's
+``data_version`` after its write, and reports and progress carry the version
+they were read at (``read_at_version``); clients drop deltas at or below it.
+"""
+
+import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user import User
+from repositories import users as users_repo
+
+
+RESYNC = {"type": "resync"}
+# Reads repeated while the user keeps writing during them.
+VERSION_READ_ATTEMPTS = 3
+
+
+async def read_at_version(
+    db: AsyncSession, user: User, read: Callable[[], Awaitable[Any]]
+) -> tuple[Any, int]:
+    """Run ``read`` and return its result with the data_version it reflects.
+
+    Under READ COMMITTED the reads may run on several connections and
+    snapshots, so the version is read on ``db`` before and after them. When
+    both match, no write committed in between and the result includes
+    exactly the writes up to that version. Otherwise the reads run again.
+    After the last attempt the later version is returned: a client may then
+    miss one delta until its next refetch, but never counts a write twice.
+    """
+    for _ in range(VERSION_READ_ATTEMPTS):
+        before, _ = await users_repo.get_data_version(db, user)
+        result = await read()
+        after, _ = await users_repo.get_data_version(db, user)
+        if before == after:
+            break
+    return result, after
+
+
+def _month_of(occurred_at: Optional[str]) -> Optional[tuple[int, int]]:
+    if not occurred_at:
+        return None
+    moment = datetime.datetime.fromisoformat(occurred_at)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.UTC)
+    return moment.year, moment.month
+
+
+def month_deltas(before: Optional[dict], after: Optional[dict]) -> list[dict]:
+    """Per-month changes to the report totals and category breakdown."""
+    months: dict[tuple[int, int], dict[int, list[float]]] = {}
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is None:
+            continue
+        month = _month_of(snapshot.get("occurred_at"))
+        if month is None:
+            continue
+        totals = months.setdefault(month, {}).setdefault(snapshot["category_id"], [0.0, 0])
+        totals[0] += sign * snapshot["amount"]
+        totals[1] += sign
+
+    deltas = []
+    for (year, month), categories in sorted(months.items()):
+        changed = [
+            {"category_id": category_id, "total_amount": amount, "total_expenses": count}
+            for category_id, (amount, count) in categories.items()
+            if amount or count
+        ]
+        if not changed:
+            continue
+        deltas.append(
+            {
+                "year": year,
+                "month": month,
+                "total_amount": sum(item["total_amount"] for item in changed),
+                "total_expenses": sum(item["total_expenses"] for item in changed),
+                "categories": changed,
+            }
+        )
+    return deltas
+
+
+def event_for(kind: str, payload: dict) -> Optional[dict]:
+    """The live event for one outbox task, or None if dashboards are unaffected."""
+    entity, action = kind.split(".", 1)
+
+    if entity == "expense":
+        before = payload.get("before")
+        after = None if action == "deleted" else {k: v for k, v in payload.items() if k != "before"}
+        months = month_deltas(before, after)
+        # Title or note edits change the listed expense but none of the totals.
+        if not months and after is None:
+            return None
+        return {
+            "type": "expense",
+            "action": action,
+            "expense_id": payload["id"],
+            "expense": after,
+            "months": months,
+        }
+
+    if entity == "goal":
+        # Clients refetch goals on "created" and "deleted": the latest goal,
+        # which progress is measured against, may have changed.
+        return {
+            "type": "goal",
+            "action": action,
+            "goal_id": payload["id"],
+            "goal_limit": payload.get("goal_limit"),
+        }
+
+    if entity == "category":
+        if action == "updated":
+            return {
+                "type": "category",
+                "action": action,
+                "category_id": payload["id"],
+                "name": payload["name"],
+            }
+        if action == "deleted":
+            # Its expenses went with it (ON DELETE CASCADE) and are not in the payload.
+            return RESYNC
+        return None
+
+    if entity == "recurring":
+        # A scheduler batch may add many expenses across months; refetch.
+        return RESYNC
+
+    return None
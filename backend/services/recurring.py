@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import calendar
+import datetime
+from collections import Counter
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.tracing import traced
+from models.recurring import FREQUENCIES, RecurringExpense
+from models.user import User
+from repositories import outbox as outbox_repo
+from repositories import recurring as recurring_repo
+from repositories import users as users_repo
+from services.expenses import ensure_category_belongs_to_user
+
+
+MAX_EVERY = 1000
+# Schedule fields are fixed at creation: occurrence numbers, and so the
+# duplicate guard on expenses, depend on them. Create a new rule instead.
+UPDATABLE_FIELDS = {"category_id", "amount", "title", "note", "ends_at", "max_occurrences", "active"}
+
+
+def utc_naive(value: datetime.datetime) -> datetime.datetime:
+    """Expense timestamps are stored as naive UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.UTC).replace(tzinfo=None)
+    return value
+
+
+def utc_now() -> datetime.datetime:
+    return utc_naive(datetime.datetime.now(datetime.UTC))
+
+
+def _add_months(start: datetime.datetime, months: int) -> datetime.datetime:
+    # Always from the start, so a rule on the 31st returns to the 31st after
+    # a short month instead of drifting to the 28th.
+    total = start.month - 1 + months
+    year, month = start.year + total // 12, total % 12 + 1
+    day = min(start.day, calendar.monthrange(year, month)[1])
+    return start.replace(year=year, month=month, day=day)
+
+
+def occurrence_at(rule: RecurringExpense, n: int) -> datetime.datetime:
+    steps = n * rule.every
+    if rule.frequency == "daily":
+        return rule.starts_at + datetime.timedelta(days=steps)
+    if rule.frequency == "weekly":
+        return rule.starts_at + datetime.timedelta(weeks=steps)
+    if rule.frequency == "monthly":
+        return _add_months(rule.starts_at, steps)
+    return _add_months(rule.starts_at, 12 * steps)
+
+
+def scheduled_at(rule: RecurringExpense, n: int) -> Optional[datetime.datetime]:
+    """When occurrence ``n`` is due, or None if the rule ends before it."""
+    if rule.max_occurrences is not None and n >= rule.max_occurrences:
+        return None
+    at = occurrence_at(rule, n)
+    if rule.ends_at is not None and at > rule.ends_at:
+        return None
+    return at
+
+
+def due_occurrences(rule: RecurringExpense, now: datetime.datetime, limit: int) -> tuple[list[dict], int]:
+    """Expense rows for up to ``limit`` due occurrences, and the next occurrence."""
+    rows = []
+    n = rule.next_occurrence
+    while len(rows) < limit:
+        at = scheduled_at(rule, n)
+        if at is None or at > now:
+            break
+        rows.append(
+            {
+                "user_id": rule.user_id,
+                "category_id": rule.category_id,
+                "amount": rule.amount,
+                "title": rule.title,
+                "note": rule.note,
+                "occurred_at": at,
+                "recurring_id": rule.id,
+                "occurrence": n,
+            }
+        )
+        n += 1
+    return rows, n
+
+
+@traced("service")
+async def materialize(
+    db: AsyncSession,
+    rules: list[RecurringExpense],
+    now: datetime.datetime,
+    *,
+    max_per_rule: int,
+) -> int:
+    """Insert the due occurrences of ``rules`` and move each rule past them.
+
+    The expenses and the rules' progress commit together, and existing
+    occurrences are skipped, so running this again after a crash, or
+    concurrently, never duplicates an expense. Rules further behind than
+    ``max_per_rule`` stay due and continue on the next call.
+    """
+    rows = []
+    for rule in rules:
+        due, next_occurrence = due_occurrences(rule, now, max_per_rule)
+        rows.extend(due)
+        rule.next_occurrence = next_occurrence
+        rule.next_run_at = scheduled_at(rule, next_occurrence)
+    if not rows:
+        await db.flush()
+        return 0
+
+    inserted = await recurring_repo.insert_occurrences(db, rows)
+    per_user = Counter(user_id for _, user_id in inserted)
+    versions = await users_repo.bump_data_version_for_ids(db, sorted(per_user))
+    for user_id, count in per_user.items():
+        # One task per user and batch instead of one per expense; live
+        # streams resync on it.
+        await outbox_repo.enqueue(
+            db,
+            "recurring.materialized",
+            SimpleNamespace(id=user_id),
+            {"expenses": count},
+            data_version=versions.get(user_id),
+        )
+    await db.flush()
+    return len(inserted)
+
+
+def _validate_amount(amount: Optional[float]) -> None:
+    if amount is None or amount <= 0:
+        raise ValueError("Amount of the expense has to be greater than 0")
+
+
+def _validate_title(title: Optional[str]) -> str:
+    normalized = (title or "").strip()
+    if not normalized:
+        raise ValueError("Title cannot be empty")
+    return normalized
+
+
+def _validate_limits(starts_at: datetime.datetime, ends_at, max_occurrences) -> None:
+    if ends_at is not None and ends_at < starts_at:
+        raise ValueError("ends_at must be >= starts_at")
+    if max_occurrences is not None and max_occurrences < 1:
+        raise ValueError("max_occurrences must be >= 1")
+
+
+@traced("service")
+async def create_recurring_expense(db: AsyncSession, *, user: User, payload: dict) -> RecurringExpense:
+    """Create a rule and materialize any occurrences already due."""
+    frequency = payload.get("frequency")
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"frequency must be one of: {', '.join(FREQUENCIES)}")
+    every = payload.get("every", 1)
+    if not 1 <= every <= MAX_EVERY:
+        raise ValueError(f"every must be between 1 and {MAX_EVERY}")
+    _validate_amount(payload.get("amount"))
+    title = _validate_title(payload.get("title"))
+    if payload.get("starts_at") is None:
+        raise ValueError("starts_at is required")
+    starts_at = utc_naive(payload["starts_at"])
+    ends_at = utc_naive(payload["ends_at"]) if payload.get("ends_at") else None
+    max_occurrences = payload.get("max_occurrences")
+    _validate_limits(starts_at, ends_at, max_occurrences)
+    await ensure_category_belongs_to_user(db, user, payload.get("category_id") or 0)
+
+    rule = await recurring_repo.create_for_user(
+        db,
+        user,
+        category_id=payload["category_id"],
+        amount=payload["amount"],
+        title=title,
+        note=(payload.get("note") or "").strip(),
+        frequency=frequency,
+        every=every,
+        starts_at=starts_at,
+        ends_at=ends_at,
+        max_occurrences=max_occurrences,
+        next_run_at=starts_at,
+    )
+    rule.next_run_at = scheduled_at(rule, 0)
+    if rule.next_run_at is not None and rule.next_run_at <= utc_now():
+        await materialize(db, [rule], utc_now(), max_per_rule=settings.RECURRING_MAX_CATCH_UP)
+    return rule
+
+
+@traced("service")
+async def list_recurring_expenses(db: AsyncSession, *, user: User) -> list[RecurringExpense]:
+    return await recurring_repo.list_for_user(db, user)
+
+
+@traced("service")
+async def get_recurring_expense(db: AsyncSession, *, user: User, rule_id: int) -> Optional[RecurringExpense]:
+    if rule_id <= 0:
+        raise ValueError("rule_id must be > 0")
+    return await recurring_repo.get_for_user(db, user, rule_id)
+
+
+@traced("service")
+async def update_recurring_expense(
+    db: AsyncSession, *, user: User, rule_id: int, payload: dict
+) -> Optional[RecurringExpense]:
+    """Change a rule's future occurrences; pausing skips the ones missed meanwhile."""
+    unknown = set(payload) - UPDATABLE_FIELDS
+    if unknown:
+        raise ValueError(f"Cannot update: {', '.join(sorted(unknown))}")
+
+    rule = await get_recurring_expense(db, user=user, rule_id=rule_id)
+    if rule is None:
+        return None
+
+    fields = dict(payload)
+    if "amount" in fields:
+        _validate_amount(fields["amount"])
+    if "title" in fields:
+        fields["title"] = _validate_title(fields["title"])
+    if "note" in fields:
+        fields["note"] = (fields["note"] or "").strip()
+    if "category_id" in fields:
+        await ensure_category_belongs_to_user(db, user, fields["category_id"])
+    if fields.get("ends_at") is not None:
+        fields["ends_at"] = utc_naive(fields["ends_at"])
+    _validate_limits(
+        rule.starts_at,
+        fields.get("ends_at", rule.ends_at),
+        fields.get("max_occurrences", rule.max_occurrences),
+    )
+
+    resuming = fields.get("active") is True and not rule.active
+    rule = await recurring_repo.update_for_user(db, user, rule_id, **fields)
+    next_occurrence = rule.next_occurrence
+    if resuming:
+        now = utc_now()
+        while (at := scheduled_at(rule, next_occurrence)) is not None and at < now:
+            next_occurrence += 1
+    return await recurring_repo.update_for_user(
+        db,
+        user,
+        rule_id,
+        next_occurrence=next_occurrence,
+        next_run_at=scheduled_at(rule, next_occurrence),
+    )
+
+
+@traced("service")
+async def delete_recurring_expense(db: AsyncSession, *, user: User, rule_id: int) -> bool:
+    """Stop a rule; the expenses it already produced are kept."""
+    if rule_id <= 0:
+        raise ValueError("rule_id must be > 0")
+    return await recurring_repo.delete_for_user(db, user, rule_id)
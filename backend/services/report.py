@@ -7,6 +7,10 @@ from models.expense import Expense
 from models.user import User
 from repositories import categories as categories_repo
 from repositories import expenses as expenses_repo
+from db.concurrent import gather_reads
+from db.session import release_connection
+from services.live import read_at_version
+from core.tracing import traced
 
 
 def _get_month_bounds(month: int) -> tuple[datetime.datetime, datetime.datetime]:
@@ -30,6 +34,7 @@ def _get_month_bounds(month: int) -> tuple[datetime.datetime, datetime.datetime]
     return start_at, end_at
 
 
+@traced("service")
 def month_summary(monthly_expenses: list[Expense]) -> dict:
     total_amount = sum(expense.amount for expense in monthly_expenses)
     return {
@@ -38,6 +43,7 @@ def month_summary(monthly_expenses: list[Expense]) -> dict:
     }
 
 
+@traced("service")
 def category_breakdown(monthly_expenses: list[Expense], category_lookup: dict[int, str]) -> list[dict]:
     breakdown_by_category: dict[int, dict] = {}
 
@@ -61,21 +67,31 @@ def category_breakdown(monthly_expenses: list[Expense], category_lookup: dict[in
     )
 
 
+@traced("service")
 def top_5_categories(category_totals: list[dict]) -> list[dict]:
     return category_totals[:5]
 
 
+@traced("service")
 async def get_monthly_report(db: AsyncSession, user: User, *, month: int) -> dict:
     start_at, end_at = _get_month_bounds(month)
 
-    monthly_expenses = await expenses_repo.list_for_user(
+    (monthly_expenses, user_categories), data_version = await read_at_version(
         db,
         user,
-        from_date=start_at,
-        to_date=end_at,
-        sort="-occurred_at",
+        lambda: gather_reads(
+            db,
+            lambda session: expenses_repo.list_for_user(
+                session,
+                user,
+                from_date=start_at,
+                to_date=end_at,
+                sort="-occurred_at",
+            ),
+            lambda session: categories_repo.list_for_user(session, user),
+        ),
     )
-    user_categories = await categories_repo.list_for_user(db, user)
+    await release_connection(db)
 
     category_lookup = {category.id: category.name for category in user_categories}
     expense_items = []
@@ -106,5 +122,6 @@ async def get_monthly_report(db: AsyncSession, user: User, *, month: int) -> dic
         "category_breakdown": categories_total,
         "top_5_categories": top_categories,
         "expenses": expense_items,
+        "data_version": data_version,
     }
     return report
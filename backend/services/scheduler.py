@@ -0,0 +1,162 @@
+"""Materialize due recurring expenses, in the background or from the command line.
+
+Each batch claims up to ``batch_size`` due rules with SKIP LOCKED, inserts
+their occurrences and advances the rules in one transaction. Memory stays
+bounded by the batch, and a crash loses at most the batch in flight, which
+the next run redoes without duplicates.
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from core.config import get_settings
+from core.logging import setup_logging, stop_logging
+from core.metrics import registry
+from db.session import Database
+from repositories import recurring as recurring_repo
+from services import recurring as recurring_service
+
+
+logger = logging.getLogger("app.scheduler")
+
+RECURRING_MATERIALIZED = registry.counter(
+    "recurring_expenses_materialized",
+    "Expenses created from recurring rules.",
+)
+RECURRING_BATCH_SECONDS = registry.histogram(
+    "recurring_batch_seconds",
+    "Duration of one recurring expense batch (claim, insert, commit).",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+@dataclass
+class RunResult:
+    batches: int = 0
+    rules: int = 0
+    expenses: int = 0
+
+
+async def materialize_due(
+    session_factory,
+    *,
+    batch_size: int,
+    max_catch_up: int,
+    now: Optional[datetime.datetime] = None,
+) -> RunResult:
+    """Work through every rule due at ``now``, one committed batch at a time."""
+    now = now or recurring_service.utc_now()
+    result = RunResult()
+    while True:
+        started = time.perf_counter()
+        async with session_factory() as db, db.begin():
+            rules = await recurring_repo.claim_due(db, now, batch_size)
+            if not rules:
+                return result
+            inserted = await recurring_service.materialize(db, rules, now, max_per_rule=max_catch_up)
+        RECURRING_BATCH_SECONDS.observe(time.perf_counter() - started)
+        RECURRING_MATERIALIZED.inc(inserted)
+        result.batches += 1
+        result.rules += len(rules)
+        result.expenses += inserted
+        logger.info("Recurring batch rules=%d expenses=%d", len(rules), inserted)
+
+
+class RecurringScheduler:
+    """Run ``materialize_due`` every ``interval`` seconds on this worker.
+
+    Every worker may run one; SKIP LOCKED splits the due rules between them.
+    """
+
+    def __init__(self, session_factory, *, interval: float, batch_size: int, max_catch_up: int):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_catch_up = max_catch_up
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="recurring-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self) -> RunResult:
+        return await materialize_due(
+            self.session_factory, batch_size=self.batch_size, max_catch_up=self.max_catch_up
+        )
+
+    async def _run(self) -> None:
+        while True:
+            # Sleep first: worker start-up already has warm-up to do.
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Recurring expense run failed")
+
+
+def build_scheduler(settings, database) -> Optional[RecurringScheduler]:
+    if not settings.RECURRING_SCHEDULER_ENABLED:
+        return None
+    return RecurringScheduler(
+        database.session_factory,
+        interval=settings.RECURRING_INTERVAL_SECONDS,
+        batch_size=settings.RECURRING_BATCH_SIZE,
+        max_catch_up=settings.RECURRING_MAX_CATCH_UP,
+    )
+
+
+async def run(args) -> RunResult:
+    settings = get_settings()
+    database = Database(settings)
+    try:
+        batch_size = args.batch_size or settings.RECURRING_BATCH_SIZE
+        max_catch_up = args.max_catch_up or settings.RECURRING_MAX_CATCH_UP
+        if args.once:
+            return await materialize_due(
+                database.session_factory, batch_size=batch_size, max_catch_up=max_catch_up
+            )
+        scheduler = RecurringScheduler(
+            database.session_factory,
+            interval=settings.RECURRING_INTERVAL_SECONDS,
+            batch_size=batch_size,
+            max_catch_up=max_catch_up,
+        )
+        while True:
+            await scheduler.run_once()
+            await asyncio.sleep(scheduler.interval)
+    finally:
+        await database.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m services.scheduler",
+        description="Create the expenses of due recurring rules.",
+    )
+    parser.add_argument("--once", action="store_true", help="work through the due rules and exit")
+    parser.add_argument("--batch-size", type=int, help="rules per transaction")
+    parser.add_argument("--max-catch-up", type=int, help="occurrences per rule and batch")
+    args = parser.parse_args()
+
+    setup_logging("INFO")
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        stop_logging()
+    print(f"batches={result.batches} rules={result.rules} expenses={result.expenses}")
+
+
+if __name__ == "__main__":
+    main()
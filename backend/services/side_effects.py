@@ -0,0 +1,43 @@
+"""Handlers for the side effects writes record in the outbox (core.tasks).
+
+Delivery is at-least-once: a handler may see the same task again after a
+retry or a worker restart, so every handler here must be idempotent.
+"""
+
+import logging
+
+from core import live
+from core.tasks import Task, handles
+from services import live as live_events
+
+
+audit_logger = logging.getLogger("app.audit")
+
+WRITE_KINDS = tuple(
+    f"{entity}.{action}"
+    for entity in ("expense", "category", "goal")
+    for action in ("created", "updated", "deleted")
+) + ("recurring.materialized",)
+
+
+@handles(*WRITE_KINDS)
+async def audit_write(task: Task) -> None:
+    """One audit line per committed write, keyed by the outbox id."""
+    audit_logger.info(
+        "task=%s kind=%s user=%s payload=%s", task.id, task.kind, task.user_id, task.payload
+    )
+
+
+@handles(*WRITE_KINDS)
+async def push_live_update(task: Task) -> None:
+    """Send the write's effect on dashboards to the user's open streams.
+
+    Clients drop events whose ``task_id`` they have already applied, and
+    deltas at or below the ``data_version`` of the data they hold.
+    """
+    payload = dict(task.payload)
+    data_version = payload.pop("data_version", None)
+    event = live_events.event_for(task.kind, payload)
+    if event is None or task.user_id is None:
+        return
+    await live.publish(task.user_id, {**event, "task_id": task.id, "data_version": data_version})
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.security import password_hasher
+from db.session import Database
+from repositories import categories as categories_repo
+from repositories import expenses as expenses_repo
+from repositories import goals as goals_repo
+from repositories import reports as reports_repo
+from repositories import users as user_repo
+
+
+logger = logging.getLogger("app.warmup")
+
+# Ids start at 1, so every warm-up statement matches no rows.
+WARMUP_USER = SimpleNamespace(id=0)
+
+
+# The read statements behind auth and the main GET endpoints.
+HOT_READS = [
+    lambda db, user: user_repo.get_by_field(db, user_repo.UserLookupField.EMAIL, "warmup@invalid"),
+    categories_repo.list_for_user,
+    lambda db, user: categories_repo.get_for_user(db, user, 0),
+    lambda db, user: expenses_repo.list_for_user(db, user, page=1, limit=20),
+    expenses_repo.count_for_user,
+    lambda db, user: expenses_repo.get_for_user(db, user, 0),
+    goals_repo.get_latest_for_user,
+    lambda db, user: goals_repo.get_for_user(db, user, 0),
+    lambda db, user: reports_repo.monthly_summary(db, user, month=1),
+    reports_repo.category_breakdown,
+    reports_repo.top_categories,
+]
+
+
+async def open_connections(engine: AsyncEngine, count: int) -> int:
+    """Check ``count`` connections out at once so the pool keeps them open."""
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(count)), return_exceptions=True
+    )
+    connections = [result for result in results if not isinstance(result, BaseException)]
+    for connection in connections:
+        await connection.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return len(connections)
+
+
+async def run_hot_reads(session_factory) -> int:
+    # One at a time: a session is not safe for concurrent statements. The
+    # engine's compiled cache keeps each statement for real requests.
+    async with session_factory() as session:
+        for read in HOT_READS:
+            await read(session, WARMUP_USER)
+        await session.rollback()
+    return len(HOT_READS)
+
+
+class Warmup:
+    """Pre-open pool connections and run the hot code paths once per worker.
+
+    Runs in the background from the lifespan; readiness stays false until it
+    has finished, so the load balancer only routes to warm workers. A failed
+    warm-up is logged and does not keep the worker out of rotation by itself.
+    """
+
+    def __init__(self, database: Database, connections: int, timeout: float):
+        self.database = database
+        self.connections = connections
+        self.timeout = timeout
+        self.finished = False
+        self.error: str | None = None
+        self.duration: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run(), name="warmup")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._warm(), timeout=self.timeout)
+        except Exception as exc:
+            self.error = type(exc).__name__
+            logger.warning("Warm-up failed: %r", exc)
+        finally:
+            self.duration = time.perf_counter() - started
+            self.finished = True
+        logger.info("Warm-up finished in %.0fms", self.duration * 1000)
+
+    async def _warm(self) -> None:
+        # Argon2 allocates its memory on the first hash; do it off the loop.
+        await asyncio.to_thread(password_hasher().hash, "warm-up")
+
+        database = self.database
+        pools = [(database.engine, database.session_factory)]
+        if database.read_session_factory is not None:
+            pools.append((database.read_engine, database.read_session_factory))
+        for engine, session_factory in pools:
+            size = engine.pool.size()
+            opened = await open_connections(engine, min(self.connections, size))
+            statements = await run_hot_reads(session_factory)
+            logger.info(
+                "Warmed pool=%s connections=%d statements=%d",
+                engine.pool.logging_name,
+                opened,
+                statements,
+            )
+
+    def status(self) -> dict:
+        if not self.finished:
+            return {"status": "pending"}
+        if self.error is not None:
+            return {"status": "fail", "error": self.error, "seconds": round(self.duration, 3)}
+        return {"status": "ok", "seconds": round(self.duration, 3)}
@@ -1,9 +1,11 @@
 import os
 import sys
 import asyncio
+from contextlib import contextmanager
 from datetime import UTC, datetime
 from pathlib import Path
 from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import httpx
 import pytest
@@ -21,8 +23,42 @@ os.environ.setdefault("POSTGRES_HOST", "localhost")
 os.environ.setdefault("POSTGRES_PORT", "5432")
 os.environ.setdefault("JWT_SECRET", "test-secret")
 
-from api.depends import get_current_user, get_db
+from api.depends import get_current_user, get_db, get_read_db
 from app.main import app
+from core.config import get_settings
+from core.rate_limit import build_limiter
+from db.instrumentation import track_queries
+
+
+class FakeSession:
+    """Stand-in for an AsyncSession, and (the class itself) for a session factory.
+
+    Works as ``async with factory() as db, db.begin():``. Statements are
+    recorded and return a MagicMock result; flush does nothing.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.rolled_back = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def begin(self):
+        return self
+
+    async def flush(self):
+        pass
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return MagicMock()
+
+    async def rollback(self):
+        self.rolled_back = True
 
 
 class SyncASGIClient:
@@ -68,6 +104,8 @@ def test_user() -> SimpleNamespace:
         username="tester",
         email="tester@example.com",
         created_at=datetime(2026, 3, 13, tzinfo=UTC),
+        data_version=3,
+        data_updated_at=datetime(2026, 3, 14, 9, 30, tzinfo=UTC),
     )
 
 
@@ -80,7 +118,9 @@ def client(db_session: object, test_user: SimpleNamespace) -> SyncASGIClient:
         return test_user
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     app.dependency_overrides[get_current_user] = override_get_current_user
+    app.state.limiter = build_limiter(get_settings())
 
     try:
         yield SyncASGIClient(app)
@@ -88,6 +128,22 @@ def client(db_session: object, test_user: SimpleNamespace) -> SyncASGIClient:
         app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def assert_max_queries():
+    """Fail the block when it runs more than ``limit`` SQL statements."""
+
+    @contextmanager
+    def check(limit: int):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, ran {stats.count}:\n"
+            + "\n".join(f"{count}x {shape}" for shape, count in stats.shapes.most_common())
+        )
+
+    return check
+
+
 @pytest.fixture
 def category_payload() -> dict[str, str]:
     return {"name": "Food", "description": "Meals and groceries"}
@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from api.v1.endpoints import expenses as expense_endpoints
+from app.main import app
+from core.capture import TrafficCapture, build_capture, query_shape
+from core.config import get_settings
+from core.security import create_access_token
+
+
+@pytest.fixture
+def capture(tmp_path):
+    traffic = TrafficCapture(
+        str(tmp_path / "capture.jsonl"), secret="capture-secret", max_bytes=1_000_000, backups=2
+    )
+    app.state.capture = traffic
+    try:
+        yield traffic
+    finally:
+        app.state.capture = None
+        traffic.close()
+
+
+def _records(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _scope(token: str | None = None) -> dict:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"headers": headers}
+
+
+def test_query_shape_keeps_only_workload_parameters():
+    shape = query_shape(
+        b"page=2&limit=20&sort=-amount&category_id=17&from_date=2026-03-01T00:00:00&q=rent"
+    )
+
+    assert shape == {
+        "page": "2",
+        "limit": "20",
+        "sort": "-amount",
+        "category_id": "<int>",
+        "from_date": "<datetime>",
+        "q": "<str>",
+    }
+
+
+def test_user_bucket_is_stable_and_anonymous_without_a_token(capture):
+    token = create_access_token("someone@example.com")
+    bucket = capture.user_bucket(_scope(token))
+
+    assert bucket == capture.user_bucket(_scope(create_access_token("someone@example.com")))
+    assert 0 <= bucket < capture.user_buckets
+    assert capture.user_bucket(_scope()) is None
+    assert capture.user_bucket(_scope("not-a-jwt")) is None
+
+
+def test_middleware_records_anonymized_request_shapes(client, capture, tmp_path):
+    with patch.object(expense_endpoints, "list_expenses", AsyncMock(return_value=([], {"total": 0}))):
+        client.get(
+            "/api/v1/expenses?page=3&limit=10&category_id=9", headers={"Authorization": "Bearer x"}
+        )
+    with patch.object(expense_endpoints, "get_expense", AsyncMock(return_value=None)):
+        client.get("/api/v1/expenses/123")
+    client.get("/health")
+    capture.close()
+
+    listed, fetched = _records(tmp_path / "capture.jsonl")
+
+    assert listed["method"] == "GET"
+    assert listed["route"] == "/api/v1/expenses"
+    assert listed["query"] == {"page": "3", "limit": "10", "category_id": "<int>"}
+    assert listed["user"] is None  # the bearer token did not verify
+    assert listed["status"] == 200
+    assert listed["ms"] >= 0 and listed["t"] > 0
+    assert fetched["route"] == "/api/v1/expenses/{expense_id}"
+    assert fetched["path_params"] == ["expense_id"]
+    assert fetched["status"] == 404
+    assert "123" not in json.dumps(fetched)
+
+
+def test_capture_file_rotates(tmp_path):
+    path = tmp_path / "capture.jsonl"
+    traffic = TrafficCapture(str(path), secret="s", max_bytes=400, backups=2)
+    scope = {"path": "/api/v1/goals", "method": "GET", "headers": [], "query_string": b""}
+    for _ in range(20):
+        traffic.record(scope, "/api/v1/goals", 200, 0.01, 1)
+    traffic.close()
+
+    assert (tmp_path / "capture.jsonl.1").exists()
+    assert not (tmp_path / "capture.jsonl.3").exists()
+
+
+def test_capture_is_off_by_default():
+    assert build_capture(get_settings()) is None
+    assert build_capture(SimpleNamespace(CAPTURE_ENABLED=False)) is None
@@ -0,0 +1,106 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from core.compression import CompressionMiddleware, negotiate
+
+
+LARGE = {"expenses": [{"id": n, "title": f"Expense {n}", "amount": 12.5} for n in range(200)]}
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return LARGE
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for n in range(100):
+                yield json.dumps({"row": n}).encode() + b"\n"
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson; charset=utf-8")
+
+    @app.get("/events")
+    async def events():
+        async def ticks():
+            yield b"data: " + b"x" * 1000 + b"\n\n"
+
+        return StreamingResponse(ticks(), media_type="text/event-stream")
+
+    @app.get("/encoded")
+    async def encoded():
+        body = gzip.compress(b"x" * 1000)
+        return PlainTextResponse(body, headers={"Content-Encoding": "gzip"})
+
+    return app
+
+
+def raw_get(path: str, accept_encoding: str | None = "gzip") -> tuple[httpx.Response, bytes]:
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {"Accept-Encoding": ""}
+
+    async def send():
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            async with client.stream("GET", path, headers=headers) as response:
+                return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+    return asyncio.run(send())
+
+
+def test_large_json_is_gzipped_with_accurate_length():
+    response, body = raw_get("/large")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == LARGE
+
+
+def test_small_body_and_unaccepted_encoding_pass_through():
+    small, _ = raw_get("/small")
+    identity, body = raw_get("/large", accept_encoding=None)
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in identity.headers
+    assert json.loads(body) == LARGE
+
+
+def test_streaming_response_is_compressed_incrementally():
+    response, body = raw_get("/stream")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = zlib.decompress(body, 31).splitlines()
+    assert len(lines) == 100
+    assert json.loads(lines[-1]) == {"row": 99}
+
+
+def test_event_streams_and_encoded_bodies_are_left_alone():
+    events, _ = raw_get("/events")
+    encoded, body = raw_get("/encoded")
+
+    assert "content-encoding" not in events.headers
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body) == b"x" * 1000
+
+
+def test_negotiate_honours_quality_values_and_server_preference():
+    encodings = {"br": object, "gzip": object}
+
+    assert negotiate("gzip, br", encodings) == "br"
+    assert negotiate("br;q=0, gzip", encodings) == "gzip"
+    assert negotiate("*", encodings) == "br"
+    assert negotiate("identity", encodings) is None
@@ -0,0 +1,108 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch
+
+from starlette.requests import Request
+
+from api import depends
+from api.depends import get_read_db
+from api.v1.endpoints import categories as category_endpoints
+from api.v1.endpoints import expenses as expense_endpoints
+from app.main import app
+
+
+def list_expenses_mock():
+    return AsyncMock(return_value=([], {"page": 1, "limit": 20, "total": 0}))
+
+
+def test_list_emits_validators(client):
+    with patch.object(expense_endpoints, "list_expenses", list_expenses_mock()):
+        response = client.get("/api/v1/expenses")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Last-Modified"] == "Sat, 14 Mar 2026 09:30:00 GMT"
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_matching_if_none_match_returns_304_without_querying(client):
+    with patch.object(expense_endpoints, "list_expenses", list_expenses_mock()):
+        etag = client.get("/api/v1/expenses").headers["ETag"]
+
+    with patch.object(expense_endpoints, "list_expenses", list_expenses_mock()) as service:
+        response = client.get("/api/v1/expenses", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    service.assert_not_awaited()
+
+
+def test_etag_changes_with_query_and_data_version(client, test_user):
+    with patch.object(expense_endpoints, "list_expenses", list_expenses_mock()):
+        first = client.get("/api/v1/expenses").headers["ETag"]
+        filtered = client.get("/api/v1/expenses", params={"category_id": 2}).headers["ETag"]
+        test_user.data_version += 1
+        response = client.get("/api/v1/expenses", headers={"If-None-Match": first})
+
+    assert filtered != first
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first
+
+
+def test_if_modified_since_is_used_without_etag(client):
+    category = {"id": 4, "name": "Food", "description": "Meals"}
+    with patch.object(category_endpoints, "get_category", AsyncMock(return_value=category)):
+        fresh = client.get(
+            "/api/v1/categories/4", headers={"If-Modified-Since": "Sat, 14 Mar 2026 09:30:01 GMT"}
+        )
+        stale = client.get(
+            "/api/v1/categories/4", headers={"If-Modified-Since": "Sat, 14 Mar 2026 09:29:59 GMT"}
+        )
+        mismatched_etag = client.get(
+            "/api/v1/categories/4",
+            headers={"If-Modified-Since": "Sat, 14 Mar 2026 09:30:01 GMT", "If-None-Match": 'W/"old"'},
+        )
+
+    assert fresh.status_code == 304
+    assert stale.status_code == 200
+    assert mismatched_etag.status_code == 200
+
+
+def test_two_writes_in_one_second_are_not_hidden_by_if_modified_since(client, test_user):
+    category = {"id": 4, "name": "Food", "description": "Meals"}
+    test_user.data_updated_at = datetime(2026, 3, 14, 9, 30, 0, 200_000, tzinfo=UTC)
+    with patch.object(category_endpoints, "get_category", AsyncMock(return_value=category)):
+        first = client.get("/api/v1/categories/4")
+        test_user.data_version += 1
+        test_user.data_updated_at = datetime(2026, 3, 14, 9, 30, 0, 700_000, tzinfo=UTC)
+        second = client.get(
+            "/api/v1/categories/4", headers={"If-Modified-Since": first.headers["Last-Modified"]}
+        )
+
+    assert first.headers["Last-Modified"] == "Sat, 14 Mar 2026 09:30:00 GMT"
+    assert second.status_code == 200
+    assert second.headers["Last-Modified"] == first.headers["Last-Modified"]
+
+
+def test_replica_reads_are_tagged_with_the_replica_version(client, test_user):
+    replica_session = object()
+
+    async def override_get_read_db():
+        yield replica_session
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    with (
+        patch.object(expense_endpoints, "list_expenses", list_expenses_mock()),
+        patch.object(
+            depends.user_repo,
+            "get_data_version",
+            AsyncMock(return_value=(test_user.data_version - 1, test_user.data_updated_at)),
+        ) as get_data_version,
+    ):
+        response = client.get("/api/v1/expenses")
+
+    get_data_version.assert_awaited_once_with(replica_session, test_user)
+    request = Request({"type": "http", "path": "/api/v1/expenses", "query_string": b"", "headers": []})
+    assert response.headers["ETag"] == depends.entity_tag(
+        test_user.id, test_user.data_version - 1, request
+    )
@@ -0,0 +1,69 @@
+import datetime
+from collections import Counter
+
+from benchmarks.datagen.__main__ import category_ids
+from benchmarks.datagen.distributions import (
+    BILLS,
+    CATEGORY_NAMES,
+    SUBSCRIPTIONS,
+    generate_expenses,
+    months_back,
+    user_rng,
+)
+
+
+MONTHS = months_back(datetime.date(2025, 12, 10), 24)
+
+
+def _expenses(user_index: int, seed: int = 0, per_user: int = 200):
+    return generate_expenses(user_rng(seed, user_index), category_ids(0, user_index), per_user, MONTHS)
+
+
+def test_months_back_ends_with_the_given_month():
+    assert months_back(datetime.date(2025, 2, 3), 3) == [(2024, 12), (2025, 1), (2025, 2)]
+    assert len(MONTHS) == 24 and MONTHS[-1] == (2025, 12)
+
+
+def test_users_are_deterministic_and_independent_of_each_other():
+    assert _expenses(7) == _expenses(7)
+    assert _expenses(7) != _expenses(8)
+    assert _expenses(7) != _expenses(7, seed=1)
+
+
+def test_category_ids_do_not_overlap_between_users():
+    first, second = category_ids(100, 0), category_ids(100, 1)
+
+    assert list(first) == list(CATEGORY_NAMES)
+    assert min(first.values()) == 101
+    assert max(first.values()) + 1 == min(second.values())
+
+
+def test_rows_fit_the_expense_columns():
+    ids = set(category_ids(0, 3).values())
+
+    for category_id, amount, occurred_at, title in _expenses(3):
+        assert category_id in ids
+        assert amount > 0
+        assert 0 < len(title) <= 50
+        assert "\t" not in title and "\n" not in title
+        datetime.datetime.strptime(occurred_at, "%Y-%m-%d %H:%M:%S")
+
+
+def test_bills_recur_every_month_at_a_fixed_day():
+    utilities = category_ids(0, 0)["Utilities"]
+    internet = [row for row in _expenses(0) if row[0] == utilities and row[3] == "Internet"]
+
+    assert len(internet) == len(MONTHS)
+    assert {row[2][8:10] for row in internet} == {"20"}
+
+
+def test_purchases_peak_in_december():
+    recurring = {title for _, title, *_ in BILLS} | {title for title, _ in SUBSCRIPTIONS}
+    by_month = Counter()
+    for user_index in range(50):
+        for _, _, occurred_at, title in _expenses(user_index):
+            if title not in recurring:
+                by_month[int(occurred_at[5:7])] += 1
+
+    assert by_month[12] > by_month[1] * 1.4
+    assert max(by_month, key=by_month.get) == 12
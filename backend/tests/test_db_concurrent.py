@@ -0,0 +1,186 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from db import concurrent
+from repositories import users as users_repo
+
+
+@pytest.fixture
+def engine():
+    # Never connects: the reads below only sleep.
+    engine = create_async_engine(
+        "postgresql+psycopg://user:pw@localhost/db", pool_size=5, max_overflow=0
+    )
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def set_budget(limit: int):
+        monkeypatch.setattr(
+            concurrent, "settings", SimpleNamespace(DB_REQUEST_CONCURRENCY=limit, DB_MAX_OVERFLOW=0)
+        )
+
+    set_budget(3)
+    return set_budget
+
+
+def slow_read(value, seconds=0.05, seen=None):
+    async def read(session):
+        if seen is not None:
+            seen.append(session)
+        await asyncio.sleep(seconds)
+        return value
+
+    return read
+
+
+def test_independent_reads_overlap_on_the_request_session_and_borrowed_ones(engine, budget):
+    seen = []
+
+    async def request():
+        async with AsyncSession(bind=engine) as session:
+            start = time.perf_counter()
+            results = await concurrent.gather_reads(
+                session,
+                slow_read("items", seen=seen),
+                slow_read(42, seen=seen),
+                slow_read("x", seen=seen),
+            )
+            return session, results, time.perf_counter() - start
+
+    session, results, elapsed = asyncio.run(request())
+
+    assert results == ["items", 42, "x"]
+    assert elapsed < 0.12
+    assert len({id(own) for own in seen}) == 3
+    assert seen[0] is session
+
+
+def test_request_budget_caps_reads_in_flight(engine, budget):
+    budget(2)
+    in_flight = peak = 0
+
+    async def tracked(session):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+
+    async def request():
+        async with AsyncSession(bind=engine) as session:
+            # Two batches from one request share the same budget.
+            await asyncio.gather(
+                concurrent.gather_reads(session, tracked, tracked, tracked),
+                concurrent.gather_reads(session, tracked, tracked),
+            )
+
+    asyncio.run(request())
+
+    # The request's own connection plus one borrowed.
+    assert peak == 2
+
+
+def test_reads_never_wait_for_the_pool_while_holding_the_request_connection(engine, budget):
+    # A pool of 5 lends out at most 2 connections across all requests.
+    seen = []
+    lent = concurrent._pool_budget(AsyncSession(bind=engine))
+    assert lent.free == 2
+
+    async def request():
+        async with AsyncSession(bind=engine) as first, AsyncSession(bind=engine) as second:
+            await asyncio.gather(
+                concurrent.gather_reads(first, slow_read(1, 0.02), slow_read(2, 0.02), slow_read(3, 0.02)),
+                concurrent.gather_reads(second, slow_read(1, 0, seen), slow_read(2, 0, seen)),
+            )
+            return second
+
+    second = asyncio.run(request())
+
+    # The first request borrowed both spare slots, so the second one read on its own session.
+    assert seen == [second, second]
+    assert lent.free == 2
+
+
+def test_session_with_writes_reads_sequentially_on_itself(engine, budget):
+    seen = []
+
+    async def request():
+        async with AsyncSession(bind=engine) as session:
+            session.info["has_writes"] = True
+            await concurrent.gather_reads(session, slow_read(1, 0, seen), slow_read(2, 0, seen))
+            return session
+
+    session = asyncio.run(request())
+
+    assert seen == [session, session]
+
+
+def test_fake_sessions_and_disabled_budget_fall_back_to_sequential(engine, budget):
+    fake = object()
+    seen = []
+
+    results = asyncio.run(concurrent.gather_reads(fake, slow_read(1, 0, seen), slow_read(2, 0, seen)))
+
+    assert results == [1, 2]
+    assert seen == [fake, fake]
+
+    budget(1)
+    seen.clear()
+
+    async def request():
+        async with AsyncSession(bind=engine) as session:
+            await concurrent.gather_reads(session, slow_read(1, 0, seen), slow_read(2, 0, seen))
+            return session
+
+    session = asyncio.run(request())
+
+    assert seen == [session, session]
+
+
+def test_failure_cancels_sibling_reads(engine, budget):
+    finished = []
+
+    async def failing(session):
+        await asyncio.sleep(0.01)
+        raise LookupError("category missing")
+
+    async def slow(session):
+        await asyncio.sleep(0.5)
+        finished.append(True)
+
+    async def request():
+        async with AsyncSession(bind=engine) as session:
+            await concurrent.gather_reads(session, failing, slow)
+
+    with pytest.raises(LookupError):
+        asyncio.run(request())
+
+    assert finished == []
+
+
+def test_goal_progress_reads_goal_and_month_total_together(monkeypatch):
+    from services import goals as goal_service
+
+    user = SimpleNamespace(id=1)
+    goal = SimpleNamespace(id=4, goal_limit=500.0)
+    monkeypatch.setattr(goal_service.goals_repo, "get_latest_for_user", AsyncMock(return_value=goal))
+    total = AsyncMock(return_value=120.0)
+    monkeypatch.setattr(goal_service.expenses_repo, "total_amount_for_month", total)
+    monkeypatch.setattr(users_repo, "get_data_version", AsyncMock(return_value=(6, None)))
+
+    progress = asyncio.run(goal_service.get_monthy_progress(object(), user=user, month=3, year=2026))
+
+    assert progress["difference"] == 380.0
+    assert progress["data_version"] == 6
+    total.assert_awaited_once()
+
+    monkeypatch.setattr(goal_service.goals_repo, "get_latest_for_user", AsyncMock(return_value=None))
+    assert asyncio.run(goal_service.get_monthy_progress(object(), user=user, month=3)) is None
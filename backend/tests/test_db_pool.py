@@ -0,0 +1,69 @@
+import logging
+from unittest.mock import MagicMock
+
+from core.metrics import Registry
+from db import pool as db_pool
+
+
+def make_pool(**kwargs):
+    return db_pool.InstrumentedAsyncQueuePool(
+        creator=MagicMock,
+        logging_name="test",
+        pool_size=2,
+        max_overflow=1,
+        **kwargs,
+    )
+
+
+def test_histogram_samples_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "doc", buckets=(0.1, 1.0))
+
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3.0)
+
+    samples = {(name, labels.get("le")): value for name, labels, value in histogram.collect()}
+    assert samples[("latency_seconds_bucket", "0.1")] == 1
+    assert samples[("latency_seconds_bucket", "1.0")] == 2
+    assert samples[("latency_seconds_bucket", "+Inf")] == 3
+    assert samples[("latency_seconds_count", None)] == 3
+    assert samples[("latency_seconds_sum", None)] == 3.55
+
+
+def test_registry_returns_existing_metric_for_same_name():
+    registry = Registry()
+
+    first = registry.counter("requests", "doc")
+    second = registry.counter("requests", "doc")
+
+    assert first is second
+
+
+def test_pool_checkout_is_timed_and_occupancy_is_reported():
+    pool = make_pool()
+    before = db_pool.POOL_CHECKOUT_SECONDS.labels(pool="test").count
+
+    first = pool.connect()
+    second = pool.connect()
+    third = pool.connect()
+
+    assert db_pool.POOL_CHECKOUT_SECONDS.labels(pool="test").count == before + 3
+    assert pool.checkedout() == 3
+    assert pool.overflow() == 1
+
+    for connection in (first, second, third):
+        connection.close()
+    assert pool.checkedout() == 0
+
+
+def test_slow_checkout_logs_warning(monkeypatch, caplog):
+    pool = make_pool()
+    monkeypatch.setattr(
+        db_pool, "settings", MagicMock(DB_POOL_CHECKOUT_WARN_MS=-1.0)
+    )
+
+    with caplog.at_level(logging.WARNING, logger="app.db.pool"):
+        pool.connect().close()
+
+    assert "Slow pool checkout pool=test" in caplog.text
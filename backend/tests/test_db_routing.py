@@ -0,0 +1,144 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from fastapi.routing import APIRoute
+
+from api.depends import get_current_user
+from app.main import create_app
+from db import routing, session as db_session
+from db.session import get_read_db
+
+
+class FakePrimarySession:
+    """Primary session that has run the user lookup and is still in its transaction."""
+
+    def __init__(self):
+        self.info, self.new, self.dirty, self.deleted = {}, (), (), ()
+        self.transaction_open = True
+
+    def in_transaction(self):
+        return self.transaction_open
+
+    async def commit(self):
+        self.transaction_open = False
+
+
+def make_request(cookie: str | None = None, database=None):
+    cookies = {routing.COOKIE_NAME: cookie} if cookie else {}
+    return SimpleNamespace(
+        cookies=cookies,
+        state=SimpleNamespace(),
+        app=SimpleNamespace(state=SimpleNamespace(database=database)),
+    )
+
+
+def cookie_value(header: str) -> str:
+    return header.split(";", 1)[0].split("=", 1)[1]
+
+
+def test_write_marker_is_signed_and_expires_after_window():
+    marker = routing.ReadAfterWrite(window_seconds=5, secret="secret")
+    header = marker.cookie(now=100.0)
+    value = cookie_value(header)
+
+    assert "Max-Age=5" in header and "HttpOnly" in header
+    assert marker.is_recent(make_request(value), now=101.0)
+    assert not marker.is_recent(make_request(value), now=106.0)
+    assert not marker.is_recent(make_request(), now=101.0)
+
+    until, _, signature = value.partition(".")
+    assert not marker.is_recent(make_request(f"{int(until) + 60}.{signature}"), now=101.0)
+    other = routing.ReadAfterWrite(window_seconds=5, secret="other")
+    assert not other.is_recent(make_request(value), now=101.0)
+
+
+def test_write_marker_far_in_the_future_is_rejected():
+    marker = routing.ReadAfterWrite(window_seconds=5, secret="secret")
+    value = cookie_value(marker.cookie(now=10_000.0))
+
+    assert not marker.is_recent(make_request(value), now=100.0)
+
+
+def test_mark_leaves_the_cookie_for_the_middleware():
+    request = make_request()
+    routing.ReadAfterWrite(window_seconds=5, secret="secret").mark(request)
+    routing.ReadAfterWrite(window_seconds=0, secret="secret").mark(disabled := make_request())
+
+    assert getattr(request.state, routing.PENDING_COOKIE).startswith(routing.COOKIE_NAME + "=")
+    assert not hasattr(disabled.state, routing.PENDING_COOKIE)
+
+
+def test_get_read_db_uses_replica_unless_client_wrote_recently():
+    replica_session = SimpleNamespace(closed=False)
+
+    class FakeReplicaSession:
+        async def __aenter__(self):
+            return replica_session
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    async def close():
+        replica_session.closed = True
+
+    replica_session.close = close
+    marker = routing.ReadAfterWrite(window_seconds=5, secret="secret")
+    database = SimpleNamespace(read_session_factory=FakeReplicaSession, read_after_write=marker)
+    primary = FakePrimarySession()
+
+    async def first_session(cookie):
+        generator = db_session.get_read_db(make_request(cookie, database), db=primary)
+        session = await generator.__anext__()
+        await generator.aclose()
+        return session
+
+    assert asyncio.run(first_session(None)) is replica_session
+    assert replica_session.closed
+
+    assert asyncio.run(first_session(cookie_value(marker.cookie()))) is primary
+    assert asyncio.run(first_session("123.forged")) is replica_session
+
+
+def test_get_read_db_releases_the_primary_before_using_the_replica():
+    class FakeReplicaSession:
+        async def __aenter__(self):
+            return SimpleNamespace(close=AsyncMock())
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    marker = routing.ReadAfterWrite(window_seconds=5, secret="secret")
+    database = SimpleNamespace(read_session_factory=FakeReplicaSession, read_after_write=marker)
+
+    async def primary_in_transaction_while_reading(cookie):
+        primary = FakePrimarySession()
+        generator = db_session.get_read_db(make_request(cookie, database), db=primary)
+        await generator.__anext__()
+        in_transaction = primary.in_transaction()
+        await generator.aclose()
+        return in_transaction
+
+    assert asyncio.run(primary_in_transaction_while_reading(None)) is False
+    # Recent writers read from the primary itself, so its transaction stays.
+    assert asyncio.run(primary_in_transaction_while_reading(cookie_value(marker.cookie()))) is True
+
+
+def test_read_routes_load_the_user_before_switching_to_the_replica():
+    def resolution_order(dependant, seen):
+        for dependency in dependant.dependencies:
+            resolution_order(dependency, seen)
+            if dependency.call not in seen:
+                seen.append(dependency.call)
+        return seen
+
+    app = create_app()
+    routes = [route for route in app.routes if isinstance(route, APIRoute)]
+    read_routes = 0
+    for route in routes:
+        order = resolution_order(route.dependant, [])
+        if get_read_db in order:
+            read_routes += 1
+            assert order.index(get_current_user) < order.index(get_read_db), route.path
+
+    assert read_routes
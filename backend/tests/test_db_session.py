@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from db import routing, session as db_session
+
+
+class FakeSession:
+    def __init__(self, in_transaction=True):
+        self.info = {}
+        self.calls = []
+        self.new = self.dirty = self.deleted = ()
+        self._in_transaction = in_transaction
+
+    def in_transaction(self):
+        return self._in_transaction
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.calls.append("close")
+        return False
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+
+@pytest.fixture
+def fake_session():
+    return FakeSession()
+
+
+@pytest.fixture
+def database(fake_session):
+    return SimpleNamespace(
+        session_factory=lambda: fake_session,
+        read_session_factory=None,
+        read_after_write=routing.ReadAfterWrite(window_seconds=5, secret="secret"),
+    )
+
+
+def make_request(database):
+    return SimpleNamespace(
+        cookies={},
+        state=SimpleNamespace(),
+        app=SimpleNamespace(state=SimpleNamespace(database=database)),
+    )
+
+
+def test_get_db_commits_once_when_handler_succeeds(fake_session, database):
+    async def run(request):
+        generator = db_session.get_db(request)
+        session = await generator.__anext__()
+        session.info["has_writes"] = True
+        with pytest.raises(StopAsyncIteration):
+            await generator.__anext__()
+
+    request = make_request(database)
+    asyncio.run(run(request))
+
+    assert fake_session.calls == ["commit", "close"]
+    assert hasattr(request.state, routing.PENDING_COOKIE)
+
+
+def test_get_db_rolls_back_when_handler_raises(fake_session, database):
+    async def run(request):
+        generator = db_session.get_db(request)
+        session = await generator.__anext__()
+        session.info["has_writes"] = True
+        with pytest.raises(ValueError):
+            await generator.athrow(ValueError("boom"))
+
+    request = make_request(database)
+    asyncio.run(run(request))
+
+    assert fake_session.calls == ["rollback", "close"]
+    assert not hasattr(request.state, routing.PENDING_COOKIE)
+
+
+def test_get_db_skips_commit_when_handler_never_queried(fake_session, database):
+    fake_session._in_transaction = False
+
+    async def run():
+        generator = db_session.get_db(make_request(database))
+        await generator.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await generator.__anext__()
+
+    asyncio.run(run())
+
+    assert fake_session.calls == ["close"]
+
+
+def test_release_connection_ends_read_only_transaction():
+    session = FakeSession()
+
+    asyncio.run(db_session.release_connection(session))
+
+    assert session.calls == ["commit"]
+
+
+def test_release_connection_keeps_transaction_with_writes():
+    flushed = FakeSession()
+    flushed.info["has_writes"] = True
+    pending = FakeSession()
+    pending.new = (object(),)
+    idle = FakeSession(in_transaction=False)
+
+    for session in (flushed, pending, idle):
+        asyncio.run(db_session.release_connection(session))
+
+    assert flushed.calls == pending.calls == idle.calls == []
@@ -1,5 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.main import app
+from services import health
+
+
 def test_healthcheck(client):
     response = client.get("/health")
 
     assert response.status_code == 200
     assert response.json() == {"health": "ok"}
+
+
+def fake_engine(checked_out=0, size=5, max_overflow=10):
+    pool = SimpleNamespace(
+        size=lambda: size,
+        _max_overflow=max_overflow,
+        checkedout=lambda: checked_out,
+        overflow=lambda: max(checked_out - size, 0),
+        checkedin=lambda: max(size - checked_out, 0),
+    )
+    return SimpleNamespace(pool=pool)
+
+
+def ready_result():
+    return {"status": "ok", "checks": {"primary": {"status": "ok"}}}
+
+
+def test_liveness_does_not_touch_the_database(client):
+    with patch.object(health, "check_database", AsyncMock()) as check:
+        response = client.get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    check.assert_not_awaited()
+
+
+def test_readiness_returns_503_when_a_check_fails(client):
+    failing = {"status": "fail", "checks": {"primary": {"status": "fail", "error": "TimeoutError"}}}
+    app.state.readiness = health.ReadinessCache(AsyncMock(return_value=failing), ttl=60)
+
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json() == failing
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+def test_readiness_result_is_cached_between_probes():
+    check = AsyncMock(return_value=ready_result())
+    cache = health.ReadinessCache(check, ttl=60)
+
+    async def probe_concurrently():
+        return await asyncio.gather(*(cache.get() for _ in range(5)))
+
+    results = asyncio.run(probe_concurrently())
+    asyncio.run(cache.get())
+
+    assert check.await_count == 1
+    assert all(result["status"] == "ok" for result in results)
+
+
+def test_saturated_pool_fails_without_a_probe_query():
+    with patch.object(health, "_applied_revisions", AsyncMock()) as probe:
+        result = asyncio.run(
+            health.check_database("primary", fake_engine(checked_out=15), check_migrations=True)
+        )
+
+    assert result["status"] == "fail"
+    assert result["pool"]["saturated"] is True
+    probe.assert_not_awaited()
+
+
+def test_pending_migrations_make_the_worker_unready():
+    heads = sorted(health.migration_heads())
+    with patch.object(health, "_applied_revisions", AsyncMock(return_value={"c134acfb532f"})):
+        behind = asyncio.run(health.check_database("primary", fake_engine(), check_migrations=True))
+    with patch.object(health, "_applied_revisions", AsyncMock(return_value=set(heads))):
+        current = asyncio.run(health.check_database("primary", fake_engine(), check_migrations=True))
+
+    assert behind["status"] == "fail"
+    assert behind["migrations"] == {"status": "behind", "applied": ["c134acfb532f"], "heads": heads}
+    assert current["status"] == "ok"
+    assert current["migrations"]["status"] == "current"
+
+
+def test_schema_from_a_newer_build_is_reported_but_still_ready():
+    with patch.object(health, "_applied_revisions", AsyncMock(return_value={"0123456789ab"})):
+        result = asyncio.run(health.check_database("primary", fake_engine(), check_migrations=True))
+
+    assert result["status"] == "ok"
+    assert result["migrations"]["status"] == "ahead"
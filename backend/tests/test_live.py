@@ -0,0 +1,171 @@
+import asyncio
+import datetime
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from core import live
+from core.security import create_access_token
+from core.tasks import Task
+from repositories import users as users_repo
+from services import side_effects
+from services.live import RESYNC, event_for, read_at_version
+
+
+MARCH = {
+    "id": 5,
+    "category_id": 2,
+    "amount": 40.0,
+    "occurred_at": "2026-03-30T10:00:00",
+    "title": "Rent",
+    "note": "",
+}
+
+
+def test_expense_events_carry_per_month_deltas_from_the_write():
+    created = event_for("expense.created", MARCH)
+
+    assert created["expense"] == MARCH
+    assert created["months"] == [
+        {
+            "year": 2026, "month": 3, "total_amount": 40.0, "total_expenses": 1,
+            "categories": [{"category_id": 2, "total_amount": 40.0, "total_expenses": 1}],
+        }
+    ]
+
+    # Another category, cheaper, and 00:30 at +02:00 is still March in UTC.
+    recategorized = {
+        **MARCH, "category_id": 3, "amount": 25.0, "occurred_at": "2026-04-01T00:30:00+02:00",
+    }
+    updated = event_for("expense.updated", {**recategorized, "before": MARCH})
+
+    assert updated["months"] == [
+        {
+            "year": 2026, "month": 3, "total_amount": -15.0, "total_expenses": 0,
+            "categories": [
+                {"category_id": 2, "total_amount": -40.0, "total_expenses": -1},
+                {"category_id": 3, "total_amount": 25.0, "total_expenses": 1},
+            ],
+        }
+    ]
+
+    moved = event_for("expense.updated", {**MARCH, "occurred_at": "2026-04-02T09:00:00", "before": MARCH})
+
+    assert [(d["month"], d["total_amount"], d["total_expenses"]) for d in moved["months"]] == [
+        (3, -40.0, -1),
+        (4, 40.0, 1),
+    ]
+
+    renamed = event_for("expense.updated", {**MARCH, "title": "Flat", "before": MARCH})
+
+    assert renamed["months"] == [] and renamed["expense"]["title"] == "Flat"
+
+    deleted = event_for("expense.deleted", {"id": 5, "before": MARCH})
+
+    assert deleted["expense"] is None
+    assert deleted["months"][0]["total_amount"] == -40.0
+
+
+def test_non_expense_events():
+    assert event_for("goal.updated", {"id": 1, "goal_limit": 900.0, "before": {}})["goal_limit"] == 900.0
+    assert event_for("goal.deleted", {"id": 1})["action"] == "deleted"
+    assert event_for("category.updated", {"id": 2, "name": "Home"})["name"] == "Home"
+    assert event_for("category.deleted", {"id": 2}) == RESYNC
+    assert event_for("category.created", {"id": 2, "name": "Home"}) is None
+    assert event_for("recurring.materialized", {"expenses": 3}) == RESYNC
+
+
+def test_hub_delivers_to_the_users_streams_and_resyncs_slow_ones():
+    hub = live.LiveHub(queue_size=2)
+
+    with hub.subscribe(1) as first, hub.subscribe(1) as second, hub.subscribe(2) as other:
+        hub.deliver(1, {"type": "expense", "n": 1})
+        second.get_nowait()
+        hub.deliver(1, {"type": "expense", "n": 2})
+        hub.deliver(1, {"type": "expense", "n": 3})
+
+        assert first.get_nowait() == RESYNC and first.empty()
+        assert [second.get_nowait()["n"], second.get_nowait()["n"]] == [2, 3]
+        assert other.empty()
+
+    assert hub._streams == {}
+
+
+def test_event_stream_sends_ready_events_and_keepalives_until_the_token_expires():
+    hub = live.LiveHub()
+
+    async def read():
+        stream = live.event_stream(hub, 7, keepalive=0.05, expires_at=time.time() + 0.3)
+        chunks = [await anext(stream)]
+        await hub.publish(7, {"type": "goal", "goal_id": 1})
+        chunks += [chunk async for chunk in stream]
+        return chunks
+
+    chunks = asyncio.run(read())
+
+    assert chunks[0].startswith(b"retry: 5000\nevent: ready\n")
+    assert chunks[1] == b'event: goal\ndata: {"type":"goal","goal_id":1}\n\n'
+    assert b": keepalive\n\n" in chunks[2:]
+    assert hub._streams == {}
+
+
+def test_postgres_notifications_round_trip_and_oversized_events_become_resync():
+    hub = live.LiveHub()
+    broker = live.PostgresBroker(hub, engine=None)
+
+    with hub.subscribe(3) as queue:
+        broker.handle(live.encode_notification(3, {"type": "expense", "expense_id": 1}))
+        broker.handle(live.encode_notification(3, {"type": "expense", "note": "x" * 10_000}))
+        broker.handle("not json")
+
+        assert queue.get_nowait() == {"type": "expense", "expense_id": 1}
+        assert queue.get_nowait() == RESYNC
+        assert queue.empty()
+
+
+def test_reads_repeat_until_no_write_commits_during_them(monkeypatch):
+    versions = iter([(4, None), (5, None), (5, None), (5, None)])
+    monkeypatch.setattr(users_repo, "get_data_version", AsyncMock(side_effect=lambda db, user: next(versions)))
+    read = AsyncMock(side_effect=["first", "second"])
+
+    result = asyncio.run(read_at_version(object(), SimpleNamespace(id=7), read))
+
+    assert result == ("second", 5)
+    assert read.await_count == 2
+
+
+def test_committed_expense_task_reaches_the_users_stream():
+    hub = live.LiveHub()
+    task = Task(11, "expense.created", 7, {**MARCH, "data_version": 12}, datetime.datetime.now(datetime.UTC))
+    live.use_hub(hub)
+    try:
+        with hub.subscribe(7) as queue:
+            asyncio.run(side_effects.push_live_update(task))
+            event = queue.get_nowait()
+    finally:
+        live.use_hub(None)
+
+    assert event["task_id"] == 11
+    assert event["data_version"] == 12
+    assert event["expense"] == MARCH
+    assert event["months"][0]["total_amount"] == 40.0
+
+
+def test_stream_endpoint(client, test_user):
+    assert client.get("/api/v1/live", headers={"Authorization": "Bearer x"}).status_code == 401
+
+    token = create_access_token(test_user.email, datetime.timedelta(seconds=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    disabled = client.get("/api/v1/live", headers=headers)
+
+    client.app.state.live = live.LiveHub()
+    try:
+        response = client.get("/api/v1/live", headers=headers)
+    finally:
+        client.app.state.live = None
+
+    assert disabled.status_code == 503
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers
+    assert response.text.startswith("retry: 5000\nevent: ready\n")
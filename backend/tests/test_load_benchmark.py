@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import random
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from api.v1.endpoints import expenses as expense_endpoints
+from api.v1.endpoints import goals as goal_endpoints
+from api.v1.endpoints import reports as report_endpoints
+from app.main import app
+from benchmarks.load import __main__ as load_cli, journeys
+from benchmarks.load.report import Recorder, build_report, compare, percentile
+from benchmarks.load.seed import SeededUser
+from core import config
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 95) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_report_summarizes_each_endpoint_and_compares_runs():
+    recorder = Recorder()
+    for ms in (10, 20, 30, 40):
+        recorder.record("GET /expenses", ms / 1000, ok=True)
+    recorder.record("POST /expenses", 0.05, ok=False)
+
+    base = build_report(recorder, elapsed=2.0, config={})
+    head = {"endpoints": {"GET /expenses": {**base["endpoints"]["GET /expenses"], "p50_ms": 30.0}}}
+    rows = {row["endpoint"]: row for row in compare(base, head)}
+
+    assert base["endpoints"]["GET /expenses"] == {
+        "requests": 4, "errors": 0, "rps": 2.0, "p50_ms": 20.0, "p95_ms": 40.0, "p99_ms": 40.0,
+    }
+    assert base["total"]["errors"] == 1
+    assert rows["GET /expenses"]["p50_ms"] == {"base": 20.0, "head": 30.0, "change_pct": 50.0}
+    assert rows["POST /expenses"]["p50_ms"]["head"] is None
+
+
+@pytest.mark.parametrize("journey", list(journeys.JOURNEYS), ids=lambda journey: journey.__name__)
+def test_journeys_hit_real_routes(client, journey, test_user):
+    expense = {
+        "id": 1, "user_id": 1, "category_id": 3, "amount": 5.0,
+        "occurred_at": "2026-03-10T12:30:00Z", "title": "Lunch", "note": "",
+    }
+    recorder = Recorder()
+    user = SeededUser(id=test_user.id, email=test_user.email, category_ids=[3])
+
+    async def drive():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            await journey(journeys.JourneyClient(http, recorder, user, "token"), random.Random(0))
+
+    with (
+        patch.object(expense_endpoints, "list_expenses", AsyncMock(return_value=([], {}))),
+        patch.object(expense_endpoints, "create_expense", AsyncMock(return_value=expense)),
+        patch.object(goal_endpoints, "get_monthly_goals", AsyncMock(return_value=None)),
+        patch.object(goal_endpoints, "get_monthly_progress", AsyncMock(return_value={})),
+        patch.object(report_endpoints, "get_monthly_report", AsyncMock(return_value={})),
+    ):
+        asyncio.run(drive())
+
+    assert recorder.samples
+    # GET /goals answers 404 when the user has no goal; anything else is a bad route.
+    assert set(recorder.errors) <= {"GET /goals"}
+
+
+def test_run_starts_the_app_with_benchmark_settings(monkeypatch):
+    for name, value in {
+        "WARMUP_ENABLED": "false",
+        "LOOP_MONITOR_ENABLED": "false",
+        "LIVE_UPDATES_BACKEND": "memory",
+        "RECURRING_SCHEDULER_ENABLED": "false",
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(config, "_settings", config.get_settings())
+    started = []
+
+    async def seed(engine, **options):
+        started.append(config.get_settings())
+        return []
+
+    monkeypatch.setattr(load_cli, "seed", seed)
+    monkeypatch.setattr(load_cli, "wait_until_ready", AsyncMock())
+    args = argparse.Namespace(
+        users=1, categories=1, expenses_per_user=1, concurrency=1, duration=0, seed=0,
+        rate_limit=False, allow_remote=False, reuse=False,
+    )
+
+    report = asyncio.run(load_cli.run(args))
+
+    assert [settings.RATE_LIMIT_ENABLED for settings in started] == [False]
+    assert report["config"]["seeded_users"] == 0
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+
+from core import loop_monitor
+from core.context import request_id_var
+from core.loop_monitor import LOOP_BLOCKED, LOOP_LAG, LoopMonitor, attributed
+
+
+def test_blocking_call_is_reported_with_its_stack(caplog):
+    def hash_password_synchronously():
+        time.sleep(0.3)
+
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+
+        async def handler():
+            await asyncio.sleep(0)
+            hash_password_synchronously()
+            return "done"
+
+        async def request():
+            request_id_var.set("req-blocked")
+            return await attributed(handler())
+
+        assert await asyncio.create_task(request()) == "done"
+        assert loop_monitor._running_request_id is None
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    lag_before = LOOP_LAG.labels().count
+    blocked_before = LOOP_BLOCKED.labels().get()
+    with caplog.at_level(logging.WARNING, logger="app.loop"):
+        asyncio.run(scenario())
+
+    assert LOOP_BLOCKED.labels().get() == blocked_before + 1
+    assert LOOP_LAG.labels().count > lag_before
+    assert "Event loop blocked for at least" in caplog.text
+    assert "hash_password_synchronously" in caplog.text
+    assert "rid=req-blocked" in caplog.text
+
+
+def test_attributed_awaitable_passes_errors_and_cancellation_through():
+    async def failing():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=1.0)
+        monitor.start()
+        try:
+            try:
+                await attributed(failing())
+            except ValueError as exc:
+                assert str(exc) == "boom"
+            sleeper = asyncio.create_task(_await(attributed(asyncio.sleep(10))))
+            await asyncio.sleep(0)
+            sleeper.cancel()
+            try:
+                await sleeper
+            except asyncio.CancelledError:
+                return "cancelled"
+        finally:
+            await monitor.stop()
+
+    assert asyncio.run(scenario()) == "cancelled"
+    assert loop_monitor._running_request_id is None
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def test_idle_loop_is_not_reported(caplog):
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.loop"):
+        asyncio.run(scenario())
+
+    assert "Event loop blocked" not in caplog.text
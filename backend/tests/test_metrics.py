@@ -0,0 +1,96 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from core import metrics
+from core.config import get_settings
+from core.metrics import MmapValueFile, Registry
+from db.session import Database
+
+
+@pytest.fixture
+def metrics_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "multiprocess_dir", lambda: str(tmp_path))
+    return tmp_path
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_render_emits_prometheus_text_format():
+    registry = Registry()
+    registry.counter("jobs", "Jobs run.", labelnames=("kind",)).labels(kind="a").inc(2)
+    registry.histogram("latency_seconds", "Latency.", buckets=(0.1,)).observe(0.05)
+
+    text = registry.render()
+
+    assert "# HELP jobs Jobs run.\n# TYPE jobs counter\n" in text
+    assert 'jobs_total{kind="a"} 2.0' in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1.0' in text
+    assert "latency_seconds_count 1.0" in text
+
+
+def test_mmap_file_round_trips_and_grows(tmp_path):
+    path = str(tmp_path / "counter_1.db")
+    value_file = MmapValueFile(path)
+
+    for index in range(5000):
+        value_file.increment(f"key-{index}", index)
+
+    assert value_file.read("key-4999") == 4999
+    reopened = dict(MmapValueFile.read_all(path))
+    assert len(reopened) == 5000
+    assert reopened["key-42"] == 42
+
+
+def test_multiprocess_render_sums_every_worker_file(metrics_dir):
+    registry = Registry()
+    counter = registry.counter("jobs", "Jobs run.")
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    counter.inc()
+    histogram.observe(0.05)
+    # Another worker's file, written by the same layout.
+    other = MmapValueFile(str(metrics_dir / "counter_1.db"))
+    other.increment('["jobs", "jobs_total", {}]', 4)
+    other_histogram = MmapValueFile(str(metrics_dir / "histogram_1.db"))
+    other_histogram.increment('["latency_seconds", "latency_seconds_bucket", {"le": "1.0"}]', 1)
+    other_histogram.increment('["latency_seconds", "latency_seconds_sum", {}]', 0.5)
+
+    text = registry.render()
+
+    assert "jobs_total 5.0" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2.0' in text
+    assert "latency_seconds_count 2.0" in text
+    assert "latency_seconds_sum 0.55" in text
+
+
+def test_multiprocess_gauges_ignore_exited_workers(metrics_dir):
+    registry = Registry()
+    gauge = registry.gauge("in_flight", "In flight.")
+    gauge.inc(2)
+    MmapValueFile(str(metrics_dir / f"gauge_{dead_pid()}.db")).write('["in_flight", "in_flight", {}]', 7)
+
+    assert "in_flight 2.0" in registry.render()
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+    # Pool gauges are registered when the lifespan creates the database.
+    database = Database(get_settings())
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "db_pool_capacity" in response.text
+    asyncio.run(database.dispose())
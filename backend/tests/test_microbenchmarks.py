@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from benchmarks.micro import __main__ as micro_cli
+from benchmarks.micro import harness
+from benchmarks.micro.cases import CASES, make_expenses
+
+
+def _results(calibration: float, **cases: float) -> dict:
+    return {"calibration_us": calibration, "cases_us": cases}
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_every_case_builds_and_runs(name):
+    CASES[name](10)()
+
+
+def test_generated_expenses_spread_over_categories():
+    expenses = make_expenses(50)
+
+    assert len({expense.category_id for expense in expenses}) > 5
+    assert all(expense.amount > 0 for expense in expenses)
+
+
+def test_measure_returns_per_call_microseconds():
+    calls = []
+
+    per_call = harness.measure(lambda: calls.append(None), min_time=0.001, repeat=2)
+
+    assert per_call > 0
+    assert len(calls) > 2
+
+
+def test_case_names_round_trip():
+    assert harness.parse_case_name(harness.case_name("report.month_summary", 1000)) == (
+        "report.month_summary",
+        1000,
+    )
+
+
+def test_compare_flags_changes_beyond_tolerance():
+    baseline = _results(100.0, **{"a[10]": 10.0, "b[10]": 10.0, "c[10]": 10.0})
+    current = _results(100.0, **{"a[10]": 11.0, "b[10]": 14.0, "c[10]": 6.0, "d[10]": 1.0})
+
+    rows = {row["case"]: row for row in harness.compare(baseline, current, tolerance=0.25)}
+
+    assert rows["a[10]"]["status"] == "ok"
+    assert rows["b[10]"]["status"] == "regressed"
+    assert rows["b[10]"]["change_pct"] == 40.0
+    assert rows["c[10]"]["status"] == "improved"
+    assert rows["d[10]"]["status"] == "new"
+
+
+def test_compare_normalizes_by_calibration():
+    # Twice as slow on a machine whose calibration loop is also twice as slow.
+    rows = harness.compare(_results(100.0, **{"a[10]": 10.0}), _results(200.0, **{"a[10]": 20.0}))
+
+    assert rows[0]["change_pct"] == 0.0
+    assert rows[0]["status"] == "ok"
+
+
+def test_check_retimes_regressions_before_failing(monkeypatch):
+    monkeypatch.setattr(harness, "measure_case", lambda case, **kwargs: 10.5)
+    current = _results(100.0, **{"a[10]": 30.0})
+
+    rows = harness.check(_results(100.0, **{"a[10]": 10.0}), current)
+
+    assert rows[0]["status"] == "ok"
+    assert current["cases_us"]["a[10]"] == 10.5
+
+
+def test_cli_exits_non_zero_on_regression(tmp_path, monkeypatch, capsys):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_results(100.0, **{"report.month_summary[10]": 1.0})))
+    slower = _results(100.0, **{"report.month_summary[10]": 5.0})
+    monkeypatch.setattr(micro_cli, "run", lambda names, sizes: slower)
+    monkeypatch.setattr(harness, "measure_case", lambda case, **kwargs: 5.0)
+    monkeypatch.setattr(
+        "sys.argv", ["micro", "run", "-k", "month_summary", "--sizes", "10", "--baseline", str(baseline)]
+    )
+
+    with pytest.raises(SystemExit) as exit_info:
+        micro_cli.main()
+
+    assert exit_info.value.code == 1
+    assert "regressed" in capsys.readouterr().out
+
+
+def test_save_keeps_cases_the_run_skipped(tmp_path, monkeypatch):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_results(100.0, **{"a[10]": 4.0, "b[10]": 1.0})))
+    monkeypatch.setattr(micro_cli, "run", lambda names, sizes: _results(200.0, **{"b[10]": 3.0}))
+    monkeypatch.setattr("sys.argv", ["micro", "run", "--save", "--baseline", str(baseline)])
+
+    micro_cli.main()
+
+    assert json.loads(baseline.read_text())["cases_us"] == {"a[10]": 8.0, "b[10]": 3.0}
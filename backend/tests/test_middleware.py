@@ -0,0 +1,92 @@
+import asyncio
+import io
+import logging
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from core import logging as app_logging
+from core.middleware import RequestContextMiddleware
+from db.routing import COOKIE_NAME, ReadAfterWrite
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"first,"
+            yield b"second"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    async def writes(request: Request):
+        yield
+        # Like get_db: marks the client once the handler has returned.
+        ReadAfterWrite(5, "secret").mark(request)
+
+    @app.post("/write")
+    async def write(_=Depends(writes, scope="function")):
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def request(app, method: str, url: str, **kwargs) -> httpx.Response:
+    async def send():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.request(method, url, **kwargs)
+
+    return asyncio.run(send())
+
+
+def test_request_id_is_echoed_or_generated(client):
+    echoed = client.get("/health", headers={"X-Request-ID": "req-abc"})
+    generated = client.get("/health")
+
+    assert echoed.headers["X-Request-ID"] == "req-abc"
+    assert len(generated.headers["X-Request-ID"]) == 36
+
+
+def test_streaming_response_passes_through_with_headers():
+    response = request(make_app(), "GET", "/stream")
+
+    assert response.status_code == 200
+    assert response.text == "first,second"
+    assert response.headers["X-DB-Queries"] == "0"
+
+
+def test_write_marker_cookie_is_sent_with_the_response():
+    app = make_app()
+
+    assert COOKIE_NAME in request(app, "POST", "/write").headers["set-cookie"]
+    assert "set-cookie" not in request(app, "GET", "/stream").headers
+
+
+def test_unhandled_error_is_logged_as_500(caplog):
+    with caplog.at_level(logging.INFO, logger="app"):
+        response = request(make_app(), "GET", "/boom", headers={"X-Request-ID": "req-500"})
+
+    assert response.status_code == 500
+    assert "GET /boom -> 500" in caplog.text
+    assert "rid=req-500" in caplog.text
+
+
+def test_setup_logging_writes_through_background_listener():
+    stream = io.StringIO()
+    app_logging.stop_logging()
+    app_logging.setup_logging("INFO", stream=stream)
+    try:
+        logging.getLogger("app.test").info("queued %s", "message")
+    finally:
+        app_logging.stop_logging()
+
+    assert "INFO app.test - queued message" in stream.getvalue()
@@ -34,7 +34,7 @@ def test_db_base_registers_all_models_for_alembic():
         check=True,
     )
 
-    assert result.stdout.strip() == "['categories', 'expenses', 'goals', 'users']"
+    assert result.stdout.strip() == "['categories', 'expenses', 'goals', 'outbox_tasks', 'recurring_expenses', 'users']"
 
 
 def test_initial_migration_creates_application_tables(monkeypatch):
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from core.middleware import RequestContextMiddleware
+from core.profiling import ProfilingMiddleware, profile_signature
+
+
+SECRET = "profiling-secret"
+
+
+def make_app(directory) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, secret=SECRET, directory=str(directory))
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/report")
+    async def report():
+        return {"rows": [{"n": n} for n in range(100)]}
+
+    return app
+
+
+def get(app, headers: dict) -> httpx.Response:
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.get("/report", headers=headers)
+
+    return asyncio.run(send())
+
+
+def test_signed_request_writes_profile_and_summary(tmp_path):
+    headers = {"X-Request-ID": "req-1", "X-Profile": profile_signature(SECRET, "req-1")}
+
+    response = get(make_app(tmp_path), headers)
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert profile_id.startswith("req-1-")
+    assert (tmp_path / f"{profile_id}.prof").exists()
+    summary = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert summary["request_id"] == "req-1"
+    assert summary["path"] == "/report"
+    assert summary["status"] == 200
+    assert summary["serialization_ms"] > 0
+    assert {"db_ms", "python_ms", "wall_ms", "top_functions"} <= set(summary)
+
+
+def test_bad_signature_is_served_unprofiled(tmp_path):
+    headers = {"X-Request-ID": "req-2", "X-Profile": profile_signature("wrong", "req-2")}
+
+    response = get(make_app(tmp_path), headers)
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_expired_signature_is_served_unprofiled(tmp_path):
+    signature = profile_signature(SECRET, "req-3", int(time.time()) - 1)
+    tampered = f"{int(time.time()) + 3600}.{signature.partition('.')[2]}"
+
+    for value in (signature, tampered):
+        response = get(make_app(tmp_path), {"X-Request-ID": "req-3", "X-Profile": value})
+        assert "X-Profile-Id" not in response.headers
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_repeated_request_id_does_not_overwrite_earlier_profiles(tmp_path):
+    headers = {"X-Request-ID": "req-4", "X-Profile": profile_signature(SECRET, "req-4")}
+    app = make_app(tmp_path)
+
+    first = get(app, headers).headers["X-Profile-Id"]
+    second = get(app, headers).headers["X-Profile-Id"]
+
+    assert first != second
+    assert len(list(tmp_path.glob("req-4-*.prof"))) == 2
+
+
+def test_unsafe_request_id_is_never_used_as_a_path(tmp_path):
+    request_id = "../escape"
+    headers = {"X-Request-ID": request_id, "X-Profile": profile_signature(SECRET, request_id)}
+
+    get(make_app(tmp_path), headers)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiler_is_not_installed_without_secret():
+    from app.main import app
+
+    assert ProfilingMiddleware not in [middleware.cls for middleware in app.user_middleware]
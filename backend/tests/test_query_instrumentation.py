@@ -0,0 +1,104 @@
+import logging
+from dataclasses import replace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from api.v1.endpoints import categories as category_endpoints
+from db.instrumentation import statement_shape, track_queries
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def test_track_queries_counts_statements_and_repeated_shapes(sqlite_engine):
+    with track_queries() as stats:
+        with sqlite_engine.connect() as connection:
+            for value in range(3):
+                connection.execute(text("SELECT :value"), {"value": value})
+            connection.execute(text("SELECT 1"))
+
+    assert stats.count == 4
+    assert stats.total_seconds > 0
+    assert stats.repeated(3) == [("SELECT ?", 3)]
+
+
+def test_nested_scopes_feed_their_parent(sqlite_engine):
+    with track_queries() as outer:
+        with track_queries() as inner:
+            with sqlite_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+    assert inner.count == 1
+    assert outer.count == 1
+
+
+def test_statement_shape_normalizes_whitespace_and_in_lists():
+    assert statement_shape("SELECT *\n  FROM t WHERE id IN (1, 2, 3)") == (
+        "SELECT * FROM t WHERE id IN (...)"
+    )
+
+
+def test_assert_max_queries_fails_when_limit_exceeded(assert_max_queries, sqlite_engine):
+    with pytest.raises(AssertionError, match="at most 1 queries, ran 2"):
+        with assert_max_queries(1):
+            with sqlite_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
+
+
+def test_responses_report_query_count_and_time(client, assert_max_queries):
+    with (
+        patch.object(category_endpoints, "list_categories", AsyncMock(return_value=[])),
+        assert_max_queries(0),
+    ):
+        response = client.get("/api/v1/categories")
+
+    assert response.headers["X-DB-Queries"] == "0"
+    assert response.headers["X-DB-Time"] == "0.0ms"
+
+
+def test_repeated_statements_are_logged_as_possible_n_plus_one(client, sqlite_engine, caplog):
+    async def list_with_n_plus_one(db, user):
+        with sqlite_engine.connect() as connection:
+            for category_id in range(6):
+                connection.execute(text("SELECT :id"), {"id": category_id})
+        return []
+
+    with (
+        patch.object(category_endpoints, "list_categories", list_with_n_plus_one),
+        caplog.at_level(logging.WARNING, logger="app"),
+    ):
+        response = client.get("/api/v1/categories")
+
+    assert response.headers["X-DB-Queries"] == "6"
+    assert "Possible N+1: statement ran 6 times in GET /api/v1/categories" in caplog.text
+
+
+def test_slow_statements_are_logged_with_request_id_and_bind_shape(
+    sqlite_engine, monkeypatch, caplog
+):
+    from core.config import get_settings
+    from core.context import request_id_var
+    from db import instrumentation
+
+    monkeypatch.setattr(
+        instrumentation, "settings", replace(get_settings(), SLOW_QUERY_MS=0.0)
+    )
+    token = request_id_var.set("req-123")
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.db.slow"):
+            with sqlite_engine.connect() as connection:
+                connection.execute(text("SELECT :name,\n :amount"), {"name": "secret", "amount": 4.5})
+    finally:
+        request_id_var.reset(token)
+
+    assert "rid=req-123" in caplog.text
+    assert "binds=(str, float)" in caplog.text
+    assert "sql=SELECT ?, ?" in caplog.text
+    assert "secret" not in caplog.text
@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from api import depends
+from api.v1.endpoints import auth as auth_endpoints
+from app.main import app
+from core import rate_limit
+from core.rate_limit import MemoryBucketStore, RateLimiter
+from core.security import create_access_token
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    store = MemoryBucketStore()
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        first = await store.take("k", cost=2, capacity=3, refill_per_second=1)
+        denied = await store.take("k", cost=2, capacity=3, refill_per_second=1)
+        now[0] += 1.0
+        allowed_again = await store.take("k", cost=2, capacity=3, refill_per_second=1)
+        return first, denied, allowed_again
+
+    first, denied, allowed_again = asyncio.run(scenario())
+
+    assert first.allowed and first.remaining == 1
+    assert not denied.allowed and denied.retry_after == pytest.approx(1.0)
+    assert allowed_again.allowed
+
+
+def test_memory_store_evicts_least_recent_clients():
+    store = MemoryBucketStore(max_keys=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await store.take(key, cost=1, capacity=5, refill_per_second=1)
+
+    asyncio.run(scenario())
+
+    assert list(store._buckets) == ["b", "c"]
+
+
+def test_store_failure_lets_requests_through():
+    broken = AsyncMock()
+    broken.take.side_effect = ConnectionError("redis down")
+    limiter = RateLimiter(broken, capacity=1, refill_per_second=1, costs={"default": 1})
+
+    decision = asyncio.run(limiter.hit("ip:1.2.3.4", "default"))
+
+    assert decision.allowed
+
+
+def test_login_is_limited_per_ip_with_retry_after(client):
+    app.state.limiter.capacity = 20
+    app.state.limiter.costs["auth"] = 10
+    payload = {"email": "tester@example.com", "password": "secret-password"}
+
+    with patch.object(auth_endpoints, "login_user", AsyncMock(return_value="token")):
+        statuses = [client.post("/api/v1/users/login", json=payload).status_code for _ in range(3)]
+        limited = client.post("/api/v1/users/login", json=payload)
+
+    assert statuses == [200, 200, 429]
+    assert limited.json() == {"detail": "Too many requests"}
+    assert int(limited.headers["Retry-After"]) >= 1
+
+
+def test_authenticated_clients_get_their_own_bucket(client):
+    app.state.limiter.capacity = 1
+    first_user = {"Authorization": f"Bearer {create_access_token('a@example.com')}"}
+    second_user = {"Authorization": f"Bearer {create_access_token('b@example.com')}"}
+
+    with patch("api.v1.endpoints.categories.list_categories", AsyncMock(return_value=[])):
+        assert client.get("/api/v1/categories", headers=first_user).status_code == 200
+        assert client.get("/api/v1/categories", headers=first_user).status_code == 429
+        assert client.get("/api/v1/categories", headers=second_user).status_code == 200
+
+
+def test_limiter_rejects_a_refill_rate_that_never_refills():
+    with pytest.raises(ValueError, match="REFILL"):
+        RateLimiter(MemoryBucketStore(), capacity=10, refill_per_second=0, costs={"default": 1})
+
+
+def test_limiter_rejects_a_route_cost_above_the_capacity():
+    with pytest.raises(ValueError, match="auth route cost"):
+        RateLimiter(
+            MemoryBucketStore(), capacity=5, refill_per_second=1, costs={"default": 1, "auth": 10}
+        )
+
+    RateLimiter(MemoryBucketStore(), capacity=10, refill_per_second=1, costs={"auth": 10})
+
+
+def test_forwarded_address_is_believed_only_from_trusted_proxies():
+    trusted = ("10.0.0.0/8",)
+
+    assert rate_limit.client_address("10.0.0.5", "203.0.113.9, 10.0.0.7", trusted) == "203.0.113.9"
+    # The leftmost entry is whatever the client sent; the proxy appended its peer.
+    assert rate_limit.client_address("10.0.0.5", "1.1.1.1, 203.0.113.9", trusted) == "203.0.113.9"
+    assert rate_limit.client_address("198.51.100.2", "203.0.113.9", trusted) == "198.51.100.2"
+    assert rate_limit.client_address("10.0.0.5", None, trusted) == "10.0.0.5"
+    assert rate_limit.client_address("10.0.0.5", "203.0.113.9", ()) == "10.0.0.5"
+    assert rate_limit.client_address(None, "203.0.113.9", trusted) == "unknown"
+
+
+def test_anonymous_clients_behind_a_trusted_proxy_get_their_own_bucket(monkeypatch):
+    monkeypatch.setattr(depends, "settings", SimpleNamespace(TRUSTED_PROXIES=("10.0.0.1",)))
+
+    def via_proxy(forwarded_for):
+        return SimpleNamespace(
+            headers={"x-forwarded-for": forwarded_for}, client=SimpleNamespace(host="10.0.0.1")
+        )
+
+    assert depends.rate_limit_client(via_proxy("203.0.113.9")) == "ip:203.0.113.9"
+    assert depends.rate_limit_client(via_proxy("203.0.113.10")) == "ip:203.0.113.10"
@@ -0,0 +1,207 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from conftest import FakeSession
+from api.v1.endpoints import recurring as recurring_endpoints
+from repositories import outbox as outbox_repo
+from repositories import recurring as recurring_repo
+from repositories import users as users_repo
+from services import recurring, scheduler
+
+
+def make_rule(rule_id=1, user_id=7, **fields) -> SimpleNamespace:
+    defaults = {
+        "category_id": 2,
+        "amount": 900.0,
+        "title": "Rent",
+        "note": "",
+        "frequency": "monthly",
+        "every": 1,
+        "starts_at": datetime.datetime(2026, 1, 31, 9, 0),
+        "ends_at": None,
+        "max_occurrences": None,
+        "next_occurrence": 0,
+        "next_run_at": datetime.datetime(2026, 1, 31, 9, 0),
+        "active": True,
+    }
+    return SimpleNamespace(id=rule_id, user_id=user_id, **{**defaults, **fields})
+
+
+@pytest.fixture
+def repos(monkeypatch):
+    calls = SimpleNamespace(
+        insert_occurrences=AsyncMock(side_effect=lambda db, rows: [(n, r["user_id"]) for n, r in enumerate(rows)]),
+        bump_data_version_for_ids=AsyncMock(return_value={7: 4, 8: 9}),
+        enqueue=AsyncMock(),
+        claim_due=AsyncMock(return_value=[]),
+    )
+    monkeypatch.setattr(recurring_repo, "insert_occurrences", calls.insert_occurrences)
+    monkeypatch.setattr(recurring_repo, "claim_due", calls.claim_due)
+    monkeypatch.setattr(users_repo, "bump_data_version_for_ids", calls.bump_data_version_for_ids)
+    monkeypatch.setattr(outbox_repo, "enqueue", calls.enqueue)
+    return calls
+
+
+def test_occurrences_keep_the_start_day_across_short_months_and_leap_years():
+    monthly = make_rule()
+    yearly = make_rule(frequency="yearly", starts_at=datetime.datetime(2024, 2, 29))
+    fortnightly = make_rule(frequency="weekly", every=2)
+
+    assert [recurring.occurrence_at(monthly, n).date().isoformat() for n in range(4)] == [
+        "2026-01-31", "2026-02-28", "2026-03-31", "2026-04-30",
+    ]
+    assert [recurring.occurrence_at(yearly, n).date().isoformat() for n in (1, 4)] == [
+        "2025-02-28", "2028-02-29",
+    ]
+    assert recurring.occurrence_at(fortnightly, 3) == datetime.datetime(2026, 3, 14, 9, 0)
+
+
+def test_due_occurrences_stop_at_now_the_rule_end_and_the_catch_up_limit():
+    now = datetime.datetime(2026, 6, 1)
+
+    rows, next_occurrence = recurring.due_occurrences(make_rule(next_occurrence=1), now, limit=100)
+    assert [row["occurrence"] for row in rows] == [1, 2, 3, 4]
+    assert next_occurrence == 5
+    assert rows[0]["occurred_at"] == datetime.datetime(2026, 2, 28, 9, 0)
+
+    limited = make_rule(max_occurrences=2)
+    assert recurring.due_occurrences(limited, now, limit=100)[1] == 2
+    assert recurring.scheduled_at(limited, 2) is None
+
+    ended = make_rule(ends_at=datetime.datetime(2026, 3, 1))
+    assert recurring.due_occurrences(ended, now, limit=100)[1] == 2
+
+    assert recurring.due_occurrences(make_rule(), now, limit=2)[1] == 2
+
+
+def test_materialize_advances_rules_and_signals_each_user_once(repos):
+    now = datetime.datetime(2026, 3, 1)
+    rules = [make_rule(1, user_id=7), make_rule(2, user_id=7), make_rule(3, user_id=8, max_occurrences=1)]
+
+    inserted = asyncio.run(recurring.materialize(FakeSession(), rules, now, max_per_rule=10))
+
+    assert inserted == 5
+    assert [(rule.next_occurrence, rule.next_run_at) for rule in rules] == [
+        (2, datetime.datetime(2026, 3, 31, 9, 0)),
+        (2, datetime.datetime(2026, 3, 31, 9, 0)),
+        (1, None),
+    ]
+    repos.bump_data_version_for_ids.assert_awaited_once()
+    assert repos.bump_data_version_for_ids.await_args.args[1] == [7, 8]
+    assert [
+        (call.args[1], call.args[2].id, call.args[3], call.kwargs["data_version"])
+        for call in repos.enqueue.await_args_list
+    ] == [
+        ("recurring.materialized", 7, {"expenses": 4}, 4),
+        ("recurring.materialized", 8, {"expenses": 1}, 9),
+    ]
+
+
+def test_materialize_due_commits_one_batch_at_a_time_until_nothing_is_due(repos):
+    now = datetime.datetime(2026, 3, 1)
+    batches = [[make_rule(1), make_rule(2)], [make_rule(3)], []]
+    repos.claim_due.side_effect = lambda db, at, limit: batches.pop(0)
+
+    result = asyncio.run(scheduler.materialize_due(FakeSession, batch_size=2, max_catch_up=10, now=now))
+
+    assert (result.batches, result.rules, result.expenses) == (2, 3, 6)
+    assert [call.args[2] for call in repos.claim_due.await_args_list] == [2, 2, 2]
+
+
+def test_resuming_a_paused_rule_skips_the_occurrences_it_missed(db_session, test_user, monkeypatch):
+    rule = make_rule(active=False, frequency="daily", next_occurrence=3)
+
+    async def update_for_user(db, user, rule_id, **fields):
+        for key, value in fields.items():
+            setattr(rule, key, value)
+        return rule
+
+    monkeypatch.setattr(recurring_repo, "get_for_user", AsyncMock(return_value=rule))
+    monkeypatch.setattr(recurring_repo, "update_for_user", update_for_user)
+    monkeypatch.setattr(recurring, "utc_now", lambda: datetime.datetime(2026, 2, 10, 12, 0))
+
+    asyncio.run(
+        recurring.update_recurring_expense(db_session, user=test_user, rule_id=1, payload={"active": True})
+    )
+
+    assert rule.active is True
+    assert rule.next_run_at == datetime.datetime(2026, 2, 11, 9, 0)
+
+    with pytest.raises(ValueError, match="frequency"):
+        asyncio.run(
+            recurring.update_recurring_expense(
+                db_session, user=test_user, rule_id=1, payload={"frequency": "weekly"}
+            )
+        )
+
+
+def test_create_recurring_expense_endpoint(client, db_session, test_user):
+    payload = {
+        "category_id": 2,
+        "amount": 900.0,
+        "title": "Rent",
+        "frequency": "monthly",
+        "starts_at": "2026-01-31T09:00:00",
+    }
+    created = make_rule(user_id=test_user.id, next_occurrence=2, next_run_at=datetime.datetime(2026, 3, 31, 9))
+
+    with patch.object(
+        recurring_endpoints, "create_recurring_expense", AsyncMock(return_value=created)
+    ) as create_mock:
+        response = client.post("/api/v1/recurring-expenses", json=payload)
+
+    assert response.status_code == 201
+    assert response.json()["next_run_at"] == "2026-03-31T09:00:00"
+    assert create_mock.await_args.kwargs["payload"]["every"] == 1
+
+    assert client.post("/api/v1/recurring-expenses", json={**payload, "frequency": "hourly"}).status_code == 422
+
+
+def test_missing_recurring_expense_returns_404(client):
+    with patch.object(recurring_endpoints, "delete_recurring_expense", AsyncMock(return_value=False)):
+        response = client.delete("/api/v1/recurring-expenses/9")
+
+    assert response.status_code == 404
+
+
+def test_update_recurring_expense_endpoint_validates_the_payload(client):
+    updated = make_rule(max_occurrences=3)
+
+    with patch.object(
+        recurring_endpoints, "update_recurring_expense", AsyncMock(return_value=updated)
+    ) as update_mock:
+        response = client.patch("/api/v1/recurring-expenses/1", json={"max_occurrences": "3"})
+        bad_type = client.patch("/api/v1/recurring-expenses/1", json={"max_occurrences": "three"})
+        schedule = client.patch("/api/v1/recurring-expenses/1", json={"frequency": "weekly"})
+
+    assert response.status_code == 200
+    assert update_mock.await_args.kwargs["payload"] == {"max_occurrences": 3}
+    assert (bad_type.status_code, schedule.status_code) == (422, 422)
+    assert update_mock.await_count == 1
+
+
+def test_update_recurring_expense_endpoint_rejects_null_for_required_fields(client):
+    with patch.object(recurring_endpoints, "update_recurring_expense", AsyncMock()) as update_mock:
+        category = client.patch("/api/v1/recurring-expenses/1", json={"category_id": None})
+        active = client.patch("/api/v1/recurring-expenses/1", json={"active": None})
+
+    assert (category.status_code, active.status_code) == (422, 422)
+    update_mock.assert_not_awaited()
+
+
+def test_update_recurring_expense_endpoint_lets_null_clear_the_limits(client):
+    updated = make_rule()
+
+    with patch.object(
+        recurring_endpoints, "update_recurring_expense", AsyncMock(return_value=updated)
+    ) as update_mock:
+        response = client.patch(
+            "/api/v1/recurring-expenses/1", json={"ends_at": None, "max_occurrences": None}
+        )
+
+    assert response.status_code == 200
+    assert update_mock.await_args.kwargs["payload"] == {"ends_at": None, "max_occurrences": None}
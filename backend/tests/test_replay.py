@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+
+from benchmarks.load.report import Recorder
+from benchmarks.load.seed import SeededUser
+from benchmarks.replay import __main__ as replay_cli
+from benchmarks.replay.__main__ import replay
+from benchmarks.replay.shapes import Resources, build_request, captured_summary, load_records
+from core import config
+
+
+USER = SeededUser(id=7, email="bench0@bench.invalid", category_ids=[70, 71])
+HEADERS = {"Authorization": "Bearer token"}
+
+
+def _record(t: float, method: str = "GET", route: str = "/api/v1/expenses", **fields) -> dict:
+    return {
+        "t": t,
+        "method": method,
+        "route": route,
+        "path_params": [],
+        "query": {},
+        "user": 3,
+        "status": 200,
+        "ms": 12.0,
+        "db_queries": 2,
+        **fields,
+    }
+
+
+def _api(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://replay")
+
+
+def _fake_app(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/api/v1/expenses" and request.url.params.get("limit") == "100":
+        return httpx.Response(200, json={"items": [{"id": 501}, {"id": 502}], "meta": {}})
+    return httpx.Response(200, json={})
+
+
+def test_load_records_merges_rotated_files_in_arrival_order(tmp_path):
+    older, newer = tmp_path / "capture.jsonl.1", tmp_path / "capture.jsonl"
+    older.write_text(json.dumps(_record(1.0)) + "\n" + json.dumps(_record(3.0)) + "\n")
+    newer.write_text(json.dumps(_record(2.0)) + "\n\n")
+
+    assert [record["t"] for record in load_records([str(newer), str(older)])] == [1.0, 2.0, 3.0]
+
+
+def test_captured_summary_matches_the_load_report_shape():
+    records = [_record(0.0, ms=10.0), _record(1.0, ms=30.0, status=500), _record(2.0, ms=20.0)]
+
+    summary = captured_summary(records)
+
+    assert summary["endpoints"]["GET /api/v1/expenses"] == {
+        "requests": 3, "errors": 1, "rps": 1.5, "p50_ms": 20.0, "p95_ms": 30.0, "p99_ms": 30.0,
+    }
+
+
+def test_build_request_fills_placeholders_from_the_seeded_user():
+    record = _record(
+        0.0,
+        route="/api/v1/expenses/{expense_id}",
+        path_params=["expense_id"],
+        query={"page": "2", "category_id": "<int>", "from_date": "<datetime>", "q": "<str>"},
+    )
+
+    async def build():
+        async with _api(_fake_app) as client:
+            return await build_request(record, USER, HEADERS, Resources(client), random.Random(0))
+
+    request = asyncio.run(build())
+
+    assert request["url"] in {"/api/v1/expenses/501", "/api/v1/expenses/502"}
+    assert request["params"]["page"] == "2"
+    assert request["params"]["category_id"] in USER.category_ids
+    assert "from_date" in request["params"]
+    assert "q" not in request["params"]
+    assert request["headers"] == HEADERS
+
+
+def test_build_request_generates_bodies_and_skips_destructive_routes():
+    async def build(record):
+        async with _api(_fake_app) as client:
+            return await build_request(record, USER, HEADERS, Resources(client), random.Random(0))
+
+    created = asyncio.run(build(_record(0.0, method="POST")))
+    register = asyncio.run(build(_record(0.0, method="POST", route="/api/v1/users/register")))
+    unknown_body = asyncio.run(build(_record(0.0, method="POST", route="/api/v1/other")))
+
+    assert created["json"]["category_id"] in USER.category_ids
+    assert created["json"]["amount"] > 0
+    assert register is None
+    assert unknown_body is None
+
+
+def test_replay_keeps_the_captured_schedule_at_the_requested_speed():
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append((time.monotonic(), request.headers.get("authorization")))
+        return httpx.Response(200, json={})
+
+    records = [
+        _record(100.0),
+        _record(101.0, user=None),
+        _record(102.0, route="/api/v1/users/register", method="POST"),
+    ]
+
+    async def run():
+        async with _api(handler) as client:
+            return await replay(client, records, [USER], {USER.id: "token"}, speed=10, max_in_flight=5)
+
+    started = time.monotonic()
+    recorder, stats = asyncio.run(run())
+
+    assert len(sent) == 2
+    assert sent[1][0] - started >= 0.09  # one captured second at 10x
+    assert sent[0][1] == "Bearer token"
+    assert sent[1][1] is None  # anonymous traffic stays anonymous
+    assert len(recorder.samples["GET /api/v1/expenses"]) == 2
+    assert stats["skipped"] == {"POST /api/v1/users/register": 1}
+
+
+def test_run_starts_the_app_with_replay_settings(monkeypatch, tmp_path):
+    for name, value in {
+        "WARMUP_ENABLED": "false",
+        "LOOP_MONITOR_ENABLED": "false",
+        "LIVE_UPDATES_BACKEND": "memory",
+        "RECURRING_SCHEDULER_ENABLED": "false",
+        "CAPTURE_ENABLED": "true",
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(config, "_settings", config.get_settings())
+    capture = tmp_path / "capture.jsonl"
+    capture.write_text(json.dumps(_record(0.0)) + "\n")
+    started = []
+
+    async def seed(engine, **options):
+        started.append(config.get_settings())
+        return [USER]
+
+    monkeypatch.setattr(replay_cli, "seed", seed)
+    monkeypatch.setattr(replay_cli, "wait_until_ready", AsyncMock())
+    monkeypatch.setattr(replay_cli, "replay", AsyncMock(return_value=(Recorder(), {"skipped": {}})))
+    args = argparse.Namespace(
+        files=[str(capture)], window=None, speed=1.0, max_in_flight=1, reuse=False,
+        users=1, categories=1, expenses_per_user=1, seed=0, rate_limit=False, allow_remote=False,
+    )
+
+    report = asyncio.run(replay_cli.run(args))
+
+    assert [(s.CAPTURE_ENABLED, s.RATE_LIMIT_ENABLED) for s in started] == [(False, False)]
+    assert report["config"]["seeded_users"] == 1
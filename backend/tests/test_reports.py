@@ -1,5 +1,8 @@
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
+from sqlalchemy.exc import OperationalError
+
 from api.v1.endpoints import reports as report_endpoints
 
 
@@ -31,3 +34,17 @@ def test_monthly_report_validates_required_query(client):
     response = client.get("/api/v1/reports/monthly")
 
     assert response.status_code == 422
+
+
+def test_monthly_report_returns_service_unavailable_when_query_times_out(client):
+    timeout = OperationalError("SELECT ...", {}, SimpleNamespace(sqlstate="57014"))
+
+    with patch.object(
+        report_endpoints,
+        "get_monthly_report",
+        AsyncMock(side_effect=timeout),
+    ):
+        response = client.get("/api/v1/reports/monthly", params={"month": 3})
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "The query took too long and was cancelled"}
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import subprocess
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from core import config, tracing
+from core.live import LiveHub
+from core.rate_limit import RateLimiter
+from core.tasks import TaskQueue
+from db.session import Database
+from services.health import ReadinessCache
+from services.scheduler import RecurringScheduler
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Created in the lifespan, never at import.
+DEFERRED_MODULES = ("psycopg", "argon2")
+
+# Cumulative ``-X importtime`` of app.main, dependencies included. It measured
+# 600-1000ms once the engines and hasher moved to the lifespan; the budget
+# leaves room for slower CI machines, not for import-time work creeping back.
+IMPORT_BUDGET_MS = 2000
+
+
+def import_app_main() -> subprocess.CompletedProcess:
+    script = (
+        "import sys, threading, app.main; "
+        f"print([name for name in {DEFERRED_MODULES!r} if name in sys.modules]); "
+        "print(threading.active_count())"
+    )
+    # No POSTGRES_* or JWT_SECRET and no .env in the working directory.
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": str(ROOT)}
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT / "tests",
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_importing_app_main_has_no_side_effects(record_property):
+    result = import_app_main()
+    loaded, threads = result.stdout.splitlines()
+
+    assert loaded == "[]"
+    assert threads == "1"
+    cumulative_us = next(
+        int(line.split("|")[1]) for line in result.stderr.splitlines() if line.endswith("| app.main")
+    )
+    record_property("app_main_import_ms", cumulative_us / 1000)
+    assert cumulative_us / 1000 < IMPORT_BUDGET_MS
+
+
+def test_lifespan_creates_and_releases_worker_resources(monkeypatch):
+    from app.main import create_app
+
+    settings = replace(
+        config.get_settings(),
+        LOOP_MONITOR_ENABLED=False,
+        WARMUP_ENABLED=False,
+        TRACE_EXPORTER="memory",
+        LIVE_UPDATES_BACKEND="memory",
+    )
+    monkeypatch.setattr(config, "_settings", None)
+    app = create_app(settings)
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            assert isinstance(app.state.database, Database)
+            assert isinstance(app.state.limiter, RateLimiter)
+            assert isinstance(app.state.readiness, ReadinessCache)
+            assert isinstance(app.state.tasks, TaskQueue)
+            assert isinstance(app.state.live, LiveHub)
+            assert isinstance(app.state.scheduler, RecurringScheduler)
+            assert tracing.tracer.enabled
+
+    asyncio.run(run())
+
+    assert config.get_settings() is settings
+    assert not tracing.tracer.enabled
+
+
+def test_failed_startup_releases_what_was_already_started(monkeypatch):
+    from app import main
+
+    settings = replace(
+        config.get_settings(),
+        LOOP_MONITOR_ENABLED=False,
+        WARMUP_ENABLED=False,
+        TRACE_EXPORTER="memory",
+        LIVE_UPDATES_BACKEND="memory",
+    )
+    monkeypatch.setattr(config, "_settings", None)
+    app = main.create_app(settings)
+    disposed = []
+    monkeypatch.setattr(Database, "dispose", lambda self: _record(disposed, "database"))
+    monkeypatch.setattr(TaskQueue, "stop", lambda self: _record(disposed, "tasks"))
+
+    def broken_scheduler(settings, database):
+        raise RuntimeError("scheduler misconfigured")
+
+    monkeypatch.setattr(main, "build_scheduler", broken_scheduler)
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            pass
+
+    with pytest.raises(RuntimeError, match="scheduler misconfigured"):
+        asyncio.run(run())
+
+    assert disposed == ["tasks", "database"]
+    assert not tracing.tracer.enabled
+    assert config._running_apps == 0
+
+
+async def _record(calls, name):
+    calls.append(name)
+
+
+def test_settings_can_be_replaced_until_an_app_starts(monkeypatch):
+    from app.main import create_app
+
+    monkeypatch.setattr(config, "_settings", config.get_settings())
+    # What the benchmark CLIs do: derive settings from the installed ones.
+    overridden = replace(config.get_settings(), RATE_LIMIT_ENABLED=False)
+
+    app = create_app(overridden)
+
+    assert app.state.settings is overridden
+    assert config.get_settings() is overridden
+
+
+def test_other_settings_are_refused_while_an_app_runs(monkeypatch):
+    monkeypatch.setattr(config, "_settings", None)
+    running = replace(config.read_settings(), RATE_LIMIT_ENABLED=False)
+
+    with config.settings_in_use(running):
+        config.configure(running)
+        with pytest.raises(RuntimeError, match="one app per process"):
+            config.configure(replace(running, RATE_LIMIT_ENABLED=True))
+        assert config.get_settings() is running
+
+    config.configure(replace(running, RATE_LIMIT_ENABLED=True))
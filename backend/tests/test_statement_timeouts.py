@@ -0,0 +1,60 @@
+from contextvars import copy_context
+from types import SimpleNamespace
+
+import pytest
+
+from api.depends import statement_budget
+from db import timeouts
+
+
+class FakeConnection:
+    def __init__(self, dialect_name="postgresql"):
+        self.dialect = SimpleNamespace(name=dialect_name)
+        self.statements = []
+
+    def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+
+
+def begin_with_timeout(timeout_ms, connection):
+    def run():
+        if timeout_ms is not None:
+            timeouts.use_statement_timeout(timeout_ms)
+        timeouts._apply_statement_timeout(None, None, connection)
+
+    copy_context().run(run)
+
+
+def test_interactive_requests_use_connection_default():
+    connection = FakeConnection()
+
+    begin_with_timeout(None, connection)
+    begin_with_timeout(timeouts.settings.STATEMENT_TIMEOUT_MS, connection)
+
+    assert connection.statements == []
+
+
+def test_report_budget_is_set_locally_for_the_transaction():
+    connection = FakeConnection()
+
+    begin_with_timeout(45000, connection)
+
+    assert connection.statements == ["SET LOCAL statement_timeout = 45000"]
+
+
+def test_non_postgres_connections_are_left_alone():
+    connection = FakeConnection(dialect_name="sqlite")
+
+    begin_with_timeout(45000, connection)
+
+    assert connection.statements == []
+
+
+def test_statement_budget_dependency_sets_group_timeout():
+    def run():
+        # Drive the coroutine in this context; asyncio.run would copy it.
+        with pytest.raises(StopIteration):
+            statement_budget("report")().send(None)
+        return timeouts.statement_timeout_var.get()
+
+    assert copy_context().run(run) == timeouts.settings.REPORT_STATEMENT_TIMEOUT_MS
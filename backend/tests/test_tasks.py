@@ -0,0 +1,205 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from conftest import FakeSession
+from core import tasks
+from core.metrics import registry
+from repositories import outbox as outbox_repo
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    calls = SimpleNamespace(
+        renew_lease=AsyncMock(side_effect=lambda db, task_id, **kw: datetime.datetime.now(datetime.UTC)),
+        complete=AsyncMock(),
+        retry_later=AsyncMock(),
+        mark_failed=AsyncMock(),
+        claim_due=AsyncMock(return_value=[]),
+    )
+    for name in ("renew_lease", "complete", "retry_later", "mark_failed", "claim_due"):
+        monkeypatch.setattr(outbox_repo, name, getattr(calls, name))
+    return calls
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    monkeypatch.setattr(tasks, "HANDLERS", {})
+    return tasks.HANDLERS
+
+
+def make_queue(**options) -> tasks.TaskQueue:
+    options = {"workers": 1, "maxsize": 10, "max_attempts": 3, "poll_interval": 60, **options}
+    return tasks.TaskQueue(FakeSession, **options)
+
+
+def make_task(task_id=1, kind="expense.created", attempts=0) -> tasks.Task:
+    created_at = datetime.datetime.now(datetime.UTC) - datetime.timedelta(seconds=2)
+    return tasks.Task(task_id, kind, 7, {"id": 3}, created_at, attempts)
+
+
+def sample(name: str, **labels) -> float:
+    text = registry.render()
+    prefix = name + ("{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else "")
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.split()[-1])
+    return 0.0
+
+
+def test_workers_run_handlers_and_delete_completed_tasks(outbox, handlers):
+    seen = []
+
+    @tasks.handles("expense.created", "goal.updated")
+    async def record(task):
+        seen.append((task.id, task.kind))
+
+    before = sample("tasks_processed_total", kind="goal.updated", result="ok")
+
+    async def run():
+        queue = make_queue(workers=2)
+        queue.start()
+        assert queue.submit(make_task(1)) and queue.submit(make_task(2, "goal.updated"))
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert sorted(seen) == [(1, "expense.created"), (2, "goal.updated")]
+    assert [call.args[1] for call in outbox.complete.await_args_list] == [1, 2]
+    assert sample("tasks_processed_total", kind="goal.updated", result="ok") == before + 1
+    assert sample("task_lag_seconds_count", kind="goal.updated") >= 1
+
+
+def test_failing_handler_backs_off_then_parks_the_task(outbox, handlers):
+    @tasks.handles("expense.updated")
+    async def broken(task):
+        raise RuntimeError("downstream unavailable")
+
+    queue = make_queue(max_attempts=3)
+    asyncio.run(queue.run(make_task(kind="expense.updated", attempts=0)))
+
+    outbox.complete.assert_not_awaited()
+    retry = outbox.retry_later.await_args
+    assert retry.kwargs["attempts"] == 1
+    assert 1 <= retry.kwargs["delay"] <= 2
+    assert retry.kwargs["error"] == "RuntimeError: downstream unavailable"
+
+    asyncio.run(queue.run(make_task(kind="expense.updated", attempts=2)))
+
+    assert outbox.mark_failed.await_args.kwargs["attempts"] == 3
+
+
+def test_handlers_renew_the_lease_and_a_retry_skips_the_ones_that_succeeded(outbox, handlers):
+    calls = []
+
+    @tasks.handles("expense.deleted")
+    async def audit(task):
+        calls.append("audit")
+
+    @tasks.handles("expense.deleted")
+    async def push(task):
+        calls.append("push")
+        if len(calls) == 2:
+            raise RuntimeError("broker down")
+
+    queue = make_queue()
+    task = make_task(kind="expense.deleted")
+    asyncio.run(queue.run(task))
+
+    assert outbox.renew_lease.await_count == 2
+    assert outbox.retry_later.await_args.kwargs["done"] == [tasks.handler_name(audit)]
+    assert outbox.retry_later.await_args.kwargs["lease"] == task.lease
+
+    retried = make_task(kind="expense.deleted", attempts=1)
+    retried.done = [tasks.handler_name(audit)]
+    asyncio.run(queue.run(retried))
+
+    assert calls == ["audit", "push", "push"]
+    assert outbox.complete.await_count == 1
+
+
+def test_task_completed_or_taken_over_elsewhere_is_skipped(outbox, handlers):
+    calls = []
+
+    @tasks.handles("goal.updated")
+    async def record(task):
+        calls.append(task.id)
+
+    outbox.renew_lease.side_effect = None
+    outbox.renew_lease.return_value = None
+    before = sample("tasks_processed_total", kind="goal.updated", result="skipped")
+
+    asyncio.run(make_queue().run(make_task(kind="goal.updated")))
+
+    assert calls == []
+    outbox.complete.assert_not_awaited()
+    outbox.retry_later.assert_not_awaited()
+    assert sample("tasks_processed_total", kind="goal.updated", result="skipped") == before + 1
+
+
+def test_full_queue_leaves_tasks_for_the_sweep(outbox):
+    queue = make_queue(maxsize=1)
+    before = sample("tasks_deferred_total")
+
+    assert queue.submit(make_task(1))
+    assert not queue.submit(make_task(2))
+    assert sample("tasks_deferred_total") == before + 1
+    assert sample("task_queue_depth") == 1
+
+
+def test_sweep_claims_only_the_free_queue_space(outbox):
+    row = SimpleNamespace(
+        id=9, kind="goal.deleted", user_id=7, payload={"id": 1},
+        created_at=datetime.datetime.now(datetime.UTC), attempts=1,
+        available_at=datetime.datetime.now(datetime.UTC), handlers_done=["audit"],
+    )
+    outbox.claim_due.return_value = [row]
+    queue = make_queue(maxsize=3)
+    queue.submit(make_task(1))
+
+    assert asyncio.run(queue.sweep_once()) == 1
+    assert outbox.claim_due.await_args.args[1] == 2
+    assert queue.queue.qsize() == 2
+    queue.queue.get_nowait()
+    assert queue.queue.get_nowait().done == ["audit"]
+
+
+def test_commit_hands_pending_tasks_to_the_queue_and_rollback_drops_them():
+    queue = make_queue()
+    row = SimpleNamespace(
+        id=4, kind="expense.deleted", user_id=7, payload={"id": 4},
+        created_at=datetime.datetime.now(datetime.UTC), attempts=0,
+        available_at=datetime.datetime.now(datetime.UTC), handlers_done=[],
+    )
+    tasks.use_queue(queue)
+    try:
+        session = Session()
+        session.begin()
+        session.info[outbox_repo.PENDING_KEY] = [row]
+        session.rollback()
+        session.commit()
+        assert queue.queue.qsize() == 0
+
+        session.info[outbox_repo.PENDING_KEY] = [row]
+        session.commit()
+    finally:
+        tasks.use_queue(None)
+
+    assert queue.queue.get_nowait().id == 4
+    assert outbox_repo.PENDING_KEY not in session.info
+
+
+def test_enqueue_records_the_task_in_the_callers_transaction(monkeypatch):
+    monkeypatch.setattr(outbox_repo, "settings", SimpleNamespace(TASK_LEASE_SECONDS=60))
+    session = Session()
+
+    task = asyncio.run(outbox_repo.enqueue(session, "goal.created", SimpleNamespace(id=7), {"id": 1}))
+
+    assert task in session.new
+    assert session.info[outbox_repo.PENDING_KEY] == [task]
+    assert (task.available_at - task.created_at).total_seconds() == 60
+    assert task.handlers_done == []
@@ -0,0 +1,137 @@
+import json
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from core import tracing
+from core.tracing import InMemoryExporter, JsonLinesExporter, otlp_payload, traced
+from repositories import users as users_repo
+from services import report as report_service
+
+
+@pytest.fixture
+def exporter():
+    memory = InMemoryExporter()
+    tracing.use_exporter(memory)
+    yield memory
+    tracing.use_exporter(None)
+
+
+@traced("repository")
+async def list_expenses_stub(db, user, **filters):
+    return []
+
+
+@traced("repository")
+async def list_categories_stub(db, user):
+    return []
+
+
+def test_monthly_report_spans_nest_from_request_to_repository(client, exporter):
+    with (
+        patch.object(report_service.expenses_repo, "list_for_user", list_expenses_stub),
+        patch.object(report_service.categories_repo, "list_for_user", list_categories_stub),
+        patch.object(report_service, "release_connection", AsyncMock()),
+        patch.object(users_repo, "get_data_version", AsyncMock(return_value=(3, None))),
+    ):
+        response = client.get(
+            "/api/v1/reports/monthly", params={"month": 3}, headers={"X-Request-ID": "req-trace"}
+        )
+
+    assert response.status_code == 200
+    spans = {span.name: span for span in exporter.spans}
+    root = spans["GET /api/v1/reports/monthly"]
+    service = spans["services.report.get_monthly_report"]
+    repository = spans[f"{__name__}.list_expenses_stub"]
+    assert root.parent_id is None
+    assert root.attributes["http.status_code"] == 200
+    assert service.parent_id == root.span_id
+    assert repository.parent_id == service.span_id
+    assert {span.trace_id for span in exporter.spans} == {root.trace_id}
+    assert {span.request_id for span in exporter.spans} == {"req-trace"}
+    assert service.duration_ms >= repository.duration_ms
+
+
+def test_sql_statements_become_child_spans(exporter):
+    engine = create_engine("sqlite://")
+
+    with tracing.span("work", "service") as parent:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    sql = [span for span in exporter.spans if span.layer == "db"]
+    assert len(sql) == 1
+    assert sql[0].parent_id == parent.span_id
+    assert sql[0].attributes["db.statement"] == "SELECT 1"
+
+
+def test_failed_call_marks_span_as_error(exporter):
+    @traced("service")
+    def explode():
+        raise ValueError("nope")
+
+    with pytest.raises(ValueError):
+        explode()
+
+    assert exporter.spans[0].status == "error"
+    assert exporter.spans[0].attributes["error.type"] == "ValueError"
+
+
+def test_tracing_disabled_records_nothing():
+    with tracing.span("ignored", "service") as current:
+        assert current is None
+
+
+def test_jsonl_exporter_appends_one_line_per_span(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonLinesExporter(str(path))
+    tracing.use_exporter(exporter)
+    try:
+        with tracing.span("outer", "service"):
+            with tracing.span("inner", "repository"):
+                pass
+    finally:
+        tracing.use_exporter(None)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["inner", "outer"]
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+
+
+def test_background_exporter_drops_and_counts_spans_when_its_queue_is_full():
+    writing, release = threading.Event(), threading.Event()
+    written = []
+
+    class SlowExporter(tracing._BackgroundExporter):
+        def write(self, spans):
+            writing.set()
+            release.wait(5)
+            written.extend(spans)
+
+    exporter = SlowExporter(max_queue=2)
+    dropped = tracing.SPANS_DROPPED.labels(reason="queue_full")
+    before = dropped.get()
+    spans = [tracing.Tracer().start_span(f"s{n}", "service", {}) for n in range(6)]
+    exporter.export(spans[0])
+    assert writing.wait(5)
+    for span in spans[1:]:
+        exporter.export(span)
+    release.set()
+    exporter.shutdown()
+
+    assert dropped.get() == before + 3
+    assert [span.name for span in written] == ["s0", "s1", "s2"]
+
+
+def test_otlp_payload_uses_collector_json_encoding():
+    span = tracing.Tracer().start_span("sql", "db", {"db.statement": "SELECT 1"})
+    span.end_ns = span.start_ns + 1000
+
+    payload = otlp_payload([span], "expense-tracker")
+
+    encoded = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert encoded["traceId"] == span.trace_id
+    assert encoded["endTimeUnixNano"] == str(span.start_ns + 1000)
+    assert {"key": "db.statement", "value": {"stringValue": "SELECT 1"}} in encoded["attributes"]
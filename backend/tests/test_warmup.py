@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from conftest import FakeSession
+from services import health, warmup
+from services.warmup import HOT_READS, Warmup
+
+
+def fake_database(replica=False):
+    primary = SimpleNamespace(pool=SimpleNamespace(size=lambda: 5, logging_name="primary"))
+    replica_engine = SimpleNamespace(pool=SimpleNamespace(size=lambda: 5, logging_name="replica"))
+    return SimpleNamespace(
+        engine=primary,
+        session_factory=FakeSession,
+        read_engine=replica_engine if replica else primary,
+        read_session_factory=FakeSession if replica else None,
+    )
+
+
+def run_warmup(database, connections=3):
+    job = Warmup(database, connections=connections, timeout=5)
+    asyncio.run(job.run())
+    return job
+
+
+def test_hot_reads_execute_once_and_roll_back():
+    session = FakeSession()
+
+    count = asyncio.run(warmup.run_hot_reads(lambda: session))
+
+    assert count == len(HOT_READS)
+    assert len(session.statements) >= len(HOT_READS)
+    assert session.rolled_back
+
+
+def test_warmup_opens_connections_on_every_pool(monkeypatch):
+    open_connections = AsyncMock(side_effect=lambda engine, count: count)
+    monkeypatch.setattr(warmup, "open_connections", open_connections)
+    monkeypatch.setattr(warmup, "password_hasher", MagicMock())
+    database = fake_database(replica=True)
+
+    job = run_warmup(database, connections=8)
+
+    assert job.status()["status"] == "ok"
+    assert [call.args for call in open_connections.await_args_list] == [
+        (database.engine, 5),
+        (database.read_engine, 5),
+    ]
+
+
+def test_failed_warmup_is_reported_but_finishes(monkeypatch):
+    monkeypatch.setattr(warmup, "open_connections", AsyncMock(side_effect=ConnectionRefusedError()))
+    monkeypatch.setattr(warmup, "password_hasher", MagicMock())
+
+    job = run_warmup(fake_database())
+
+    assert job.finished
+    assert job.status()["status"] == "fail"
+    assert job.status()["error"] == "ConnectionRefusedError"
+
+
+def test_worker_is_not_ready_until_warmup_finishes():
+    database = SimpleNamespace(engine=object(), read_engine=None)
+    pending = SimpleNamespace(finished=False, status=lambda: {"status": "pending"})
+    done = SimpleNamespace(finished=True, status=lambda: {"status": "ok", "seconds": 0.2})
+
+    with patch.object(health, "check_database", AsyncMock(return_value={"status": "ok"})):
+        warming = asyncio.run(health.check_readiness(database, pending))
+        warm = asyncio.run(health.check_readiness(database, done))
+
+    assert warming["status"] == "fail"
+    assert warming["checks"]["warmup"] == {"status": "pending"}
+    assert warm["status"] == "ok"
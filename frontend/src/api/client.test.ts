@@ -29,5 +29,6 @@ describe("apiRequest", () => {
     const requestOptions = fetchMock.mock.calls[0]?.[1] as RequestInit;
     const headers = new Headers(requestOptions.headers);
     expect(headers.get("Authorization")).toBe("Bearer abc");
+    expect(requestOptions.credentials).toBe("include");
   });
 });
@@ -57,6 +57,9 @@ export async function apiRequest<T>(path: string, options: ApiRequestOptions = {
     headers,
     body: options.body !== undefined ? JSON.stringify(options.body) : undefined,
     signal: options.signal,
+    // Carries the server's read-after-write cookie, so reads right after a
+    // write are served by the primary.
+    credentials: "include",
   });
 
   if (!response.ok) {
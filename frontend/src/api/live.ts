@@ -0,0 +1,50 @@
+import { API_BASE_URL } from "../lib/env";
+import { ApiError } from "../types/api";
+import type { LiveEvent } from "../types/live";
+
+function parseEventBlock(block: string): LiveEvent | null {
+  const data = block
+    .split("\n")
+    .filter((line) => line.startsWith("data:"))
+    .map((line) => line.slice(5).trimStart())
+    .join("\n");
+
+  return data ? (JSON.parse(data) as LiveEvent) : null;
+}
+
+// fetch instead of EventSource: EventSource cannot send the bearer token.
+export async function streamLiveUpdates(
+  token: string,
+  onEvent: (event: LiveEvent) => void,
+  signal: AbortSignal,
+) {
+  const response = await fetch(`${API_BASE_URL}/live`, {
+    headers: { Authorization: `Bearer ${token}`, Accept: "text/event-stream" },
+    signal,
+  });
+
+  if (!response.ok || !response.body) {
+    throw new ApiError("Live updates are unavailable", response.status);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      return;
+    }
+
+    buffer += value;
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const event = parseEventBlock(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      if (event) {
+        onEvent(event);
+      }
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+}
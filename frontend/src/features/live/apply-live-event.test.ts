@@ -0,0 +1,174 @@
+import { QueryClient } from "@tanstack/react-query";
+import { describe, expect, it } from "vitest";
+
+import type { GoalProgress } from "../../types/goals";
+import type { LiveEvent } from "../../types/live";
+import type { MonthlyReport } from "../../types/reports";
+import { applyLiveEvent } from "./apply-live-event";
+
+function seededClient() {
+  const queryClient = new QueryClient();
+  const report: MonthlyReport = {
+    month: 3,
+    year: 2026,
+    start_at: "2026-03-01T00:00:00+00:00",
+    end_at: "2026-03-31T23:59:59.999999+00:00",
+    month_summary: { total_expenses: 1, total_amount: 120 },
+    category_breakdown: [{ category_id: 2, category_name: "Food", total_amount: 120, total_expenses: 1 }],
+    top_5_categories: [{ category_id: 2, category_name: "Food", total_amount: 120, total_expenses: 1 }],
+    expenses: [
+      {
+        id: 8,
+        category_id: 2,
+        category_name: "Food",
+        amount: 120,
+        occurred_at: "2026-03-05T09:00:00",
+        title: "Groceries",
+        note: "",
+      },
+    ],
+    data_version: 5,
+  };
+  const progress: GoalProgress = {
+    goal_id: 1,
+    month: 3,
+    year: 2026,
+    goal_limit: 500,
+    total_expense: 120,
+    difference: 380,
+    data_version: 5,
+  };
+  queryClient.setQueryData(["reports", "monthly", 3], report);
+  queryClient.setQueryData(["goals", "progress", 3], progress);
+  queryClient.setQueryData(["categories"], [
+    { id: 2, name: "Food", description: "" },
+    { id: 3, name: "Rent", description: "" },
+  ]);
+  return queryClient;
+}
+
+const created: LiveEvent = {
+  type: "expense",
+  action: "created",
+  task_id: 41,
+  data_version: 6,
+  expense_id: 9,
+  expense: {
+    id: 9,
+    category_id: 3,
+    amount: 40,
+    occurred_at: "2026-03-30T10:00:00",
+    title: "Rent",
+    note: "",
+  },
+  months: [
+    {
+      year: 2026,
+      month: 3,
+      total_amount: 40,
+      total_expenses: 1,
+      categories: [{ category_id: 3, total_amount: 40, total_expenses: 1 }],
+    },
+  ],
+};
+
+describe("applyLiveEvent", () => {
+  it("patches the cached report and goal progress from expense deltas once", () => {
+    const queryClient = seededClient();
+    const seen = new Set<number>();
+
+    applyLiveEvent(queryClient, created, seen);
+    applyLiveEvent(queryClient, created, seen);
+
+    const report = queryClient.getQueryData<MonthlyReport>(["reports", "monthly", 3])!;
+    expect(report.month_summary).toEqual({ total_expenses: 2, total_amount: 160 });
+    expect(report.category_breakdown.map((item) => [item.category_name, item.total_amount])).toEqual([
+      ["Food", 120],
+      ["Rent", 40],
+    ]);
+    expect(report.expenses.map((expense) => expense.id)).toEqual([9, 8]);
+
+    const progress = queryClient.getQueryData<GoalProgress>(["goals", "progress", 3])!;
+    expect(progress.total_expense).toBe(160);
+    expect(progress.difference).toBe(340);
+  });
+
+  it("drops emptied categories and applies goal limit changes", () => {
+    const queryClient = seededClient();
+    const seen = new Set<number>();
+
+    applyLiveEvent(
+      queryClient,
+      {
+        type: "expense",
+        action: "deleted",
+        task_id: 42,
+        data_version: 7,
+        expense_id: 8,
+        expense: null,
+        months: [
+          {
+            year: 2026,
+            month: 3,
+            total_amount: -120,
+            total_expenses: -1,
+            categories: [{ category_id: 2, total_amount: -120, total_expenses: -1 }],
+          },
+        ],
+      },
+      seen,
+    );
+    applyLiveEvent(
+      queryClient,
+      { type: "goal", action: "updated", task_id: 43, data_version: 8, goal_id: 1, goal_limit: 300 },
+      seen,
+    );
+
+    const report = queryClient.getQueryData<MonthlyReport>(["reports", "monthly", 3])!;
+    expect(report.category_breakdown).toEqual([]);
+    expect(report.expenses).toEqual([]);
+    expect(queryClient.getQueryData<GoalProgress>(["goals", "progress", 3])).toMatchObject({
+      goal_limit: 300,
+      total_expense: 0,
+      difference: 300,
+    });
+  });
+
+  it("skips deltas a fetched report or progress already includes", () => {
+    const queryClient = seededClient();
+
+    // Fetched at version 5, so the write that produced version 5 is counted.
+    applyLiveEvent(queryClient, { ...created, data_version: 5 }, new Set());
+
+    expect(queryClient.getQueryData<MonthlyReport>(["reports", "monthly", 3])!.month_summary).toEqual({
+      total_expenses: 1,
+      total_amount: 120,
+    });
+    expect(queryClient.getQueryData<GoalProgress>(["goals", "progress", 3])!.total_expense).toBe(120);
+  });
+
+  it("measures progress against a newly created goal", () => {
+    const queryClient = seededClient();
+
+    applyLiveEvent(
+      queryClient,
+      { type: "goal", action: "created", task_id: 44, data_version: 6, goal_id: 2, goal_limit: 200 },
+      new Set(),
+    );
+
+    expect(queryClient.getQueryData<GoalProgress>(["goals", "progress", 3])).toMatchObject({
+      goal_id: 2,
+      goal_limit: 200,
+      difference: 80,
+    });
+  });
+
+  it("marks dashboard queries stale on resync", () => {
+    const queryClient = seededClient();
+
+    applyLiveEvent(queryClient, { type: "resync" }, new Set());
+
+    expect(queryClient.getQueryState(["reports", "monthly", 3])?.isInvalidated).toBe(true);
+    expect(queryClient.getQueryState(["goals", "progress", 3])?.isInvalidated).toBe(true);
+  });
+});
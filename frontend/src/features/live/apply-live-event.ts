@@ -0,0 +1,195 @@
+import type { QueryClient } from "@tanstack/react-query";
+
+import type { Category } from "../../types/categories";
+import type { Goal, GoalProgress } from "../../types/goals";
+import type { LiveEvent, LiveExpense, LiveMonthDelta } from "../../types/live";
+import type { CategoryBreakdownItem, MonthlyReport } from "../../types/reports";
+
+const MAX_SEEN_TASKS = 500;
+
+// Naive timestamps from the API are UTC, like the report's month bounds.
+function parseUtc(occurredAt: string) {
+  const hasZone = /(Z|[+-]\d{2}:\d{2})$/.test(occurredAt);
+  return new Date(hasZone ? occurredAt : `${occurredAt}Z`);
+}
+
+function utcMonth(occurredAt: string) {
+  const date = parseUtc(occurredAt);
+  return { year: date.getUTCFullYear(), month: date.getUTCMonth() + 1 };
+}
+
+function patchBreakdown(
+  items: CategoryBreakdownItem[],
+  delta: LiveMonthDelta,
+  categoryName: (categoryId: number) => string | null,
+) {
+  const byId = new Map(items.map((item) => [item.category_id, { ...item }]));
+
+  delta.categories.forEach((change) => {
+    const item = byId.get(change.category_id) ?? {
+      category_id: change.category_id,
+      category_name: categoryName(change.category_id),
+      total_amount: 0,
+      total_expenses: 0,
+    };
+    item.total_amount += change.total_amount;
+    item.total_expenses += change.total_expenses;
+    byId.set(change.category_id, item);
+  });
+
+  return [...byId.values()]
+    .filter((item) => item.total_expenses > 0)
+    .sort((left, right) => right.total_amount - left.total_amount);
+}
+
+function patchReport(
+  report: MonthlyReport,
+  expenseId: number,
+  expense: LiveExpense | null,
+  months: LiveMonthDelta[],
+  categories: Category[] | undefined,
+) {
+  const delta = months.find((item) => item.year === report.year && item.month === report.month);
+  const categoryName = (categoryId: number) =>
+    report.category_breakdown.find((item) => item.category_id === categoryId)?.category_name ??
+    categories?.find((category) => category.id === categoryId)?.name ??
+    null;
+
+  const expenses = report.expenses.filter((item) => item.id !== expenseId);
+  if (expense) {
+    const { year, month } = utcMonth(expense.occurred_at);
+    if (year === report.year && month === report.month) {
+      expenses.push({ ...expense, category_name: categoryName(expense.category_id) });
+      expenses.sort(
+        (left, right) => parseUtc(right.occurred_at).getTime() - parseUtc(left.occurred_at).getTime(),
+      );
+    }
+  }
+
+  if (!delta) {
+    return { ...report, expenses };
+  }
+
+  const categoryBreakdown = patchBreakdown(report.category_breakdown, delta, categoryName);
+  return {
+    ...report,
+    month_summary: {
+      total_expenses: report.month_summary.total_expenses + delta.total_expenses,
+      total_amount: report.month_summary.total_amount + delta.total_amount,
+    },
+    category_breakdown: categoryBreakdown,
+    top_5_categories: categoryBreakdown.slice(0, 5),
+    expenses,
+  };
+}
+
+function renameCategory(report: MonthlyReport, categoryId: number, name: string): MonthlyReport {
+  const rename = <T extends { category_id: number; category_name: string | null }>(item: T) =>
+    item.category_id === categoryId ? { ...item, category_name: name } : item;
+
+  return {
+    ...report,
+    category_breakdown: report.category_breakdown.map(rename),
+    top_5_categories: report.top_5_categories.map(rename),
+    expenses: report.expenses.map(rename),
+  };
+}
+
+// Events arrive some time after their write commits, so a report or progress
+// fetched in between may already include the write. Both carry the data
+// version they were read at; a delta at or below it is already counted. The
+// cached version stays the fetched one, so events arriving out of order
+// still apply.
+function isNewer(cached: { data_version: number }, event: { data_version: number }) {
+  return event.data_version > cached.data_version;
+}
+
+/**
+ * Apply one live event to the cached dashboard queries in place of a refetch.
+ * Delivery is at-least-once, so events are deduplicated by task id.
+ */
+export function applyLiveEvent(queryClient: QueryClient, event: LiveEvent, seenTasks: Set<number>) {
+  if (event.type === "ready" || event.type === "resync") {
+    // Anything may have changed while the stream was down.
+    void queryClient.invalidateQueries({ queryKey: ["reports"] });
+    void queryClient.invalidateQueries({ queryKey: ["goals"] });
+    return;
+  }
+
+  if (seenTasks.has(event.task_id)) {
+    return;
+  }
+  seenTasks.add(event.task_id);
+  if (seenTasks.size > MAX_SEEN_TASKS) {
+    seenTasks.delete(seenTasks.values().next().value as number);
+  }
+
+  if (event.type === "expense") {
+    const categories = queryClient.getQueryData<Category[]>(["categories"]);
+    queryClient.setQueriesData<MonthlyReport>({ queryKey: ["reports", "monthly"] }, (report) =>
+      report && isNewer(report, event)
+        ? patchReport(report, event.expense_id, event.expense, event.months, categories)
+        : report,
+    );
+    queryClient.setQueriesData<GoalProgress | null>({ queryKey: ["goals", "progress"] }, (progress) => {
+      const delta = progress
+        ? event.months.find((item) => item.year === progress.year && item.month === progress.month)
+        : undefined;
+      if (!progress || !delta || !isNewer(progress, event)) {
+        return progress;
+      }
+      return {
+        ...progress,
+        total_expense: progress.total_expense + delta.total_amount,
+        difference: progress.difference - delta.total_amount,
+      };
+    });
+    return;
+  }
+
+  if (event.type === "goal") {
+    const hasProgress = queryClient
+      .getQueriesData<GoalProgress | null>({ queryKey: ["goals", "progress"] })
+      .some(([, progress]) => progress);
+    const createdWithoutProgress = event.action === "created" && !hasProgress;
+    if (event.action === "deleted" || event.goal_limit === null || createdWithoutProgress) {
+      // The latest goal, which progress is measured against, is unknown here.
+      void queryClient.invalidateQueries({ queryKey: ["goals"] });
+      return;
+    }
+    const goalLimit = event.goal_limit;
+    // A new goal becomes the latest one, so progress is measured against it.
+    const measuredAgainst = (progress: GoalProgress) =>
+      event.action === "created" || progress.goal_id === event.goal_id;
+    queryClient.setQueriesData<GoalProgress | null>({ queryKey: ["goals", "progress"] }, (progress) =>
+      progress && measuredAgainst(progress) && isNewer(progress, event)
+        ? {
+            ...progress,
+            goal_id: event.goal_id,
+            goal_limit: goalLimit,
+            difference: goalLimit - progress.total_expense,
+          }
+        : progress,
+    );
+    if (event.action === "created") {
+      const latest = queryClient.getQueryData<Goal | null>(["goals", "latest"]);
+      if (latest?.id !== event.goal_id) {
+        void queryClient.invalidateQueries({ queryKey: ["goals", "latest"] });
+      }
+      return;
+    }
+    queryClient.setQueryData<Goal | null>(["goals", "latest"], (goal) =>
+      goal && goal.id === event.goal_id ? { ...goal, goal_limit: goalLimit } : goal,
+    );
+    return;
+  }
+
+  queryClient.setQueriesData<MonthlyReport>({ queryKey: ["reports", "monthly"] }, (report) =>
+    report ? renameCategory(report, event.category_id, event.name) : report,
+  );
+  queryClient.setQueryData<Category[]>(["categories"], (categories) =>
+    categories?.map((category) =>
+      category.id === event.category_id ? { ...category, name: event.name } : category,
+    ),
+  );
+}
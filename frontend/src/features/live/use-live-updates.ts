@@ -0,0 +1,77 @@
+import { useQueryClient, type QueryClient } from "@tanstack/react-query";
+import { useEffect } from "react";
+
+import { streamLiveUpdates } from "../../api/live";
+import { useAuth } from "../auth/use-auth";
+import { applyLiveEvent } from "./apply-live-event";
+
+const LIVE_QUERY_KEYS = [["reports", "monthly"], ["goals"]];
+const MAX_RETRY_DELAY_MS = 30_000;
+
+// While the stream is up, events keep these queries current, so they are
+// never refetched just because a page mounted or the window got focus.
+function setLive(queryClient: QueryClient, live: boolean) {
+  LIVE_QUERY_KEYS.forEach((queryKey) => {
+    queryClient.setQueryDefaults(queryKey, { staleTime: live ? Infinity : 0 });
+  });
+}
+
+/** Whether a connected stream is keeping the dashboard queries current. */
+export function isLive(queryClient: QueryClient) {
+  return queryClient.getQueryDefaults(["goals"]).staleTime === Infinity;
+}
+
+function wait(ms: number, signal: AbortSignal) {
+  return new Promise<void>((resolve) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener("abort", () => {
+      clearTimeout(timer);
+      resolve();
+    });
+  });
+}
+
+export function useLiveUpdates() {
+  const { token } = useAuth();
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!token) {
+      return;
+    }
+
+    const controller = new AbortController();
+    const seenTasks = new Set<number>();
+    let retryDelay = 1000;
+
+    async function run(authToken: string) {
+      while (!controller.signal.aborted) {
+        try {
+          await streamLiveUpdates(
+            authToken,
+            (event) => {
+              if (event.type === "ready") {
+                retryDelay = 1000;
+                setLive(queryClient, true);
+              }
+              applyLiveEvent(queryClient, event, seenTasks);
+            },
+            controller.signal,
+          );
+        } catch {
+          // Reconnect below; queries fall back to normal refetching meanwhile.
+        }
+        setLive(queryClient, false);
+        await wait(retryDelay, controller.signal);
+        retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY_MS);
+      }
+    }
+
+    void run(token);
+
+    return () => {
+      controller.abort();
+      setLive(queryClient, false);
+    };
+  }, [token, queryClient]);
+}
@@ -9,6 +9,7 @@ import { ErrorAlert } from "../components/ui/error-alert";
 import { StatCard } from "../components/ui/stat-card";
 import { useAuth } from "../features/auth/use-auth";
 import { GoalFormModal } from "../features/goals/goal-form-modal";
+import { isLive } from "../features/live/use-live-updates";
 import { getCurrentMonthNumber } from "../lib/date";
 import { formatCurrency } from "../lib/format";
 import { ApiError } from "../types/api";
@@ -59,13 +60,15 @@ export function GoalsPage() {
       }
       return createGoal(token!, payload);
     },
-    onSuccess: async () => {
+    onSuccess: async (goal) => {
       setError(null);
       setModalOpen(false);
-      await Promise.all([
-        queryClient.invalidateQueries({ queryKey: ["goals", "latest"] }),
-        queryClient.invalidateQueries({ queryKey: ["goals", "progress"] }),
-      ]);
+      // The saved goal is the latest one. Progress follows it over the live
+      // stream (applyLiveEvent), so it is only refetched when that is down.
+      queryClient.setQueryData(["goals", "latest"], goal);
+      if (!isLive(queryClient)) {
+        await queryClient.invalidateQueries({ queryKey: ["goals", "progress"] });
+      }
     },
     onError: (caughtError) => {
       setError(caughtError instanceof Error ? caughtError.message : "Unable to save goal");
@@ -16,4 +16,5 @@ export type GoalProgress = {
   goal_limit: number;
   total_expense: number;
   difference: number;
+  data_version: number;
 };
@@ -0,0 +1,51 @@
+export type LiveCategoryDelta = {
+  category_id: number;
+  total_amount: number;
+  total_expenses: number;
+};
+
+export type LiveMonthDelta = {
+  year: number;
+  month: number;
+  total_amount: number;
+  total_expenses: number;
+  categories: LiveCategoryDelta[];
+};
+
+export type LiveExpense = {
+  id: number;
+  category_id: number;
+  amount: number;
+  occurred_at: string;
+  title: string;
+  note: string;
+};
+
+export type LiveEvent =
+  | { type: "ready" }
+  | { type: "resync" }
+  | {
+      type: "expense";
+      action: "created" | "updated" | "deleted";
+      task_id: number;
+      data_version: number;
+      expense_id: number;
+      expense: LiveExpense | null;
+      months: LiveMonthDelta[];
+    }
+  | {
+      type: "goal";
+      action: "created" | "updated" | "deleted";
+      task_id: number;
+      data_version: number;
+      goal_id: number;
+      goal_limit: number | null;
+    }
+  | {
+      type: "category";
+      action: "updated";
+      task_id: number;
+      data_version: number;
+      category_id: number;
+      name: string;
+    };
@@ -29,4 +29,6 @@ export type MonthlyReport = {
   category_breakdown: CategoryBreakdownItem[];
   top_5_categories: CategoryBreakdownItem[];
   expenses: ReportExpense[];
+  // The user's data version the report was read at; live deltas at or below it are already included.
+  data_version: number;
 };